@@ -0,0 +1,205 @@
+# Sum_module/artifact_cache.py
+# This module defines the ArtifactCache class: an on-disk, content-addressed cache for the
+# arrays produced by the pipeline stages (preprocessing -> TF-IDF -> similarity graph), so a
+# parameter sweep only recomputes the stages whose inputs or configuration changed.
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+import zlib
+
+import numpy as np
+import scipy.sparse as sp
+
+from Sum_module import tracing
+
+DEFAULT_CACHE_DIR = os.path.join('Data', 'cache', 'artifacts')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _update_digest(digest, value):
+    """Feed a value into a hash with a type tag, so different values never share an encoding."""
+    if isinstance(value, bytes):
+        digest.update(b'b%d:' % len(value))
+        digest.update(value)
+    elif isinstance(value, str):
+        _update_digest(digest, value.encode('utf-8'))
+    elif isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest.update(f'a{array.dtype.str}{array.shape}:'.encode('ascii'))
+        digest.update(array.tobytes())
+    else:
+        digest.update(b'j')
+        _update_digest(digest, json.dumps(value, sort_keys=True, default=str))
+
+
+def content_hash(*parts):
+    """
+    Return the hex sha256 of a sequence of str, bytes, np.ndarray or JSON-serializable values.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        _update_digest(digest, part)
+    return digest.hexdigest()
+
+
+def sparse_to_arrays(matrix, prefix=''):
+    """Split a sparse matrix into the CSR arrays stored in the cache."""
+    matrix = sp.csr_matrix(matrix)
+    return {
+        f'{prefix}data': matrix.data,
+        f'{prefix}indices': matrix.indices,
+        f'{prefix}indptr': matrix.indptr,
+        f'{prefix}shape': np.array(matrix.shape, dtype=np.int64),
+    }
+
+
+def sparse_from_arrays(arrays, prefix=''):
+    """Rebuild the CSR matrix stored by sparse_to_arrays."""
+    return sp.csr_matrix(
+        (arrays[f'{prefix}data'], arrays[f'{prefix}indices'], arrays[f'{prefix}indptr']),
+        shape=tuple(arrays[f'{prefix}shape']),
+    )
+
+
+def token_ids_to_arrays(token_ids_dict, vocabulary):
+    """
+    Store token-id arrays independently of the run's vocabulary: the ids are renumbered
+    into a local word list, so a cached entry is valid for any shared Vocabulary.
+    """
+    token_arrays = [np.asarray(token_ids_dict[sid]) for sid in sorted(token_ids_dict)]
+    all_ids = np.concatenate(token_arrays) if token_arrays else np.zeros(0, dtype=np.int64)
+    used_ids, local_ids = np.unique(all_ids, return_inverse=True)
+    offsets = np.zeros(len(token_arrays) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids in token_arrays], out=offsets[1:])
+    return {
+        'words': np.array(vocabulary.decode(used_ids), dtype=str),
+        'ids': local_ids.astype(np.uint32),
+        'offsets': offsets,
+    }
+
+
+def token_ids_from_arrays(arrays, vocabulary):
+    """Map cached token ids back into the shared vocabulary ({sentence_id: token-id array})."""
+    shared_ids = vocabulary.encode(arrays['words'].tolist())
+    token_ids = shared_ids[arrays['ids']]
+    offsets = arrays['offsets']
+    return {sid: token_ids[offsets[sid]:offsets[sid + 1]] for sid in range(len(offsets) - 1)}
+
+
+class ArtifactCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, compress=False):
+        """
+        Initialize the ArtifactCache.
+
+        Args:
+            cache_dir (str): Directory of the cache entries (one .npz file per entry).
+            max_bytes (int): Size cap; least recently used entries are evicted above it.
+            compress (bool): Write entries with np.savez_compressed instead of np.savez.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.stats = {}
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, stage, config, *inputs):
+        """
+        Content address of a stage result: the stage name, its configuration (a dict of the
+        settings that change its output) and its inputs (raw content or upstream keys).
+        """
+        return content_hash(stage, config, *inputs)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.npz')
+
+    def load(self, key):
+        """
+        Return the arrays stored under key, or None. A hit marks the entry as recently used.
+        A missing, truncated or corrupt entry is a miss; storing the key again replaces it.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile, zlib.error):
+            return None
+        os.utime(path)
+        return arrays
+
+    def store(self, key, arrays):
+        """
+        Write a dict of arrays under key (atomically), then enforce the size cap. Each writer
+        uses its own temporary file, so processes storing the same key never mix their bytes.
+        """
+        path = self._path(key)
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix=f'{key}.', suffix='.tmp', delete=False) as outfile:
+            temp_path = outfile.name
+            try:
+                (np.savez_compressed if self.compress else np.savez)(outfile, **arrays)
+            except BaseException:
+                outfile.close()
+                os.remove(temp_path)
+                raise
+        os.replace(temp_path, path)
+        self.evict()
+
+    def get_or_compute(self, stage, config, inputs, compute):
+        """
+        Load a stage result from the cache, or compute and store it.
+
+        Args:
+            stage (str): Stage name, used for the key and the hit/miss statistics.
+            config (dict): Stage settings.
+            inputs (list): Raw input content and/or keys of upstream stages.
+            compute (callable): Returns the stage result as a dict of np.ndarray.
+
+        Returns:
+            Tuple[str, dict]: The entry key (to chain into downstream stages) and the arrays.
+        """
+        key = self.key(stage, config, *inputs)
+        stage_stats = self.stats.setdefault(stage, {"hits": 0, "misses": 0})
+        with tracing.span('cache.lookup') as span:
+            arrays = self.load(key)
+            span.inputs(stage=stage)
+            span.outputs(hit=int(arrays is not None))
+        if arrays is None:
+            stage_stats["misses"] += 1
+            arrays = compute()
+            with tracing.span('cache.store'):
+                self.store(key, arrays)
+        else:
+            stage_stats["hits"] += 1
+        return key, arrays
+
+    def size(self):
+        """Total size in bytes of the cache entries."""
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.name.endswith('.npz'))
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.npz')]
+        total = sum(entry.stat().st_size for entry in entries)
+        removed = 0
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+            removed += 1
+        self.evictions += removed
+        return removed
+
+    def report(self):
+        """Print the hit/miss counts per stage and return them."""
+        for stage, stage_stats in self.stats.items():
+            print(f"Cache {stage}: {stage_stats['hits']} hits, {stage_stats['misses']} misses")
+        print(f"Cache size: {self.size() / 1024 / 1024:.1f} MB, {self.evictions} evictions")
+        return self.stats
@@ -0,0 +1,241 @@
+# Sum_module/batch_evaluation.py
+# This module defines the BatchEvaluator class: sentence keys (doc_id, num) are encoded as
+# integers, matched/recall/precision/F1 are computed for every cluster and configuration in
+# one vectorized pass, and configurations are compared with a paired bootstrap over clusters.
+import numpy as np
+
+METRICS = ('labeled', 'extracted', 'matched', 'recall', 'precision', 'f1')
+# Bootstrap resamples generated per block, bounding memory to block x clusters indices
+BOOTSTRAP_BLOCK = 1000
+
+
+class BatchEvaluator:
+    def __init__(self):
+        """
+        Initialize the BatchEvaluator. Register the reference summaries with add_reference and
+        the system summaries of each configuration with add_summary, then call evaluate or compare.
+        """
+        self.doc_index = {}
+        self.files = []
+        self.file_index = {}
+        self.references = {}
+        self.configs = []
+        self.summaries = {}
+        self._results = None
+
+    def _doc_ids(self, doc_names):
+        ids = np.empty(len(doc_names), dtype=np.int64)
+        for position, doc_name in enumerate(doc_names):
+            ids[position] = self.doc_index.setdefault(doc_name, len(self.doc_index))
+        return ids
+
+    def encode(self, sentences, sentence_ids=None):
+        """
+        Encode the (doc_id, num) keys of sentences as int64 codes (doc id << 32 | num).
+
+        Args:
+            sentences (dict or SentenceTable): Sentence metadata by sentence id.
+            sentence_ids (list[int], optional): Sentences to encode, defaults to all of them.
+
+        Returns:
+            np.ndarray: One code per sentence; equal codes mean equal (doc_id, num).
+        """
+        if sentence_ids is None:
+            sentence_ids = list(sentences.keys())
+        sentence_ids = np.asarray(sentence_ids, dtype=np.int64)
+        if hasattr(sentences, 'doc_codes'):
+            # SentenceTable: map its interned doc ids once, then index the columns
+            doc_ids = self._doc_ids(sentences.doc_names)[sentences.doc_codes[sentence_ids]]
+            nums = sentences.nums[sentence_ids].astype(np.int64)
+        else:
+            records = [sentences[sentence_id] for sentence_id in sentence_ids.tolist()]
+            doc_ids = self._doc_ids([record['doc_id'] for record in records])
+            nums = np.array([int(record['num']) for record in records], dtype=np.int64)
+        return (doc_ids << 32) | nums
+
+    def _file(self, file_name):
+        if file_name not in self.file_index:
+            self.file_index[file_name] = len(self.files)
+            self.files.append(file_name)
+        return self.file_index[file_name]
+
+    def add_reference(self, file_name, preference_sum_dict):
+        """Register the reference summary of a cluster (as parsed by ParseDoc.parse_doc)."""
+        self._file(file_name)
+        self.references[file_name] = (np.unique(self.encode(preference_sum_dict)), len(preference_sum_dict))
+        self._results = None
+
+    def add_summary(self, config, file_name, sentences_dict, summary_sentence_ids):
+        """
+        Register the summary of a cluster produced by a configuration.
+
+        Args:
+            config (str): Configuration name, e.g. 'cosine_16'.
+            file_name (str): Cluster file name.
+            sentences_dict (dict or SentenceTable): Sentences the summary ids refer to.
+            summary_sentence_ids (list[int]): Selected sentence ids.
+        """
+        if config not in self.summaries:
+            self.configs.append(config)
+            self.summaries[config] = {}
+        self._file(file_name)
+        self.summaries[config][file_name] = self.encode(sentences_dict, summary_sentence_ids)
+        self._results = None
+
+    def evaluate(self):
+        """
+        Compute the metrics of every (configuration, cluster) pair at once.
+
+        Returns:
+            dict: metric name -> np.ndarray of shape (num_configs, num_files), unrounded (NaN
+                  where a configuration has no summary for a cluster), plus 'configs' and 'files'.
+                  The values match Evaluator.evaluate before its rounding.
+        """
+        if self._results is not None:
+            return self._results
+        num_configs, num_files = len(self.configs), len(self.files)
+        labeled = np.zeros(num_files)
+        for file_name, (_, length) in self.references.items():
+            labeled[self.file_index[file_name]] = length
+
+        # One flat array of every selected sentence, tagged with its (config, file) group;
+        # the cluster index is folded into the code so keys of different clusters never match
+        groups, codes, reference_codes = [], [], []
+        present = np.zeros((num_configs, num_files), dtype=bool)
+        for config_position, config in enumerate(self.configs):
+            for file_name, summary_codes in self.summaries[config].items():
+                file_position = self.file_index[file_name]
+                present[config_position, file_position] = True
+                groups.append(np.full(len(summary_codes), config_position * num_files + file_position))
+                codes.append(np.stack([np.full(len(summary_codes), file_position), summary_codes], axis=1))
+        for file_name, (unique_codes, _) in self.references.items():
+            reference_codes.append(np.stack([np.full(len(unique_codes), self.file_index[file_name]), unique_codes], axis=1))
+        groups = np.concatenate(groups) if groups else np.zeros(0, dtype=np.int64)
+        codes = np.concatenate(codes) if codes else np.zeros((0, 2), dtype=np.int64)
+        reference_codes = np.concatenate(reference_codes) if reference_codes else np.zeros((0, 2), dtype=np.int64)
+
+        # Renumber the key codes compactly so (file, key) fits in one int64
+        _, compact = np.unique(np.concatenate([codes[:, 1], reference_codes[:, 1]]), return_inverse=True)
+        compact = compact.reshape(-1)
+        width = len(compact) + 1
+        pair_codes = codes[:, 0] * width + compact[:len(codes)]
+        reference_pair_codes = reference_codes[:, 0] * width + compact[len(codes):]
+        is_match = np.isin(pair_codes, reference_pair_codes)
+        size = num_configs * num_files
+        matched = np.bincount(groups, weights=is_match, minlength=size).reshape(num_configs, num_files)
+        extracted = np.bincount(groups, minlength=size).reshape(num_configs, num_files).astype(float)
+        labeled = np.broadcast_to(labeled, (num_configs, num_files))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            recall = np.where(labeled > 0, matched / labeled * 100, 0.0)
+            precision = np.where(extracted > 0, matched / extracted * 100, 0.0)
+            f1 = np.where(recall + precision > 0, 2 * recall * precision / (recall + precision), 0.0)
+        results = {"labeled": labeled.copy(), "extracted": extracted, "matched": matched,
+                   "recall": recall, "precision": precision, "f1": f1}
+        for metric in METRICS:
+            results[metric] = np.where(present, results[metric], np.nan)
+        results["configs"] = list(self.configs)
+        results["files"] = list(self.files)
+        self._results = results
+        return results
+
+    def table(self):
+        """
+        Return one row per (configuration, cluster), with the same values and rounding as Evaluator.evaluate.
+        """
+        results = self.evaluate()
+        rows = []
+        for config_position, config in enumerate(results["configs"]):
+            for file_position, file_name in enumerate(results["files"]):
+                if np.isnan(results["f1"][config_position, file_position]):
+                    continue
+                row = {"config": config, "file": file_name}
+                for metric in METRICS:
+                    value = results[metric][config_position, file_position]
+                    row[metric] = int(value) if metric in ('labeled', 'extracted', 'matched') else round(float(value), 2)
+                rows.append(row)
+        return rows
+
+    def mean(self, metric='f1'):
+        """Macro average of a metric over the clusters of each configuration: {config: value}."""
+        results = self.evaluate()
+        return {config: float(np.nanmean(results[metric][position])) for position, config in enumerate(results["configs"])}
+
+    def compare(self, config_a, config_b, metric='f1', resamples=10000, confidence=0.95, seed=0):
+        """
+        Paired bootstrap over clusters: does config_a beat config_b on a metric?
+
+        Clusters evaluated under both configurations are resampled with replacement and the
+        mean per-cluster difference (a - b) is recomputed for every resample. metric='micro_f1'
+        instead recomputes F1 from the summed matched/labeled/extracted counts of the resample.
+
+        Returns:
+            dict: {"metric", "clusters", "difference" (observed), "ci_low", "ci_high",
+                   "p_value" (share of resamples where a does not beat b), "a_better" (ci_low > 0)}
+        """
+        results = self.evaluate()
+        a, b = self.configs.index(config_a), self.configs.index(config_b)
+        both = ~np.isnan(results["f1"][a]) & ~np.isnan(results["f1"][b])
+        num_clusters = int(both.sum())
+        if num_clusters == 0:
+            raise ValueError(f"No cluster was evaluated under both '{config_a}' and '{config_b}'")
+
+        if metric == 'micro_f1':
+            counts = {name: results[name][:, both] for name in ('matched', 'labeled', 'extracted')}
+
+            def statistic(index):
+                sums = {name: values[:, index].sum(axis=-1) for name, values in counts.items()}
+                recall = sums["matched"] / np.maximum(sums["labeled"], 1)
+                precision = sums["matched"] / np.maximum(sums["extracted"], 1)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    f1 = np.where(recall + precision > 0, 2 * recall * precision / (recall + precision), 0.0) * 100
+                return f1[a] - f1[b]
+        else:
+            differences = results[metric][a, both] - results[metric][b, both]
+
+            def statistic(index):
+                return differences[index].mean(axis=-1)
+
+        observed = float(statistic(np.arange(num_clusters)))
+        rng = np.random.default_rng(seed)
+        samples = []
+        for start in range(0, resamples, BOOTSTRAP_BLOCK):
+            block = min(BOOTSTRAP_BLOCK, resamples - start)
+            samples.append(statistic(rng.integers(0, num_clusters, size=(block, num_clusters))))
+        samples = np.concatenate(samples)
+        alpha = (1 - confidence) / 2
+        ci_low, ci_high = np.quantile(samples, [alpha, 1 - alpha])
+        return {
+            "metric": metric,
+            "clusters": num_clusters,
+            "difference": round(observed, 4),
+            "ci_low": round(float(ci_low), 4),
+            "ci_high": round(float(ci_high), 4),
+            "p_value": float(np.mean(samples <= 0)),
+            "a_better": bool(ci_low > 0),
+        }
+
+
+# Compare the driver configurations over the train clusters:
+if __name__ == "__main__":
+    import os
+    from Sum_module.pipeline import Pipeline, merge_config, PRESETS
+
+    train_dir = os.path.join('Data', 'DUC_TEXT', 'train')
+    file_names = sorted(f for f in os.listdir(train_dir) if os.path.isfile(os.path.join(train_dir, f)))
+    evaluator = BatchEvaluator()
+    for preset in ('commonwords', 'cosine', 'cosine_w'):
+        pipeline = Pipeline(merge_config(PRESETS[preset], {"data": {"text_dir": train_dir}, "pagerank": {"verbose": False}}))
+        for file_name in file_names:
+            if preset == 'commonwords':
+                evaluator.add_reference(file_name, pipeline.get('reference', file_name))
+            evaluator.add_summary(preset, file_name, pipeline.get('sentences', file_name),
+                                  pipeline.get('summarizer', file_name).get_top_sentence_ids())
+            pipeline.release(file_name)
+    for config, value in evaluator.mean('f1').items():
+        print(f"{config}: mean f1 {value:.2f} over {len(file_names)} train clusters")
+    for config_a, config_b in (('cosine', 'commonwords'), ('cosine_w', 'commonwords'), ('cosine_w', 'cosine')):
+        comparison = evaluator.compare(config_a, config_b)
+        verdict = 'beats' if comparison["a_better"] else 'does not clearly beat'
+        print(f"{config_a} {verdict} {config_b}: f1 difference {comparison['difference']:+.2f} "
+              f"(95% CI {comparison['ci_low']:+.2f} .. {comparison['ci_high']:+.2f}, p={comparison['p_value']:.3f})")
@@ -4,20 +4,33 @@ import re
 import numpy as np
 import math
 
+from Sum_module import tracing
+from Sum_module.preprocess import WORD_PATTERN
+
+ENGINES = ('sparse', 'loop')
+
 class ConnectionMatrix:
-    def __init__(self, sentences, min_common_words=4, weighted=False):
+    def __init__(self, sentences, min_common_words=4, weighted=False, engine='sparse', block_size=1024):
         """
         Initialize the ConnectionMatrix class.
         
         Args:
-            sentences (list of str): List of preprocessed sentence texts.
+            sentences (list of str or list of np.ndarray): List of preprocessed sentence texts, or
+                          token-id arrays from Preprocessor.preprocess_dict_ids (sparse engine only).
             min_common_words (int): Minimum number of common words required for connection.
             max_common_words (int): Maximum number of common words allowed for connection.
+            engine (str): 'sparse' tokenizes each sentence once and counts common words for all
+                          pairs with sparse products; 'loop' is the original pairwise loop.
+            block_size (int): Number of sentences whose pairs the sparse engine counts at once.
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
         self.sentences = sentences
         self.min_common_words = min_common_words
         # self.max_common_words = max_common_words
         self.weighted = weighted
+        self.engine = engine
+        self.block_size = block_size
         self.matrix = None
 
     def similarity_score(self, sent1, sent2):
@@ -60,10 +73,176 @@ class ConnectionMatrix:
 
     
     
-    def create_matrix(self):
+    def build_incidence(self):
+        """
+        Tokenize every sentence once into integer token ids and build a binary
+        sentence x term incidence matrix.
+
+        Returns:
+            tuple: (incidence, sizes) where incidence is a scipy.sparse.csr_matrix of shape
+                   (n_sentences, n_terms) and sizes is the number of unique words per sentence.
+        """
+        import scipy.sparse as sp
+        vocabulary = {}
+        indptr = [0]
+        indices = []
+        num_terms = 0
+        for sentence in self.sentences:
+            if isinstance(sentence, str):
+                words = set(WORD_PATTERN.findall(sentence.lower()))
+                indices.extend(vocabulary.setdefault(word, len(vocabulary)) for word in words)
+                num_terms = max(num_terms, len(vocabulary))
+            else:
+                # Already tokenized: the token ids are the columns
+                token_ids = np.unique(sentence)
+                indices.extend(token_ids.tolist())
+                if len(token_ids):
+                    num_terms = max(num_terms, int(token_ids[-1]) + 1)
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.int32)
+        incidence = sp.csr_matrix(
+            (data, np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(self.sentences), num_terms)
+        )
+        sizes = np.diff(incidence.indptr)
+        return incidence, sizes
+
+    def count_blocks(self, incidence, min_count=1, all_pairs=False):
+        """
+        Count the common words of the sentence pairs (i, j) with i < j, block_size sentences i
+        at a time, so peak memory is bounded by the pairs of one block instead of every pair of
+        sentences sharing a word.
+
+        Args:
+            incidence (scipy.sparse.csr_matrix): Incidence matrix from build_incidence.
+            min_count (int): Only yield pairs with at least this many common words.
+            all_pairs (bool): Yield every pair of the block, those without common words with
+                              count 0 (min_count is then ignored).
+
+        Yields:
+            tuple: (rows, cols, counts) np.ndarray of the pairs of one block.
+        """
+        n = incidence.shape[0]
+        incidence_t = incidence.T.tocsr()
+        block_size = max(1, self.block_size)
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            overlap = (incidence[start:stop] @ incidence_t).tocoo()
+            rows, cols, counts = overlap.row.astype(np.int64) + start, overlap.col.astype(np.int64), overlap.data
+            keep = cols > rows if all_pairs else (cols > rows) & (counts >= min_count)
+            rows, cols, counts = rows[keep], cols[keep], counts[keep]
+            if all_pairs:
+                # Pair (i, j) of the block is at position offsets[i - start] + j - i - 1; the pairs
+                # in the sparse product get their count, the others keep 0
+                lengths = n - 1 - np.arange(start, stop)
+                offsets = np.cumsum(lengths) - lengths
+                pair_rows = np.repeat(np.arange(start, stop), lengths)
+                pair_cols = np.arange(int(lengths.sum())) - np.repeat(offsets, lengths) + pair_rows + 1
+                pair_counts = np.zeros(len(pair_rows), dtype=counts.dtype)
+                pair_counts[offsets[rows - start] + cols - rows - 1] = counts
+                rows, cols, counts = pair_rows, pair_cols, pair_counts
+            yield rows, cols, counts
+
+    def common_word_counts(self, all_pairs=False):
+        """
+        Count the common words of every sentence pair (i, j) with i < j.
+
+        Args:
+            all_pairs (bool): Also return pairs without any common word.
+
+        Returns:
+            tuple: (rows, cols, counts, sizes) as np.ndarray, where sizes holds the
+                   number of unique words of each sentence.
+        """
+        incidence, sizes = self.build_incidence()
+        rows, cols, counts = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int32)]
+        for block_rows, block_cols, block_counts in self.count_blocks(incidence, all_pairs=all_pairs):
+            rows.append(block_rows)
+            cols.append(block_cols)
+            counts.append(block_counts)
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(counts), sizes
+
+    def connection_values(self, rows, cols, counts, sizes):
+        """
+        Apply the connection rule to a batch of sentence pairs (i, j) with i < j.
+
+        Binary mode follows has_connection and weighted mode follows similarity_score,
+        with sentence i playing the role of the first sentence.
+
+        Args:
+            rows, cols (np.ndarray): Sentence indices of each pair.
+            counts (np.ndarray): Number of common words of each pair.
+            sizes (np.ndarray): Number of unique words of each sentence.
+
+        Returns:
+            np.ndarray: int 0/1 (binary) or float scores (weighted), one per pair.
+        """
+        if not self.weighted:
+            connected = (counts >= self.min_common_words) & (counts != sizes[rows])
+            return connected.astype(int)
+
+        # math.log per sentence keeps the scores bit-identical to similarity_score
+        log_sizes = np.array([math.log(size) if size > 0 else 0.0 for size in sizes], dtype=float)
+        denominator = log_sizes[rows] + log_sizes[cols]
+        valid = (counts > 0) & (sizes[rows] > 0) & (sizes[cols] > 0) & (denominator != 0)
+        scores = np.zeros(len(counts), dtype=float)
+        scores[valid] = counts[valid] / denominator[valid]
+        return scores
+
+    def create_matrix(self, sparse_output=False):
         """
         Create a symmetric connection matrix where matrix[i][j] is True if sentences i and j connect.
+
+        Args:
+            sparse_output (bool): Return a scipy.sparse.csr_matrix instead of a dense array.
         
+        Returns:
+            np.ndarray or scipy.sparse.csr_matrix: matrix of shape (n, n).
+        """
+        if sparse_output:
+            import scipy.sparse as sp
+        if self.engine == 'loop':
+            matrix = self._create_matrix_loop()
+            return sp.csr_matrix(matrix) if sparse_output else matrix
+
+        n = len(self.sentences)
+        # Pairs without common words only connect in binary mode with min_common_words <= 0
+        all_pairs = not self.weighted and self.min_common_words <= 0
+        # Binary mode needs min_common_words common words, weighted mode one
+        min_count = 1 if self.weighted else max(1, self.min_common_words)
+        with tracing.span('graph.common_words') as span:
+            span.inputs(sentences=n, block_size=self.block_size)
+            incidence, sizes = self.build_incidence()
+            rows, cols, values = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], []
+            num_pairs = 0
+            for block_rows, block_cols, counts in self.count_blocks(incidence, min_count, all_pairs):
+                block_values = self.connection_values(block_rows, block_cols, counts, sizes)
+                keep = block_values > 0
+                rows.append(block_rows[keep])
+                cols.append(block_cols[keep])
+                values.append(block_values[keep])
+                num_pairs += len(counts)
+            rows, cols = np.concatenate(rows), np.concatenate(cols)
+            values = np.concatenate(values) if values else np.zeros(0, dtype=float if self.weighted else int)
+            span.outputs(pairs=num_pairs, edges=len(values))
+
+        if sparse_output:
+            matrix = sp.csr_matrix(
+                (np.concatenate([values, values]), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+                shape=(n, n)
+            )
+        else:
+            matrix = np.zeros((n, n), dtype=values.dtype)
+            matrix[rows, cols] = values
+            matrix[cols, rows] = values
+        self.matrix = matrix
+        return matrix
+
+    def _create_matrix_loop(self):
+        """
+        Reference implementation comparing every sentence pair in Python.
+
         Returns:
             np.ndarray: matrix of shape (n, n).
         """
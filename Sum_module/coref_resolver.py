@@ -1,5 +1,3 @@
-from stanza.server import CoreNLPClient
-
 class CorefResolver:
     def __init__(self, corenlp_path: str = None, memory: str = '4G', timeout: int = 60000):
         """
@@ -18,6 +16,8 @@ class CorefResolver:
 
     def __enter__(self):
         """Start CoreNLPClient upon entering context."""
+        # stanza is only imported when a server is actually started
+        from stanza.server import CoreNLPClient
         self.client = CoreNLPClient(
             annotators=['tokenize', 'ssplit', 'pos', 'lemma', 'ner', 'parse', 'coref'],
             memory=self.memory,
@@ -0,0 +1,250 @@
+# Sum_module/corpus_store.py
+# This module compiles the DUC_TEXT clusters once into a binary corpus (sentence metadata
+# arrays, raw text buffer, preprocessed token ids, vocabulary and per-cluster offsets) and
+# defines the CompiledCorpus class that memory-maps it back for later runs.
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import time
+
+import numpy as np
+
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.sentence_table import SentenceTable
+from Sum_module.vocabulary import TOKEN_DTYPE, Vocabulary
+
+FORMAT_VERSION = 2
+DEFAULT_CORPUS_DIR = os.path.join('Data', 'cache', 'corpus')
+DEFAULT_SOURCE_DIRS = (os.path.join('Data', 'DUC_TEXT', 'train'), os.path.join('Data', 'DUC_TEXT', 'test'))
+ARRAYS = ('doc_codes', 'nums', 'wdcounts', 'text_offsets', 'token_ids', 'token_offsets', 'cluster_offsets')
+
+
+def file_sha256(path):
+    """Return the hex sha256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as infile:
+        for block in iter(lambda: infile.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_entry(path):
+    """Size, modification time and content hash of a source file, as recorded in the manifest."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+
+
+def list_sources(source_dirs=DEFAULT_SOURCE_DIRS):
+    """
+    List the cluster files of the source directories.
+
+    Returns:
+        List[Tuple[str, str]]: (cluster name 'split/file', path) in sorted order.
+    """
+    sources = []
+    for source_dir in source_dirs:
+        split = os.path.basename(os.path.normpath(source_dir))
+        for file_name in sorted(os.listdir(source_dir)):
+            path = os.path.join(source_dir, file_name)
+            if os.path.isfile(path):
+                sources.append((f'{split}/{file_name}', path))
+    return sources
+
+
+def preprocess_config(use_lemmatizer=True, language='english', lemmatizer_backend='wordnet'):
+    return {"use_lemmatizer": use_lemmatizer, "language": language, "lemmatizer_backend": lemmatizer_backend}
+
+
+def compile_corpus(output_dir=DEFAULT_CORPUS_DIR, source_dirs=DEFAULT_SOURCE_DIRS, use_lemmatizer=True,
+                   language='english', lemmatizer_backend='wordnet', preprocessor=None):
+    """
+    Parse and preprocess every cluster once and write the compiled corpus.
+
+    All sentences of all clusters are stored back to back; cluster k owns the sentences
+    cluster_offsets[k]:cluster_offsets[k + 1]. Sentence i owns the text bytes
+    text_offsets[i]:text_offsets[i + 1] of text.bin and the token ids
+    token_offsets[i]:token_offsets[i + 1] of token_ids.npy. manifest.json holds the cluster
+    names, doc ids, vocabulary, the settings of the preprocessor that produced the token ids and,
+    for every source file, its size, modification time and sha256 under its path relative to
+    output_dir. The corpus is written to a temporary directory that replaces output_dir at the end.
+
+    Args:
+        output_dir (str): Directory of the compiled corpus.
+        source_dirs (iterable of str): Cluster directories (e.g. DUC_TEXT/train and test).
+        use_lemmatizer, language, lemmatizer_backend: Preprocessor settings.
+        preprocessor (Preprocessor, optional): Use this instance instead of building one from the
+                                               settings; its own settings are recorded.
+
+    Returns:
+        dict: The manifest that was written.
+    """
+    if preprocessor is None:
+        from Sum_module.preprocess import Preprocessor
+        preprocessor = Preprocessor(use_lemmatizer=use_lemmatizer, language=language,
+                                    lemmatizer_backend=lemmatizer_backend)
+
+    sources = list_sources(source_dirs)
+    records, cluster_offsets, entries = [], [0], {}
+    for name, path in sources:
+        entries[os.path.relpath(path, output_dir)] = source_entry(path)
+        records.extend(ParseDoc.iter_sentences(FileReader(path).read_file()))
+        cluster_offsets.append(len(records))
+    table = SentenceTable.from_records(records)
+
+    vocabulary = Vocabulary()
+    token_arrays = [preprocessor.preprocess_ids(record['sentence_text'], vocabulary) for record in records]
+    token_offsets = np.zeros(len(token_arrays) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids in token_arrays], out=token_offsets[1:])
+    token_ids = np.concatenate(token_arrays).astype(TOKEN_DTYPE) if token_arrays else np.zeros(0, dtype=TOKEN_DTYPE)
+
+    arrays = {
+        "doc_codes": table.doc_codes,
+        "nums": table.nums,
+        "wdcounts": table.wdcounts,
+        "text_offsets": table._text_offsets,
+        "token_ids": token_ids,
+        "token_offsets": token_offsets,
+        "cluster_offsets": np.array(cluster_offsets, dtype=np.int64),
+    }
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "clusters": [name for name, _ in sources],
+        "doc_names": table.doc_names,
+        "vocabulary": vocabulary.words,
+        "preprocess": preprocessor.config,
+        "sources": entries,
+    }
+
+    temp_dir = f'{os.path.normpath(output_dir)}.tmp'
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    for array_name, array in arrays.items():
+        np.save(os.path.join(temp_dir, f'{array_name}.npy'), array)
+    with open(os.path.join(temp_dir, 'text.bin'), 'wb') as outfile:
+        outfile.write(table.text_buffer)
+    with open(os.path.join(temp_dir, 'manifest.json'), 'w', encoding='utf-8') as outfile:
+        json.dump(manifest, outfile, ensure_ascii=False)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(temp_dir, output_dir)
+    return manifest
+
+
+class CompiledCorpus:
+    def __init__(self, corpus_dir=DEFAULT_CORPUS_DIR):
+        """
+        Open a compiled corpus. The arrays and the text buffer are memory-mapped, so opening
+        reads only the manifest, and clusters are sliced without copying.
+
+        Args:
+            corpus_dir (str): Directory written by compile_corpus.
+        """
+        self.corpus_dir = corpus_dir
+        with open(os.path.join(corpus_dir, 'manifest.json'), encoding='utf-8') as infile:
+            self.manifest = json.load(infile)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{corpus_dir} has an unsupported corpus format version")
+        self.arrays = {name: np.load(os.path.join(corpus_dir, f'{name}.npy'), mmap_mode='r') for name in ARRAYS}
+        text_path = os.path.join(corpus_dir, 'text.bin')
+        if os.path.getsize(text_path):
+            with open(text_path, 'rb') as infile:
+                self.text_buffer = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.text_buffer = b''
+        self.cluster_index = {name: k for k, name in enumerate(self.manifest["clusters"])}
+        self.table = SentenceTable(self.manifest["doc_names"], self.arrays["doc_codes"], self.arrays["nums"],
+                                   self.arrays["wdcounts"], self.text_buffer, self.arrays["text_offsets"])
+        self._vocabulary = None
+
+    @classmethod
+    def load_or_compile(cls, corpus_dir=DEFAULT_CORPUS_DIR, source_dirs=DEFAULT_SOURCE_DIRS, use_lemmatizer=True,
+                        language='english', lemmatizer_backend='wordnet'):
+        """Open the corpus, compiling it first if it is missing or stale."""
+        config = preprocess_config(use_lemmatizer, language, lemmatizer_backend)
+        if os.path.exists(os.path.join(corpus_dir, 'manifest.json')):
+            try:
+                corpus = cls(corpus_dir)
+            except ValueError:
+                # Written by an older format version
+                corpus = None
+            if corpus is not None and corpus.manifest["preprocess"] == config and not corpus.stale_sources(source_dirs):
+                return corpus
+            print(f"Compiled corpus {corpus_dir} is stale, recompiling")
+        compile_corpus(corpus_dir, source_dirs, use_lemmatizer, language, lemmatizer_backend)
+        return cls(corpus_dir)
+
+    def source_path(self, recorded_path):
+        """Resolve a manifest source path (relative to the corpus directory)."""
+        return os.path.normpath(os.path.join(self.corpus_dir, recorded_path))
+
+    def stale_sources(self, source_dirs=DEFAULT_SOURCE_DIRS):
+        """
+        Compare the source files with the entries recorded at compile time. A file whose size
+        and modification time are unchanged is fresh; only the others are hashed, so a file
+        that was touched but not edited is still fresh.
+
+        Returns:
+            List[str]: Paths that were added, removed or changed since the corpus was compiled.
+        """
+        recorded = {os.path.realpath(self.source_path(path)): entry for path, entry in self.manifest["sources"].items()}
+        current = [path for _, path in list_sources(source_dirs)]
+        stale = []
+        for path in current:
+            entry = recorded.pop(os.path.realpath(path), None)
+            if entry is None:
+                stale.append(path)
+                continue
+            stat = os.stat(path)
+            if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+                continue
+            if stat.st_size != entry["size"] or file_sha256(path) != entry["sha256"]:
+                stale.append(path)
+        # Recorded files that are no longer listed
+        stale.extend(self.source_path(path) for path, entry in self.manifest["sources"].items()
+                     if os.path.realpath(self.source_path(path)) in recorded)
+        return stale
+
+    @property
+    def clusters(self):
+        return self.manifest["clusters"]
+
+    @property
+    def vocabulary(self):
+        """Vocabulary of the stored token ids (built on first access)."""
+        if self._vocabulary is None:
+            self._vocabulary = Vocabulary(self.manifest["vocabulary"])
+        return self._vocabulary
+
+    def cluster(self, name):
+        """
+        Return the sentences of a cluster, e.g. corpus.cluster('test/d112h').
+
+        Returns:
+            SentenceTable: A view over the memory-mapped columns, sentence ids from 0.
+        """
+        k = self.cluster_index[name]
+        offsets = self.arrays["cluster_offsets"]
+        return self.table.view(np.arange(offsets[k], offsets[k + 1]))
+
+    def token_ids(self, sentences):
+        """
+        Return the preprocessed token ids of a cluster table or of a view of it.
+
+        Returns:
+            dict: sentence_id -> token-id array (zero-copy slices), like Preprocessor.preprocess_dict_ids.
+        """
+        token_ids, token_offsets = self.arrays["token_ids"], self.arrays["token_offsets"]
+        return {sid: token_ids[token_offsets[row]:token_offsets[row + 1]] for sid, row in enumerate(sentences.rows)}
+
+
+# Compile the DUC_TEXT corpus and time opening it:
+if __name__ == "__main__":
+    start = time.perf_counter()
+    manifest = compile_corpus()
+    print(f"Compiled {len(manifest['clusters'])} clusters into {DEFAULT_CORPUS_DIR} in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    corpus = CompiledCorpus()
+    sentences = corpus.cluster(corpus.clusters[0])
+    print(f"Opened and sliced {corpus.clusters[0]} ({len(sentences)} sentences) in {(time.perf_counter() - start) * 1000:.1f}ms")
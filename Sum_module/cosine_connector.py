@@ -1,11 +1,19 @@
 import numpy as np
 
+from Sum_module import tracing
+from Sum_module.lazy_sparse import issparse
+
 class CosineSimilarityConnector:
-    def __init__(self, threshold=0.2):
+    def __init__(self, threshold=0.2, block_size=1024):
         """
         Initialize with a cosine similarity threshold for connection.
+
+        Args:
+            threshold (float): Sentences connect if their cosine similarity is above this value.
+            block_size (int): Number of rows computed at once by create_sparse_connection_matrix.
         """
         self.threshold = threshold
+        self.block_size = block_size
         self.similarity_matrix = None
         self.connection_matrix = None
 
@@ -13,10 +21,16 @@ class CosineSimilarityConnector:
         """
         Calculate the cosine similarity matrix from TF-IDF vectors.
         Args:
-            tfidf_matrix (np.ndarray): TF-IDF matrix (n_sentences, n_features)
+            tfidf_matrix (np.ndarray or scipy.sparse matrix): TF-IDF matrix (n_sentences, n_features)
         Returns:
             np.ndarray: Cosine similarity matrix (n_sentences, n_sentences)
         """
+        if issparse(tfidf_matrix):
+            normalized_matrix = self.normalize_sparse(tfidf_matrix)
+            similarity = (normalized_matrix @ normalized_matrix.T).toarray()
+            self.similarity_matrix = similarity
+            return similarity
+
         # Normalize each row (sentence vector) to unit length 
         # computes the L2 norm (Euclidean length) of each row vector.
         norm = np.linalg.norm(tfidf_matrix, axis=1, keepdims=True)
@@ -29,11 +43,22 @@ class CosineSimilarityConnector:
         self.similarity_matrix = similarity
         return similarity
 
+    def normalize_sparse(self, tfidf_matrix):
+        """
+        Normalize each row of a sparse TF-IDF matrix to unit length without densifying it.
+        """
+        import scipy.sparse as sp
+        normalized_matrix = sp.csr_matrix(tfidf_matrix, dtype=float, copy=True)
+        norm = np.sqrt(np.asarray(normalized_matrix.multiply(normalized_matrix).sum(axis=1)).ravel())
+        norm[norm == 0] = 1
+        normalized_matrix.data /= np.repeat(norm, np.diff(normalized_matrix.indptr))
+        return normalized_matrix
+
     def create_connection_matrix(self, tfidf_matrix):
         """
         Create a boolean connection matrix based on cosine similarity threshold.
         Args:
-            tfidf_matrix (np.ndarray): TF-IDF matrix (n_sentences, n_features)
+            tfidf_matrix (np.ndarray or scipy.sparse matrix): TF-IDF matrix (n_sentences, n_features)
         Returns:
             np.ndarray: Connection matrix (n_sentences, n_sentences)
         """
@@ -42,3 +67,54 @@ class CosineSimilarityConnector:
         np.fill_diagonal(connection, 0)  # Remove self-connections
         self.connection_matrix = connection
         return connection
+
+    def create_sparse_connection_matrix(self, tfidf_matrix, weighted=False):
+        """
+        Create the connection matrix one row-block at a time, keeping only entries above
+        the threshold, so peak memory is bounded by block_size x n_sentences instead of n^2.
+        With a single block (n_sentences <= block_size) the result equals the dense computation.
+
+        Args:
+            tfidf_matrix (np.ndarray or scipy.sparse matrix): TF-IDF matrix (n_sentences, n_features)
+            weighted (bool): Keep the similarity values instead of 1 for connected pairs.
+        Returns:
+            scipy.sparse.csr_matrix: Connection matrix (n_sentences, n_sentences) without self-connections
+        """
+        import scipy.sparse as sp
+        if issparse(tfidf_matrix):
+            normalized_matrix = self.normalize_sparse(tfidf_matrix)
+        else:
+            norm = np.linalg.norm(tfidf_matrix, axis=1, keepdims=True)
+            norm[norm == 0] = 1
+            normalized_matrix = tfidf_matrix / norm
+
+        with tracing.span('graph.cosine_blocks') as span:
+            span.inputs(tfidf=normalized_matrix, block_size=self.block_size)
+            n = normalized_matrix.shape[0]
+            block_size = max(1, self.block_size)
+            rows, cols, values = [], [], []
+            for start in range(0, n, block_size):
+                stop = min(start + block_size, n)
+                block = normalized_matrix if (start == 0 and stop == n) else normalized_matrix[start:stop]
+                if sp.issparse(block):
+                    similarity = (block @ normalized_matrix.T).tocoo()
+                    keep = (similarity.data > self.threshold) & (similarity.row + start != similarity.col)
+                    block_rows, block_cols = similarity.row[keep], similarity.col[keep]
+                    block_values = similarity.data[keep]
+                else:
+                    similarity = np.dot(block, normalized_matrix.T)
+                    block_rows, block_cols = np.nonzero(similarity > self.threshold)
+                    block_values = similarity[block_rows, block_cols]
+                    keep = block_rows + start != block_cols  # Remove self-connections
+                    block_rows, block_cols, block_values = block_rows[keep], block_cols[keep], block_values[keep]
+                rows.append(block_rows.astype(np.int64) + start)
+                cols.append(block_cols.astype(np.int64))
+                values.append(block_values if weighted else np.ones(len(block_values), dtype=int))
+
+            rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+            cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+            values = np.concatenate(values) if values else np.zeros(0, dtype=float if weighted else int)
+            connection = sp.csr_matrix((values, (rows, cols)), shape=(n, n))
+            span.outputs(graph=connection)
+        self.connection_matrix = connection
+        return connection
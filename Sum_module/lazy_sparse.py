@@ -0,0 +1,13 @@
+# Sum_module/lazy_sparse.py
+# This module checks for scipy.sparse matrices without importing scipy.sparse, which takes
+# ~250 ms to import cold; dense and loop code paths never need it, sparse ones import it locally.
+import sys
+
+
+def issparse(value):
+    """
+    scipy.sparse.issparse that does not import scipy: a sparse matrix can only exist once
+    scipy.sparse has been imported.
+    """
+    module = sys.modules.get('scipy.sparse')
+    return module is not None and module.issparse(value)
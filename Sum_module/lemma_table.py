@@ -0,0 +1,214 @@
+# Sum_module/lemma_table.py
+# This module defines the LemmaTable lemmatizer: WordNet noun lemmas compiled once into a
+# memory-mapped sorted-array file, used instead of per-token WordNetLemmatizer calls.
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b'LEMTAB01'
+HEADER = struct.Struct('<8sIII')  # magic, number of entries, keys blob size, values blob size
+# Resolved from the repository root, so the table is shared whatever the working directory
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TABLE_PATH = os.path.join(REPO_ROOT, 'Data', 'cache', 'wordnet_noun_lemmas.bin')
+
+
+def compile_lemma_table(path=DEFAULT_TABLE_PATH):
+    """
+    Compile the WordNet noun lemmatizer into a lookup table file.
+
+    WordNetLemmatizer only returns something other than the word itself when the word is in
+    the noun exception list, or when one detachment rule (e.g. 'ies' -> 'y') turns it into a
+    noun of the lemma index. All such words are generated from the exception list and by
+    applying the rules in reverse to every noun lemma, and the table stores the lemma that
+    WordNetLemmatizer returns for each of them whenever it differs from the word.
+
+    Args:
+        path (str): Output file path.
+
+    Returns:
+        int: Number of entries in the table.
+    """
+    from nltk.corpus import wordnet as wn
+    from nltk.stem import WordNetLemmatizer
+
+    lemmatizer = WordNetLemmatizer()
+    candidates = set(wn._exception_map[wn.NOUN])
+    substitutions = wn.MORPHOLOGICAL_SUBSTITUTIONS[wn.NOUN]
+    for lemma in wn.all_lemma_names(pos=wn.NOUN):
+        for old, new in substitutions:
+            if lemma.endswith(new):
+                candidates.add(lemma[:len(lemma) - len(new)] + old)
+
+    table = {}
+    for form in candidates:
+        lemma = lemmatizer.lemmatize(form)
+        if lemma != form:
+            table[form] = lemma
+    write_lemma_table(table, path)
+    return len(table)
+
+
+def write_lemma_table(table, path):
+    """
+    Write a {word: lemma} dict as a sorted-array file, atomically.
+
+    Layout: header, uint32 key offsets (n + 1), uint32 value offsets (n + 1),
+    UTF-8 keys blob, UTF-8 values blob. Keys are sorted by their UTF-8 bytes.
+    """
+    items = sorted((word.encode('utf-8'), lemma.encode('utf-8')) for word, lemma in table.items())
+    keys = [key for key, _ in items]
+    values = [value for _, value in items]
+    key_offsets = np.concatenate([[0], np.cumsum([len(key) for key in keys])]).astype('<u4')
+    value_offsets = np.concatenate([[0], np.cumsum([len(value) for value in values])]).astype('<u4')
+    keys_blob = b''.join(keys)
+    values_blob = b''.join(values)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as outfile:
+        outfile.write(HEADER.pack(MAGIC, len(items), len(keys_blob), len(values_blob)))
+        outfile.write(key_offsets.tobytes())
+        outfile.write(value_offsets.tobytes())
+        outfile.write(keys_blob)
+        outfile.write(values_blob)
+    os.replace(temp_path, path)
+
+
+class LemmaTable:
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        """
+        Open a compiled lemma table. The file is memory-mapped, so opening it does not load
+        WordNet or read the whole table; each word is looked up once by binary search and
+        then served from a per-instance cache.
+
+        Args:
+            path (str): Path of a table written by compile_lemma_table.
+        """
+        self.path = path
+        with open(path, 'rb') as infile:
+            self._buffer = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, keys_size, values_size = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled lemma table")
+        self.count = count
+        offset = HEADER.size
+        self._key_offsets = np.frombuffer(self._buffer, dtype='<u4', count=count + 1, offset=offset).tolist()
+        offset += 4 * (count + 1)
+        self._value_offsets = np.frombuffer(self._buffer, dtype='<u4', count=count + 1, offset=offset).tolist()
+        offset += 4 * (count + 1)
+        self._keys_start = offset
+        self._values_start = offset + keys_size
+        self._cache = {}
+
+    @classmethod
+    def load_or_compile(cls, path=DEFAULT_TABLE_PATH):
+        """Open the table at path, compiling it from WordNet first if it does not exist."""
+        if not os.path.exists(path):
+            compile_lemma_table(path)
+        return cls(path)
+
+    def _key(self, index):
+        start = self._keys_start
+        return self._buffer[start + self._key_offsets[index]:start + self._key_offsets[index + 1]]
+
+    def lookup(self, word):
+        """
+        Binary search for a word in the table.
+
+        Returns:
+            str or None: The lemma if it differs from the word, else None.
+        """
+        key = word.encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._key(low) == key:
+            start = self._values_start
+            return self._buffer[start + self._value_offsets[low]:start + self._value_offsets[low + 1]].decode('utf-8')
+        return None
+
+    def lemmatize(self, word, pos='n'):
+        """
+        Same result as WordNetLemmatizer().lemmatize(word) for the default noun POS.
+        """
+        if pos != 'n':
+            raise ValueError("The lemma table only covers the noun POS")
+        lemma = self._cache.get(word)
+        if lemma is None:
+            lemma = self.lookup(word) or word
+            self._cache[word] = lemma
+        return lemma
+
+
+def verify_lemma_table(table, words):
+    """
+    Compare a LemmaTable with WordNetLemmatizer over a list of words.
+
+    Returns:
+        List[Tuple[str, str, str]]: (word, wordnet lemma, table lemma) for every mismatch.
+    """
+    from nltk.stem import WordNetLemmatizer
+
+    lemmatizer = WordNetLemmatizer()
+    mismatches = []
+    for word in words:
+        expected = lemmatizer.lemmatize(word)
+        actual = table.lemmatize(word)
+        if expected != actual:
+            mismatches.append((word, expected, actual))
+    return mismatches
+
+
+def corpus_words(text_dir):
+    """
+    Collect the words of every cluster file of a directory, split with preprocess.tokenize
+    like Preprocessor does, so they are the words the lemmatizer is given (plus stopwords).
+
+    Returns:
+        List[str]: The distinct words, sorted.
+    """
+    from Sum_module.file_reader import FileReader
+    from Sum_module.parse_doc import ParseDoc
+    from Sum_module.preprocess import tokenize
+
+    vocabulary = set()
+    for file_name in sorted(os.listdir(text_dir)):
+        sentences_dict = ParseDoc.parse_doc(FileReader(os.path.join(text_dir, file_name)).read_file())
+        for data in sentences_dict.values():
+            vocabulary.update(tokenize(data['sentence_text']))
+    return sorted(vocabulary)
+
+
+# Equivalence check over the DUC train vocabulary (also run by tests/test_lemma_table.py):
+if __name__ == "__main__":
+    train_dir = os.path.join(REPO_ROOT, 'Data', 'DUC_TEXT', 'train')
+    words = corpus_words(train_dir)
+
+    start = time.perf_counter()
+    table = LemmaTable.load_or_compile()
+    print(f"Lemma table: {table.count} entries, opened in {time.perf_counter() - start:.4f}s")
+
+    mismatches = verify_lemma_table(table, words)
+    print(f"Checked {len(words)} words from {train_dir}: {len(mismatches)} mismatches")
+    for word, expected, actual in mismatches[:20]:
+        print(f"  {word}: wordnet={expected} table={actual}")
+
+    from nltk.stem import WordNetLemmatizer
+    lemmatizer = WordNetLemmatizer()
+    start = time.perf_counter()
+    for word in words:
+        lemmatizer.lemmatize(word)
+    wordnet_time = time.perf_counter() - start
+    table = LemmaTable()
+    start = time.perf_counter()
+    for word in words:
+        table.lemmatize(word)
+    table_time = time.perf_counter() - start
+    print(f"Per token: wordnet {wordnet_time / len(words) * 1e6:.2f}us, table {table_time / len(words) * 1e6:.2f}us")
@@ -3,7 +3,7 @@
 import os
 
 class OutputWriter:
-    def __init__(self, sentences_dict, output_dir='output'):
+    def __init__(self, sentences_dict, output_dir='output', archive=None):
         """
         Initialize the OutputWriter.
         
@@ -11,10 +11,27 @@ class OutputWriter:
             sentences_dict (dict): Dictionary mapping sentence_id to sentence metadata including
                                    'doc_id', 'wdcount', 'num', and 'sentence_text'.
             output_dir (str): Directory to save output files. Created if not exists.
+            archive (SummaryArchiveWriter, optional): Add summaries to this run archive instead
+                                   of writing one file each (export them with SummaryArchiveReader.export).
         """
         self.sentences_dict = sentences_dict
         self.output_dir = output_dir
+        self.archive = archive
         os.makedirs(self.output_dir, exist_ok=True)
+
+    def format_summary(self, summary_sentence_ids):
+        """
+        Format the selected summary sentences in the original tag format, one per line.
+        """
+        lines = []
+        for sentence_id in summary_sentence_ids:
+            data = self.sentences_dict[sentence_id]
+            doc_id = data.get('doc_id', 'unknown')
+            wdcount = data.get('wdcount', '0')
+            num = data.get('num', '0')
+            sentence_text = data.get('sentence_text', '')
+            lines.append(f'<s doc_id="{doc_id}" num="{num}" wdcount="{wdcount}"> {sentence_text}</s>\n')
+        return ''.join(lines)
     
     def write_summary(self, summary_sentence_ids, input_file_path, suffix='_commonword'):
         """
@@ -26,20 +43,19 @@ class OutputWriter:
             suffix (str): Suffix to add to output file name (default '_commonword').
         
         Returns:
-            str: The output file path that the summary is written to.
+            str: The output file path that the summary is written to (in archive mode, the
+                 path the file gets when the archive is exported to output_dir).
         """
         input_filename = os.path.splitext(os.path.basename(input_file_path))[0]
         output_file_path = os.path.join(self.output_dir, f'{input_filename}{suffix}')
-        
+        summary = self.format_summary(summary_sentence_ids)
+
+        if self.archive is not None:
+            self.archive.add(f'{input_filename}{suffix}', summary)
+            return output_file_path
+
         with open(output_file_path, 'w', encoding='utf-8') as outfile:
-            for sentence_id in summary_sentence_ids:
-                data = self.sentences_dict[sentence_id]
-                doc_id = data.get('doc_id', 'unknown')
-                wdcount = data.get('wdcount', '0')
-                num = data.get('num', '0')
-                sentence_text = data.get('sentence_text', '')
-                # Write sentence in original tag format
-                outfile.write(f'<s doc_id="{doc_id}" num="{num}" wdcount="{wdcount}"> {sentence_text}</s>\n')
+            outfile.write(summary)
         
         print(f"\nTop {len(summary_sentence_ids)} sentences written to {output_file_path}")
         return output_file_path
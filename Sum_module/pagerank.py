@@ -1,59 +1,388 @@
 # Sum_module/pagerank.py
 # This module defines the PageRankCalculator class to compute PageRank scores based on a connection matrix
+import time
 import numpy as np
 
+from Sum_module import tracing
+from Sum_module.lazy_sparse import issparse
+
+DANGLING_MODES = ('drop', 'uniform')
+SOLVERS = ('power', 'direct', 'extrapolation', 'auto')
+# 'auto' picks the direct solver for small, sparse graphs only. A dense solve grows as n^3
+# (measured: ~0.5 ms at 100 nodes, ~1.5 ms at 250, ~40 ms at 1000), while sparse DUC sentence
+# graphs mix slowly (iterative solvers run to max_iterations, ~2 ms at 200 nodes) and graphs
+# above a few percent density converge in ~10-15 extrapolated iterations (~1-5 ms at 1000 nodes)
+DIRECT_SOLVER_MAX_NODES = 250
+DIRECT_SOLVER_MAX_DENSITY = 0.05
+# Largest graph the direct solver factorizes densely; larger ones use sparse LU
+DENSE_SOLVE_MAX_NODES = 1000
+
 class PageRankCalculator:
-    def __init__(self, connection_matrix, damping=0.85, max_iterations=100, tolerance=1e-6):
+    def __init__(self, connection_matrix, damping=0.85, max_iterations=100, tolerance=1e-6,
+                 dtype=np.float64, dangling='drop', solver='power',
+                 extrapolation_interval=10, verbose=True, top_k=None, stable_iterations=10,
+                 top_k_order=True):
         """
         Initialize the PageRank calculator.
-        
+
         Args:
-            connection_matrix (np.ndarray or list of lists): Adjacency or connection matrix (square).
+            connection_matrix (np.ndarray, list of lists or scipy.sparse matrix): Adjacency or connection matrix (square).
             damping (float): Damping factor, usually 0.85.
             max_iterations (int): Maximum number of iterations to run PageRank.
             tolerance (float): Threshold for convergence (L1 norm difference).
+            dtype (np.dtype): Float type of the transition matrix and scores (np.float64 or np.float32).
+            dangling (str): Handling of nodes without outgoing connections: 'drop' lets their rank
+                            leave the graph (original behaviour), 'uniform' spreads it over all nodes.
+            solver (str): 'power' (power iteration), 'direct' (linear solve of (I - d T^T) x = (1 - d) / n),
+                          'extrapolation' (power iteration with periodic geometric extrapolation)
+                          or 'auto' to pick the cheapest one for the graph.
+            extrapolation_interval (int): Iterations between two extrapolation steps.
+            verbose (bool): Print a message when an iterative solver converges.
+            top_k (int): If set, iterative solvers also stop once the set and order of the top_k
+                         nodes can no longer change, instead of waiting for the L1 tolerance.
+            stable_iterations (int): Number of consecutive iterations the top_k ranking must stay
+                                     unchanged to stop early (a heuristic: near-ties can still swap later).
+                                     None disables this test, leaving only the exact gap test.
+            top_k_order (bool): The gap test also requires the order inside the top_k to be final,
+                                not only the set.
         """
-        self.connection_matrix = np.array(connection_matrix, dtype=float)
+        if dangling not in DANGLING_MODES:
+            raise ValueError(f"Unknown dangling mode '{dangling}', expected one of {DANGLING_MODES}")
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver '{solver}', expected one of {SOLVERS}")
+        if issparse(connection_matrix):
+            import scipy.sparse as sp
+            self.connection_matrix = sp.csr_matrix(connection_matrix, dtype=dtype)
+        else:
+            self.connection_matrix = np.array(connection_matrix, dtype=dtype)
         self.damping = damping
         self.max_iterations = max_iterations
         self.tolerance = tolerance
+        self.dtype = dtype
+        self.dangling = dangling
+        self.solver = solver
+        self.extrapolation_interval = extrapolation_interval
+        self.verbose = verbose
+        self.top_k = top_k
+        self.stable_iterations = stable_iterations
+        self.top_k_order = top_k_order
+        self.telemetry = None
+        self.batch_telemetry = None
         self.num_nodes = self.connection_matrix.shape[0]
         self.transition_matrix = self._build_transition_matrix()
-        self.pagerank_scores = np.ones(self.num_nodes)  # Initial scores
+        # Transpose computed once and reused by every iteration
+        if issparse(self.transition_matrix):
+            self.transition_matrix_T = self.transition_matrix.T.tocsr()
+        else:
+            self.transition_matrix_T = np.ascontiguousarray(self.transition_matrix.T)
+        self.pagerank_scores = np.ones(self.num_nodes, dtype=dtype)  # Initial scores
 
     def _build_transition_matrix(self):
         """Build the stochastic transition matrix from the connection matrix."""
-        row_sums = np.sum(self.connection_matrix>0, axis=1)
-        # Count row_sums by if the connection_matrix [i,:]>0 then row_sums +1 
-    
-        # row_sums = np.zeros(self.num_nodes, dtype=int)
-        # for i in range(self.num_nodes):
-        #     for j in range(self.num_nodes):
-        #         if self.connection_matrix[i, j] > 0:
-        #             row_sums[i] += 1
-        
-        transition = np.zeros_like(self.connection_matrix, dtype=float)
-
-        for i in range(self.num_nodes):
-            if row_sums[i] > 0:
-                transition[i, :] = self.connection_matrix[i, :] / row_sums[i]
-            # If a row sums to zero, that row remains zero (dangling node)
-        #
-        return transition
-
-    def calculator(self):
+        # Each row is divided by its number of connections (entries > 0)
+        if issparse(self.connection_matrix):
+            row_sums = np.diff((self.connection_matrix > 0).tocsr().indptr)
+            self.dangling_nodes = row_sums == 0
+            transition = self.connection_matrix.copy()
+            row_lengths = np.diff(transition.indptr)
+            divisors = np.repeat(np.where(self.dangling_nodes, 1, row_sums), row_lengths)
+            transition.data = np.where(np.repeat(self.dangling_nodes, row_lengths), 0, transition.data / divisors)
+            transition.data = transition.data.astype(self.dtype, copy=False)
+            transition.eliminate_zeros()
+            return transition
+
+        row_sums = np.sum(self.connection_matrix > 0, axis=1)
+        self.dangling_nodes = row_sums == 0
+        transition = self.connection_matrix / np.where(self.dangling_nodes, 1, row_sums)[:, None]
+        # If a row has no connection, that row remains zero (dangling node)
+        transition[self.dangling_nodes, :] = 0
+        return transition.astype(self.dtype, copy=False)
+
+    def _step(self, scores):
+        """Compute one PageRank update from the current scores."""
+        propagated = self.transition_matrix_T @ scores
+        if self.dangling == 'uniform':
+            propagated = propagated + scores[self.dangling_nodes].sum() / self.num_nodes
+        return (1 - self.damping) / self.num_nodes + self.damping * propagated
+
+    def choose_solver(self):
+        """
+        Resolve the solver name, picking one for the graph when solver='auto'.
+
+        Graphs of at most DIRECT_SOLVER_MAX_NODES nodes and DIRECT_SOLVER_MAX_DENSITY density
+        (edges / n^2) are solved directly with a dense solve, which beats the ~100 iterations
+        such sparse graphs need. Every other graph uses the extrapolated power iteration: the
+        dense solve grows as n^3 and sparse LU factorization suffers heavy fill-in on sentence
+        graphs, while a sparse matrix-vector product stays cheap.
+        """
+        if self.solver != 'auto':
+            return self.solver
+        n = self.num_nodes
+        edges = self.connection_matrix.nnz if issparse(self.connection_matrix) else np.count_nonzero(self.connection_matrix)
+        if n <= DIRECT_SOLVER_MAX_NODES and edges <= DIRECT_SOLVER_MAX_DENSITY * n * n:
+            return 'direct'
+        return 'extrapolation'
+
+    def calculator(self, return_telemetry=False, initial_scores=None):
         """
         Run the PageRank algorithm until convergence or max iterations.
 
+        Args:
+            return_telemetry (bool): Also return the telemetry dict.
+            initial_scores (np.ndarray): Starting scores of the iterative solvers instead of ones,
+                                         e.g. the scores of a similar graph (warm start).
+
         Returns:
-            np.ndarray: Final PageRank scores.
+            np.ndarray: Final PageRank scores, or (scores, telemetry) if return_telemetry is True.
+            The telemetry (also kept in self.telemetry) holds the solver used, the number of
+            iterations, the residual (L1 norm) of each iteration, the wall time in seconds,
+            whether the solver converged, why it stopped ('tolerance', 'top_k_stable', 'top_k_gap',
+            'solved' or 'max_iterations') and, after a top_k early exit, an estimate of the
+            iterations saved compared with running to the tolerance.
         """
-        for iteration in range(self.max_iterations):
-            new_scores = (1 - self.damping) / self.num_nodes + self.damping * self.transition_matrix.T @ self.pagerank_scores
+        solver = self.choose_solver()
+        if initial_scores is not None:
+            initial_scores = np.array(initial_scores, dtype=self.dtype)
+            if initial_scores.shape != (self.num_nodes,):
+                raise ValueError(f"initial_scores must have shape ({self.num_nodes},), got {initial_scores.shape}")
+            self.pagerank_scores = initial_scores
+        start_time = time.perf_counter()
+        self._ranking_state = {"ranking": None, "stable": 0}
+        with tracing.span('pagerank') as span:
+            span.inputs(graph=self.connection_matrix)
+            scores, iterations, residuals, stop_reason = getattr(self, f'_solve_{solver}')()
+            span.outputs(iterations=iterations)
+        wall_time = time.perf_counter() - start_time
+        converged = stop_reason != 'max_iterations'
+
+        self.pagerank_scores = scores
+        self.telemetry = {
+            "solver": solver,
+            "iterations": iterations,
+            "residuals": residuals,
+            "wall_time": wall_time,
+            "converged": converged,
+            "stop_reason": stop_reason,
+            "iterations_saved": self._estimate_iterations_saved(residuals) if stop_reason.startswith('top_k') else 0
+        }
+        if self.verbose and converged and solver != 'direct':
+            print(f"PageRank converged after {iterations} iterations.")
+        if return_telemetry:
+            return scores, self.telemetry
+        return scores
+
+    def batch_calculator(self, dampings=None, teleports=None):
+        """
+        Run power iteration for several damping factors and/or teleport vectors at once.
+        All variants are iterated together as one sparse-matrix x dense-matrix product,
+        so k variants cost one pass over the transition matrix per iteration.
+
+        Args:
+            dampings (float or list of float): Damping factors, defaults to self.damping.
+            teleports (np.ndarray): Teleport vectors of shape (n,) or (n, k), each summing to 1
+                                    (e.g. position- or query-biased). Defaults to uniform 1 / n.
+                                    A single damping factor or teleport vector is shared by all variants.
+
+        Returns:
+            np.ndarray: PageRank scores of shape (n, k), one column per variant. With the uniform
+            teleport each column equals calculator() run with that damping factor and solver='power'.
+            The per-variant iterations and convergence flags and the wall time are kept in
+            self.batch_telemetry; self.telemetry keeps describing the last calculator() run.
+        """
+        n = self.num_nodes
+        dampings = np.atleast_1d(np.asarray(self.damping if dampings is None else dampings, dtype=float))
+        if teleports is not None:
+            teleports = np.asarray(teleports, dtype=self.dtype)
+            if teleports.ndim == 1:
+                teleports = teleports[:, None]
+            if teleports.shape[0] != n:
+                raise ValueError(f"teleports must have {n} rows, got {teleports.shape[0]}")
+        num_teleports = 1 if teleports is None else teleports.shape[1]
+        k = max(len(dampings), num_teleports)
+        if len(dampings) not in (1, k) or num_teleports not in (1, k):
+            raise ValueError("dampings and teleports must have the same number of variants, or one of them a single one")
+
+        dampings = np.broadcast_to(dampings, (k,)).astype(self.dtype)
+        if teleports is None:
+            # Same constant as the single-vector update, (1 - d) / n
+            restart = np.broadcast_to((1 - dampings) / n, (n, k))
+        else:
+            restart = (1 - dampings) * np.broadcast_to(teleports, (n, k))
 
-            if np.linalg.norm(new_scores - self.pagerank_scores, ord=1) < self.tolerance:
-                print(f"PageRank converged after {iteration + 1} iterations.")
+        scores = np.ones((n, k), dtype=self.dtype)
+        active = np.ones(k, dtype=bool)
+        iterations = np.zeros(k, dtype=int)
+        start_time = time.perf_counter()
+        for iteration in range(self.max_iterations):
+            columns = np.flatnonzero(active)
+            if len(columns) == 0:
                 break
-            self.pagerank_scores = new_scores
+            current = scores[:, columns]
+            propagated = self.transition_matrix_T @ current
+            if self.dangling == 'uniform':
+                propagated = propagated + current[self.dangling_nodes].sum(axis=0) / n
+            new_scores = restart[:, columns] + dampings[columns] * propagated
+            residuals = np.abs(new_scores - current).sum(axis=0)
+            converged = residuals < self.tolerance
+            # As in calculator(), a converged variant keeps the scores before its last update
+            scores[:, columns[~converged]] = new_scores[:, ~converged]
+            iterations[columns] = iteration + 1
+            active[columns[converged]] = False
+
+        self.batch_telemetry = {
+            "solver": "batch_power",
+            "iterations": iterations.tolist(),
+            "wall_time": time.perf_counter() - start_time,
+            "converged": (~active).tolist()
+        }
+        if self.verbose and not active.any():
+            print(f"Batched PageRank converged after {iterations.max()} iterations for {k} variants.")
+        return scores
+
+    def _solve_power(self):
+        """Plain power iteration, stopping when the L1 change falls below the tolerance."""
+        scores = self.pagerank_scores
+        residuals = []
+        for iteration in range(self.max_iterations):
+            new_scores = self._step(scores)
+            residual = float(np.linalg.norm(new_scores - scores, ord=1))
+            residuals.append(residual)
+            if residual < self.tolerance:
+                return scores, iteration + 1, residuals, 'tolerance'
+            stop_reason = self._top_k_stop(new_scores, residual)
+            if stop_reason:
+                return new_scores, iteration + 1, residuals, stop_reason
+            scores = new_scores
+        return scores, self.max_iterations, residuals, 'max_iterations'
+
+    def _solve_extrapolation(self):
+        """
+        Power iteration accelerated by geometric extrapolation: while the error shrinks by a
+        steady ratio r per step, the remaining change r / (1 - r) * delta is added in one go
+        every extrapolation_interval iterations. The jump is kept only if the residual at the
+        extrapolated point is smaller than a plain step would give.
+        """
+        scores = self.pagerank_scores
+        residuals = []
+        previous_residual = None
+        previous_ratio = None
+        for iteration in range(self.max_iterations):
+            new_scores = self._step(scores)
+            delta = new_scores - scores
+            residual = float(np.linalg.norm(delta, ord=1))
+            residuals.append(residual)
+            if residual < self.tolerance:
+                return new_scores, iteration + 1, residuals, 'tolerance'
+            stop_reason = self._top_k_stop(new_scores, residual)
+            if stop_reason:
+                return new_scores, iteration + 1, residuals, stop_reason
+
+            ratio = residual / previous_residual if previous_residual else None
+            steady = ratio is not None and previous_ratio is not None and abs(ratio - previous_ratio) < 0.01
+            if steady and 0 < ratio < 1 and (iteration + 1) % self.extrapolation_interval == 0:
+                extrapolated = new_scores + (ratio / (1 - ratio)) * delta
+                extrapolated_residual = float(np.linalg.norm(self._step(extrapolated) - extrapolated, ord=1))
+                if extrapolated_residual < ratio * residual:
+                    new_scores = extrapolated
+            previous_residual = residual
+            previous_ratio = ratio
+            scores = new_scores
+        return scores, self.max_iterations, residuals, 'max_iterations'
+
+    def _linear_system(self):
+        """Return the sparse system matrix A = I - d T^T and the right-hand side b."""
+        import scipy.sparse as sp
+        transition_T = sp.csr_matrix(self.transition_matrix_T)
+        identity = sp.identity(self.num_nodes, dtype=self.dtype, format='csr')
+        system = (identity - self.damping * transition_T).tocsr()
+        rhs = np.full(self.num_nodes, (1 - self.damping) / self.num_nodes, dtype=self.dtype)
+        return system, rhs
+
+    def _dangling_correction(self, scores):
+        """Rank spread by dangling nodes in 'uniform' mode, added to every node."""
+        if self.dangling != 'uniform':
+            return 0.0
+        return self.damping * scores[self.dangling_nodes].sum() / self.num_nodes
+
+    def _solve_direct(self):
+        """
+        Solve (I - d T^T) x = (1 - d) / n directly: a dense solve for small graphs, sparse LU
+        otherwise. In 'uniform' dangling mode the rank-one dangling term is added with the
+        Sherman-Morrison formula.
+        """
+        system, rhs = self._linear_system()
+        rhs_columns = np.column_stack([rhs, np.ones(self.num_nodes, dtype=self.dtype)])
+        if self.num_nodes <= DENSE_SOLVE_MAX_NODES:
+            solutions = np.linalg.solve(system.toarray(), rhs_columns)
+        else:
+            from scipy.sparse.linalg import spsolve
+            solutions = spsolve(system.tocsc(), rhs_columns)
+            solutions = np.asarray(solutions.toarray() if issparse(solutions) else solutions)
+        scores = solutions[:, 0]
+        if self.dangling == 'uniform':
+            ones_solution = solutions[:, 1]
+            weight = self.damping / self.num_nodes
+            scores = scores + (weight * scores[self.dangling_nodes].sum()
+                               / (1 - weight * ones_solution[self.dangling_nodes].sum())) * ones_solution
+        scores = scores.astype(self.dtype, copy=False)
+        residual = float(np.linalg.norm(system @ scores - rhs - self._dangling_correction(scores), ord=1))
+        return scores, 1, [residual], 'solved'
+
+    def _contraction_factor(self):
+        """
+        L1 contraction factor c of one PageRank step: d times the largest row sum of the
+        transition matrix (plus the dangling spread in 'uniform' mode). Values >= 1 give no bound.
+        """
+        if issparse(self.transition_matrix):
+            row_sums = np.asarray(abs(self.transition_matrix).sum(axis=1)).ravel()
+        else:
+            row_sums = np.abs(self.transition_matrix).sum(axis=1)
+        if self.dangling == 'uniform':
+            row_sums = np.where(self.dangling_nodes, 1.0, row_sums)
+        return self.damping * (row_sums.max() if len(row_sums) else 0.0)
+
+    def _top_k_stop(self, scores, residual):
+        """
+        Check whether the top_k ranking is final after the step that produced scores.
+
+        Returns 'top_k_stable' once the ranking was unchanged for stable_iterations iterations,
+        'top_k_gap' once the gap between the k-th and (k+1)-th score (and, with top_k_order, every
+        gap inside the top_k) exceeds twice the distance to the fixed point, which is bounded by
+        c / (1 - c) * residual, or None.
+        """
+        if not self.top_k:
+            return None
+        k = min(self.top_k, self.num_nodes)
+        # Same order as Summarizer: descending scores, ties by sentence id
+        order = np.argsort(-scores, kind='stable')
+        ranking = order[:k]
+        state = self._ranking_state
+        if state["ranking"] is not None and np.array_equal(ranking, state["ranking"]):
+            state["stable"] += 1
+        else:
+            state["stable"] = 0
+        state["ranking"] = ranking
+        if self.stable_iterations is not None and state["stable"] >= self.stable_iterations:
+            return 'top_k_stable'
+
+        if residual is not None and k < self.num_nodes:
+            if "contraction" not in state:
+                state["contraction"] = self._contraction_factor()
+            contraction = state["contraction"]
+            if contraction < 1:
+                bound = contraction / (1 - contraction) * residual
+                top_scores = scores[order[:k + 1]]
+                gaps = top_scores[:-1] - top_scores[1:]
+                if (gaps.min() if self.top_k_order else gaps[-1]) > 2 * bound:
+                    return 'top_k_gap'
+        return None
 
-        return self.pagerank_scores
+    def _estimate_iterations_saved(self, residuals):
+        """Estimate the iterations still needed to reach the tolerance from the residual decay rate."""
+        if len(residuals) < 2 or residuals[-2] <= 0:
+            return 0
+        ratio = residuals[-1] / residuals[-2]
+        if not 0 < ratio < 1 or residuals[-1] < self.tolerance:
+            return 0
+        remaining = int(np.ceil(np.log(self.tolerance / residuals[-1]) / np.log(ratio)))
+        return max(0, min(remaining, self.max_iterations - len(residuals)))
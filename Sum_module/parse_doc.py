@@ -1,63 +1,135 @@
 import re
 
+from Sum_module import tracing
+
+SENTENCE_PATTERN = r'<s\s+docid="([^"]+)"\s+num="([^"]+)"\s+wdcount="([^"]+)">\s*(.*?)\s*</s>'
+SENTENCE_REGEX = re.compile(SENTENCE_PATTERN, re.DOTALL)
+SENTENCE_REGEX_BYTES = re.compile(SENTENCE_PATTERN.encode('utf-8'), re.DOTALL)
+CHUNK_SIZE = 1 << 20
+
+
+def min_word_count_filter(record):
+    """Keep sentences with more than 4 words (the parse_doc_min_word_count rule)."""
+    return record["wdcount"] > 4
+
+
+def _make_record(doc_id, num, wdcount, sentence_text):
+    return {
+        "doc_id": doc_id,
+        "num": num,
+        "wdcount": int(wdcount),
+        "sentence_text": sentence_text.strip()
+    }
+
+
 class ParseDoc:
     def __init__(self,doc_file):
         self.doc_file = doc_file
 
+    @staticmethod
+    def iter_sentences(source, chunk_size=CHUNK_SIZE):
+        """
+        Lazily yield the sentence records of a document in a single pass.
+
+        Args:
+            source: The document content as str, bytes or mmap, or a file object
+                    (text or binary) that is read in chunks of chunk_size.
+
+        Yields:
+            dict: {"doc_id", "num", "wdcount", "sentence_text"} for each sentence, in document order.
+        """
+        if isinstance(source, str):
+            for match in SENTENCE_REGEX.finditer(source):
+                yield _make_record(*match.groups())
+            return
+        if not hasattr(source, 'read') or hasattr(source, 'find'):
+            # bytes, bytearray or mmap
+            for match in SENTENCE_REGEX_BYTES.finditer(source):
+                yield _make_record(*(group.decode('utf-8') for group in match.groups()))
+            return
+
+        # File object: only scan up to the last closing tag of the buffer. A match starting
+        # before it also ends before it, so matches never straddle two scans.
+        buffer = None
+        while True:
+            chunk = source.read(chunk_size)
+            if buffer is None:
+                buffer = chunk[:0]
+            end_of_file = not chunk
+            buffer += chunk
+            is_text = isinstance(buffer, str)
+            closing_tag = '</s>' if is_text else b'</s>'
+            cut = len(buffer) if end_of_file else buffer.rfind(closing_tag) + len(closing_tag)
+            if cut >= len(closing_tag) or end_of_file:
+                for record in ParseDoc.iter_sentences(buffer[:cut]):
+                    yield record
+                buffer = buffer[cut:]
+            if end_of_file:
+                return
+
+    @staticmethod
+    def parse_views(source, filters):
+        """
+        Build several filtered sentence dictionaries from one scan of the document.
+
+        Args:
+            source: Anything accepted by iter_sentences.
+            filters (dict): view name -> predicate on a sentence record, or None to keep every sentence.
+
+        Returns:
+            dict: view name -> {sentence_id: metadata}, sentence ids numbered from 0 within each view.
+                  Every view holds its own copy of the metadata dicts, so editing one view
+                  (e.g. adding a field) does not change the others.
+        """
+        views = {name: {} for name in filters}
+        for record in ParseDoc.iter_sentences(source):
+            shared = True
+            for name, predicate in filters.items():
+                if predicate is None or predicate(record):
+                    view = views[name]
+                    # The first view takes the record, later ones a copy
+                    view[len(view)] = record if shared else dict(record)
+                    shared = False
+        return views
+
+    @staticmethod
+    def parse_table(source):
+        """
+        Parse the document into a columnar SentenceTable instead of a dict of dicts.
+
+        Args:
+            source: Anything accepted by iter_sentences.
+
+        Returns:
+            SentenceTable: All sentences; filtered views are taken with SentenceTable.view.
+        """
+        from Sum_module.sentence_table import SentenceTable
+        with tracing.span('parse.table') as span:
+            table = SentenceTable.from_records(ParseDoc.iter_sentences(source))
+            span.outputs(sentences=table)
+        return table
+
     # Create a dictionary save all the metadata of sentences
     def parse_doc (doc_file):
         """
         Parse the document file and extract sentences metadata.
-        
+
         Args:
             doc_file (str): The content of the document file.
-            
+
         Returns:
             dict: A dictionary with sentence_id as keys and metadata as values.
         """
-        sentences_dict = {}
-        # Create unique sentence_id
-        # Initialize sentence_id to 0
-        sentence_id = 0
-
-        # Find all sentences tags and their content in the document
-        sentence_matches = re.findall(r'<s\s+docid="([^"]+)"\s+num="([^"]+)"\s+wdcount="([^"]+)">\s*(.*?)\s*</s>', doc_file, re.DOTALL)
-
-        for doc_id, num, wdcount, sentence_text in sentence_matches:
-            #  if int(wdcount) > 4:
-                sentences_dict[sentence_id] = {
-                    "doc_id": doc_id,
-                    "num": num,
-                    "wdcount": int(wdcount),
-                    "sentence_text": sentence_text.strip()
-                }
-                sentence_id += 1    
-        return sentences_dict
+        return ParseDoc.parse_views(doc_file, {"full": None})["full"]
+
     def parse_doc_min_word_count (doc_file):
         """
         Parse the document file and extract sentences metadata.
-        
+
         Args:
             doc_file (str): The content of the document file.
-            
+
         Returns:
             dict: A dictionary with sentence_id as keys and metadata as values.
         """
-        sentences_dict = {}
-        # Create unique sentence_id
-        # Initialize sentence_id to 0
-        sentence_id = 0
-
-        # Find all sentences tags and their content in the document
-        sentence_matches = re.findall(r'<s\s+docid="([^"]+)"\s+num="([^"]+)"\s+wdcount="([^"]+)">\s*(.*?)\s*</s>', doc_file, re.DOTALL)
-
-        for doc_id, num, wdcount, sentence_text in sentence_matches:
-             if int(wdcount) > 4:
-                sentences_dict[sentence_id] = {
-                    "doc_id": doc_id,
-                    "num": num,
-                    "wdcount": int(wdcount),
-                    "sentence_text": sentence_text.strip()
-                }
-                sentence_id += 1    
-        return sentences_dict
\ No newline at end of file
+        return ParseDoc.parse_views(doc_file, {"min_word_count": min_word_count_filter})["min_word_count"]
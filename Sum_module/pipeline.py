@@ -0,0 +1,324 @@
+# Sum_module/pipeline.py
+# This module defines the Pipeline class: the FileReader -> ParseDoc -> Preprocessor ->
+# (ConnectionMatrix | TFIDFVectorizer + CosineSimilarityConnector) -> PageRankCalculator ->
+# Summarizer -> OutputWriter / Evaluator chain as a dependency graph of lazy, memoized stages.
+import copy
+import json
+import os
+
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.vocabulary import Vocabulary
+from Sum_module import tracing
+
+DEFAULT_CONFIG = {
+    "run": "commonwords",
+    "data": {"text_dir": os.path.join('Data', 'DUC_TEXT', 'test'), "reference_dir": os.path.join('Data', 'DUC_SUM')},
+    # min_word_count: keep only sentences with more than 4 words (ParseDoc.parse_doc_min_word_count)
+    "parse": {"min_word_count": False},
+    "preprocess": {"use_lemmatizer": True, "language": "english", "lemmatizer_backend": "wordnet"},
+    "tfidf": {"sparse": True},
+    # method: 'common_words' (ConnectionMatrix) or 'cosine' (TF-IDF + CosineSimilarityConnector)
+    "graph": {"method": "common_words", "min_common_words": 4, "threshold": 0.2, "weighted": False},
+    "pagerank": {},
+    # length_from: 'sentences' sizes the summary on the parsed sentences, 'full' on all
+    # sentences of the document (Summarizer vs summarizer_1.Summarizer)
+    "summarizer": {"top_percent": 0.1, "length_from": "sentences"},
+    "output": {"output_dir": "output", "suffix": "_commonwords"},
+}
+
+# Settings of the driver scripts
+PRESETS = {
+    "commonwords": {
+        "run": "commonwords_test",
+        "graph": {"method": "common_words", "min_common_words": 4},
+        "output": {"suffix": "_commonwords_test"},
+    },
+    "cosine": {
+        "run": "cosine_16",
+        "parse": {"min_word_count": True},
+        "graph": {"method": "cosine", "threshold": 0.2, "weighted": False},
+        "output": {"suffix": "_cosine"},
+    },
+    "cosine_w": {
+        "run": "cosine_w_new",
+        "parse": {"min_word_count": True},
+        "graph": {"method": "cosine", "threshold": 0.0, "weighted": True},
+        "summarizer": {"length_from": "full"},
+        "output": {"suffix": "_cosine_w_new"},
+    },
+}
+
+# stage -> (config sections it reads, upstream stages). The graph stage depends on
+# 'tfidf' or 'token_ids' according to graph.method, see Pipeline.dependencies. 'scores' are the
+# PageRank scores of the graph; 'top_scores' only need the summary sentences to be final (top_k
+# early exit) and reuse the scores of the same graph when they are memoized, see _stage_top_scores.
+STAGES = {
+    "document": (("data",), ()),
+    "full_sentences": ((), ("document",)),
+    "sentences": (("parse",), ("full_sentences",)),
+    "token_ids": (("preprocess",), ("document", "sentences")),
+    "tfidf": (("tfidf",), ("document", "token_ids")),
+    "graph": (("graph",), ("document",)),
+    "scores": (("pagerank",), ("graph",)),
+    "top_scores": (("pagerank", "summarizer"), ("full_sentences", "graph")),
+    "summarizer": (("summarizer",), ("full_sentences", "sentences", "top_scores")),
+    "reference": (("data",), ()),
+    "evaluation": ((), ("sentences", "summarizer", "reference")),
+}
+GRAPH_METHODS = ('common_words', 'cosine')
+
+
+def merge_config(base, overrides):
+    """Return base updated with overrides, merging config sections one level deep."""
+    merged = copy.deepcopy(base)
+    for section, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(section), dict):
+            merged[section].update(value)
+        else:
+            merged[section] = value
+    return merged
+
+
+def summary_length(summarizer_config, num_sentences, num_full_sentences):
+    """Number of sentences picked by the Summarizer selected by a summarizer config section."""
+    base = num_full_sentences if summarizer_config["length_from"] == "full" else num_sentences
+    return max(1, int(summarizer_config["top_percent"] * base))
+
+
+def pagerank_options(config, num_sentences, num_full_sentences):
+    """
+    PageRankCalculator options of a config: its pagerank section, plus a top_k equal to the
+    summary length. Only the summary sentences and their order are used, so PageRank may stop
+    as soon as they are final (pagerank={'top_k': None} runs to the tolerance). The top_k_stable
+    heuristic stays off unless stable_iterations is set: on the DUC graphs it picks other
+    sentences than a full run for ~10% of the clusters, the gap test never does.
+    """
+    options = dict(config["pagerank"])
+    options.setdefault("top_k", summary_length(config["summarizer"], num_sentences, num_full_sentences))
+    options.setdefault("stable_iterations", None)
+    return options
+
+
+def make_summarizer(summarizer_config, sentences, full_sentences, scores):
+    """Build the Summarizer selected by a summarizer config section."""
+    if summarizer_config["length_from"] == "full":
+        from Sum_module.summarizer_1 import Summarizer as Summarizer1
+        return Summarizer1(
+            sentences_dict=sentences,
+            full_sentences_dict=full_sentences,
+            pagerank_scores=scores,
+            top_percent=summarizer_config["top_percent"]
+        )
+    from Sum_module.summarizer import Summarizer
+    return Summarizer(
+        sentences_dict=sentences,
+        pagerank_scores=scores,
+        top_percent=summarizer_config["top_percent"]
+    )
+
+
+class Pipeline:
+    def __init__(self, config=None, vocabulary=None, cache=None):
+        """
+        Initialize the Pipeline.
+
+        Args:
+            config (dict or str): Overrides of DEFAULT_CONFIG, or the name of a PRESETS entry.
+            vocabulary (Vocabulary, optional): Shared token vocabulary (one is created if missing).
+            cache (ArtifactCache, optional): Also look up token_ids, tfidf and graph on disk.
+        """
+        if isinstance(config, str):
+            config = PRESETS[config]
+        self.config = merge_config(DEFAULT_CONFIG, config)
+        if self.config["graph"]["method"] not in GRAPH_METHODS:
+            raise ValueError(f"Unknown graph method '{self.config['graph']['method']}', expected one of {GRAPH_METHODS}")
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self.cache = cache
+        self.memo = {}
+        # (file_name, scores key) -> (top_k, scores) of the largest top_k early exit so far
+        self.top_scores = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def dependencies(self, stage, config):
+        sections, upstream = STAGES[stage]
+        if stage == "graph":
+            return upstream + (("tfidf",) if config["graph"]["method"] == "cosine" else ("token_ids",))
+        return upstream
+
+    def stage_config(self, stage, config):
+        """Config sections that determine a stage's output: its own and those of every upstream stage."""
+        sections = {}
+        for section in STAGES[stage][0]:
+            sections[section] = config[section]
+        for upstream in self.dependencies(stage, config):
+            sections.update(self.stage_config(upstream, config))
+        return sections
+
+    def get(self, stage, file_name, **overrides):
+        """
+        Evaluate a stage for one cluster file, computing only the upstream stages that are not
+        memoized yet. Overrides (e.g. summarizer={'top_percent': 0.2}) select a variant; stages
+        whose config sections are unchanged are shared with the other variants.
+
+        Args:
+            stage (str): One of STAGES.
+            file_name (str): Cluster file name, e.g. 'd112h'.
+
+        Returns:
+            The stage output (text, SentenceTable, token-id dict, sparse matrix, scores,
+            Summarizer or evaluation dict).
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage '{stage}', expected one of {tuple(STAGES)}")
+        return self._get(stage, file_name, merge_config(self.config, overrides))
+
+    def _key(self, stage, file_name, config):
+        return stage, file_name, json.dumps(self.stage_config(stage, config), sort_keys=True, default=str)
+
+    def _get(self, stage, file_name, config):
+        stage_config = self.stage_config(stage, config)
+        key = self._key(stage, file_name, config)
+        if key in self.memo:
+            self.stats["hits"] += 1
+            return self.memo[key]
+        self.stats["misses"] += 1
+        inputs = {upstream: self._get(upstream, file_name, config) for upstream in self.dependencies(stage, config)}
+        with tracing.span(stage, cluster=file_name) as span:
+            span.inputs(vocabulary=len(self.vocabulary), **inputs)
+            value = getattr(self, f'_stage_{stage}')(file_name, config, inputs, stage_config)
+            span.outputs(**{stage: value})
+        self.memo[key] = value
+        return value
+
+    def release(self, file_name):
+        """Drop the memoized stages of a cluster once it is done."""
+        self.memo = {key: value for key, value in self.memo.items() if key[1] != file_name}
+        self.top_scores = {key: value for key, value in self.top_scores.items() if key[0] != file_name}
+
+    def _cached(self, stage, stage_config, document, compute, to_arrays, from_arrays):
+        if self.cache is None:
+            return compute()
+        config = {section: value for section, value in stage_config.items() if section != "data"}
+        _, arrays = self.cache.get_or_compute(stage, config, [document], lambda: to_arrays(compute()))
+        return from_arrays(arrays)
+
+    # Stages: (file_name, config, upstream outputs, stage config) -> output
+    def _stage_document(self, file_name, config, inputs, stage_config):
+        return FileReader(os.path.join(config["data"]["text_dir"], file_name)).read_file()
+
+    def _stage_full_sentences(self, file_name, config, inputs, stage_config):
+        return ParseDoc.parse_table(inputs["document"])
+
+    def _stage_sentences(self, file_name, config, inputs, stage_config):
+        full_sentences = inputs["full_sentences"]
+        if config["parse"]["min_word_count"]:
+            return full_sentences.view(full_sentences.wdcounts > 4)
+        return full_sentences
+
+    def _stage_token_ids(self, file_name, config, inputs, stage_config):
+        from Sum_module.artifact_cache import token_ids_from_arrays, token_ids_to_arrays
+        from Sum_module.preprocess import Preprocessor
+
+        def compute():
+            preprocessor = Preprocessor(**config["preprocess"])
+            return preprocessor.preprocess_dict_ids(inputs["sentences"], self.vocabulary)
+        return self._cached("preprocess", stage_config, inputs["document"], compute,
+                            lambda token_ids: token_ids_to_arrays(token_ids, self.vocabulary),
+                            lambda arrays: token_ids_from_arrays(arrays, self.vocabulary))
+
+    def _stage_tfidf(self, file_name, config, inputs, stage_config):
+        from Sum_module.artifact_cache import sparse_from_arrays, sparse_to_arrays
+        from Sum_module.tfidf_vectorizer import TFIDFVectorizer
+
+        def compute():
+            return TFIDFVectorizer(**config["tfidf"]).transform(inputs["token_ids"], self.vocabulary)[0]
+        return self._cached("tfidf", stage_config, inputs["document"], compute, sparse_to_arrays, sparse_from_arrays)
+
+    def _stage_graph(self, file_name, config, inputs, stage_config):
+        from Sum_module.artifact_cache import sparse_from_arrays, sparse_to_arrays
+        graph = config["graph"]
+
+        def compute():
+            if graph["method"] == "cosine":
+                from Sum_module.cosine_connector import CosineSimilarityConnector
+                return CosineSimilarityConnector(threshold=graph["threshold"]).create_sparse_connection_matrix(
+                    inputs["tfidf"], weighted=graph["weighted"])
+            from Sum_module.connections import ConnectionMatrix
+            return ConnectionMatrix(
+                sentences=list(inputs["token_ids"].values()),
+                min_common_words=graph["min_common_words"],
+                weighted=graph["weighted"],
+            ).create_matrix(sparse_output=True)
+        return self._cached("similarity", stage_config, inputs["document"], compute, sparse_to_arrays, sparse_from_arrays)
+
+    def _stage_scores(self, file_name, config, inputs, stage_config):
+        from Sum_module.pagerank import PageRankCalculator
+        return PageRankCalculator(inputs["graph"], **config["pagerank"]).calculator()
+
+    def _stage_top_scores(self, file_name, config, inputs, stage_config):
+        """
+        Scores whose top_k (the summary length) set and order are final. The gap test makes the
+        whole order of the top_k final, so the full scores of the graph, or an early exit at a
+        larger top_k, serve every shorter summary: summarizer variants that differ only in
+        top_percent run PageRank at most once when the longest summary is requested first.
+        """
+        from Sum_module.pagerank import PageRankCalculator
+        options = pagerank_options(config, inputs["graph"].shape[0], len(inputs["full_sentences"]))
+        scores_key = self._key("scores", file_name, config)
+        if not options["top_k"] or scores_key in self.memo or "top_k" in config["pagerank"]:
+            return self._get("scores", file_name, config)
+        top_k, scores = self.top_scores.get((file_name, scores_key), (0, None))
+        if top_k >= options["top_k"]:
+            return scores
+        scores = PageRankCalculator(inputs["graph"], **options).calculator()
+        self.top_scores[(file_name, scores_key)] = (options["top_k"], scores)
+        return scores
+
+    def _stage_summarizer(self, file_name, config, inputs, stage_config):
+        return make_summarizer(config["summarizer"], inputs["sentences"], inputs["full_sentences"], inputs["top_scores"])
+
+    def _stage_reference(self, file_name, config, inputs, stage_config):
+        return ParseDoc.parse_doc(FileReader(os.path.join(config["data"]["reference_dir"], file_name)).read_file())
+
+    def _stage_evaluation(self, file_name, config, inputs, stage_config):
+        from Sum_module.evaluation import Evaluator
+        return Evaluator(
+            sentences_dict=inputs["sentences"],
+            summary_sentence_ids=inputs["summarizer"].get_top_sentence_ids(),
+            preference_sum_dict=inputs["reference"]
+        ).evaluate()
+
+    # Actions built on the stages
+    def write_summary(self, file_name, archive=None, **overrides):
+        """
+        Write the summary of a cluster with OutputWriter (to output_dir, or into a run archive).
+
+        Returns:
+            str: The output file path.
+        """
+        from Sum_module.output_writer import OutputWriter
+        config = merge_config(self.config, overrides)
+        output_writer = OutputWriter(
+            sentences_dict=self._get("sentences", file_name, config),
+            output_dir=config["output"]["output_dir"],
+            archive=archive
+        )
+        return output_writer.write_summary(
+            summary_sentence_ids=self._get("summarizer", file_name, config).get_top_sentence_ids(),
+            input_file_path=os.path.join(config["data"]["text_dir"], file_name),
+            suffix=config["output"]["suffix"]
+        )
+
+    def record_results(self, file_name, results, **overrides):
+        """
+        Evaluate a cluster and append the metrics to a ResultsWriter under the run name.
+
+        Returns:
+            dict: The evaluation results.
+        """
+        config = merge_config(self.config, overrides)
+        evaluation_results = self._get("evaluation", file_name, config)
+        settings = {section: config[section] for section in ("parse", "graph", "pagerank", "summarizer")}
+        results.append(config["run"], file_name, evaluation_results, config=settings)
+        return evaluation_results
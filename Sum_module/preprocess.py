@@ -1,29 +1,80 @@
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+import functools
+import re
 import string
 
+from Sum_module import tracing
+
+LEMMATIZER_BACKENDS = ('wordnet', 'table')
+# Words are runs of word characters. ConnectionMatrix splits preprocessed strings with the same
+# pattern, so the string and token-id inputs of the common-words graph have the same words.
+WORD_PATTERN = re.compile(r'\b\w+\b')
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+
+def tokenize(text):
+    """
+    Split a sentence into lowercase words: ASCII punctuation is removed first (so 'U.S.' gives
+    'us'), then the remaining characters outside words, such as typographic quotes and dashes,
+    separate words.
+    """
+    return WORD_PATTERN.findall(text.translate(PUNCTUATION_TABLE).lower())
+
+
+# nltk is imported on first use and the corpora are loaded once per process,
+# so creating a Preprocessor per file is cheap
+@functools.lru_cache(maxsize=None)
+def get_stop_words(language='english'):
+    """Return the process-wide stopword set of a language."""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words(language))
+
+
+@functools.lru_cache(maxsize=None)
+def get_lemmatizer(backend='wordnet'):
+    """Return the process-wide lemmatizer of a backend ('wordnet' or 'table')."""
+    if backend == 'table':
+        # numpy is only needed by the table backend
+        from Sum_module.lemma_table import LemmaTable
+        return LemmaTable.load_or_compile()
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
 
 class Preprocessor:
-    def __init__(self, use_lemmatizer=True, language='english'):
-        self.stop_words = set(stopwords.words(language))
-        self.lemmatizer = WordNetLemmatizer() if use_lemmatizer else None
+    def __init__(self, use_lemmatizer=True, language='english', lemmatizer_backend='wordnet'):
+        """
+        lemmatizer_backend: 'wordnet' calls WordNetLemmatizer for every token, 'table' uses the
+        precompiled LemmaTable (same noun lemmas, compiled on first use if missing)
+        """
+        if lemmatizer_backend not in LEMMATIZER_BACKENDS:
+            raise ValueError(f"Unknown lemmatizer backend '{lemmatizer_backend}', expected one of {LEMMATIZER_BACKENDS}")
+        # Settings kept so that stored preprocessing output can record what produced it
+        self.config = {"use_lemmatizer": use_lemmatizer, "language": language, "lemmatizer_backend": lemmatizer_backend}
+        self.stop_words = get_stop_words(language)
+        self.lemmatizer = get_lemmatizer(lemmatizer_backend) if use_lemmatizer else None
     
-    def preprocess_text(self, text):
-        
-        # Remove punctuation
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        # Convert to lowercase
-        text = text.lower()
-        # Tokenize the text into words
-        words = text.split()
+    def preprocess_words(self, text):
+        """
+        Clean a sentence and return its processed words (no stopwords, lemmatized).
+        """
+        # Remove punctuation, convert to lowercase and tokenize the text into words
+        words = tokenize(text)
         # Remove stopwords and lemmatize words
         if self.lemmatizer:
             processed_words = [self.lemmatizer.lemmatize(word) for word in words if word not in self.stop_words]
         else:
             processed_words = [word for word in words if word not in self.stop_words]
+        return processed_words
+
+    def preprocess_text(self, text):
         # Join back to a cleaned string
-        return " ".join(processed_words)
+        return " ".join(self.preprocess_words(text))
+
+    def preprocess_ids(self, text, vocabulary):
+        """
+        Clean a sentence and return its processed words as a token-id array of the shared vocabulary.
+        """
+        return vocabulary.encode(self.preprocess_words(text))
    
     def preprocess_dict(self, sentences_dict):
         """
@@ -35,4 +86,17 @@ class Preprocessor:
 
         #Preprocess each sentence text
         processed_dict = {sid: self.preprocess_text(text) for sid, text in text_dict.items()}
-        return processed_dict
\ No newline at end of file
+        return processed_dict
+
+    def preprocess_dict_ids(self, sentences_dict, vocabulary):
+        """
+        sentences_dict: dict of sentence_id: dict containing 'sentence_text' field
+        vocabulary: Vocabulary shared by the whole run
+        Returns a dictionary mapping sentence_id to a token-id array (np.uint32)
+        """
+        with tracing.span('preprocess.ids') as span:
+            span.inputs(sentences=len(sentences_dict), vocabulary=len(vocabulary))
+            token_ids = {sid: self.preprocess_ids(data['sentence_text'], vocabulary)
+                         for sid, data in sentences_dict.items()}
+            span.outputs(token_ids=token_ids, vocabulary=len(vocabulary))
+        return token_ids
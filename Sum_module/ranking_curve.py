@@ -0,0 +1,127 @@
+# Sum_module/ranking_curve.py
+# This module defines the RankingCurve class: the PageRank ranking of a cluster is sorted
+# once, and the cumulative matched count against the reference summary gives precision,
+# recall and F1 at every cutoff, so any top_percent is evaluated without re-sorting.
+import numpy as np
+
+from Sum_module.batch_evaluation import BatchEvaluator
+
+
+class RankingCurve:
+    def __init__(self, pagerank_scores, sentences_dict, preference_sum_dict, num_sentences=None):
+        """
+        Initialize the RankingCurve.
+
+        Args:
+            pagerank_scores (list or np.ndarray): Score of each sentence of sentences_dict.
+            sentences_dict (dict or SentenceTable): Sentence metadata by sentence id.
+            preference_sum_dict (dict): Parsed reference summary.
+            num_sentences (int, optional): Number of sentences top_percent applies to: the
+                number of scores (Summarizer, default) or of all sentences (summarizer_1.Summarizer).
+        """
+        scores = np.asarray(pagerank_scores)
+        # Same order as sorted(range(n), key=score, reverse=True): ties keep increasing ids
+        self.order = np.argsort(-scores, kind='stable')
+        self.num_sentences = len(scores) if num_sentences is None else num_sentences
+        encoder = BatchEvaluator()
+        reference_codes = np.unique(encoder.encode(preference_sum_dict))
+        ranked_codes = encoder.encode(sentences_dict, self.order)
+        self.labeled = len(preference_sum_dict)
+        # matched[k - 1] is the number of reference sentences among the top k
+        self.matched = np.cumsum(np.isin(ranked_codes, reference_codes))
+
+    @classmethod
+    def from_pipeline(cls, pipeline, file_name):
+        """
+        Build the curve of a cluster from a Pipeline's memoized scores, sentences and reference.
+        The whole ranking is used, so the curve takes the full 'scores' stage rather than the
+        'top_scores' of the summaries (which then reuse them).
+        """
+        num_sentences = None
+        if pipeline.config["summarizer"]["length_from"] == "full":
+            num_sentences = len(pipeline.get('full_sentences', file_name))
+        # 'scores' run to the tolerance unless the pagerank section itself sets a top_k
+        overrides = {"pagerank": {"top_k": None}} if pipeline.config["pagerank"].get("top_k") else {}
+        return cls(pipeline.get('scores', file_name, **overrides), pipeline.get('sentences', file_name),
+                   pipeline.get('reference', file_name), num_sentences=num_sentences)
+
+    def cutoffs(self, top_percents):
+        """Number of selected sentences for each top_percent, as in Summarizer.get_top_sentence_ids."""
+        top_n = np.maximum(1, (np.asarray(top_percents, dtype=float) * self.num_sentences).astype(int))
+        return np.minimum(top_n, len(self.order))
+
+    def curve(self, cutoffs=None):
+        """
+        Precision, recall and F1 (in %, unrounded) at each cutoff.
+
+        Args:
+            cutoffs (np.ndarray, optional): Numbers of top sentences, defaults to 1..n.
+
+        Returns:
+            dict: {"cutoff", "matched", "precision", "recall", "f1"} as np.ndarray.
+        """
+        cutoffs = np.arange(1, len(self.order) + 1) if cutoffs is None else np.asarray(cutoffs, dtype=int)
+        matched = self.matched[cutoffs - 1].astype(float) if len(self.order) else np.zeros(len(cutoffs))
+        # Zero denominators (no reference sentences, or an empty cluster whose cutoffs are all 0)
+        # give 0, as in Evaluator
+        with np.errstate(divide='ignore', invalid='ignore'):
+            recall = np.where(self.labeled > 0, matched / self.labeled * 100, 0.0)
+            precision = np.where(cutoffs > 0, matched / cutoffs * 100, 0.0)
+            f1 = np.where(recall + precision > 0, 2 * recall * precision / (recall + precision), 0.0)
+        return {"cutoff": cutoffs, "matched": matched, "precision": precision, "recall": recall, "f1": f1}
+
+    def evaluate(self, top_percent):
+        """
+        Metrics for one top_percent, equal to Evaluator.evaluate on the Summarizer's selection.
+        """
+        point = self.curve(self.cutoffs([top_percent]))
+        return {
+            "labeled": self.labeled,
+            "extracted": int(point["cutoff"][0]),
+            "matched": int(point["matched"][0]),
+            "recall": round(float(point["recall"][0]), 2),
+            "precision": round(float(point["precision"][0]), 2),
+            "f1": round(float(point["f1"][0]), 2)
+        }
+
+
+def best_cutoff(curves, top_percents=None, metric='f1'):
+    """
+    Pick the top_percent with the best mean metric over a corpus of clusters.
+
+    Args:
+        curves (list[RankingCurve]): One curve per cluster.
+        top_percents (np.ndarray, optional): Candidates, defaults to 1%, 2%, ..., 50%.
+        metric (str): 'f1', 'precision' or 'recall'.
+
+    Returns:
+        dict: {"top_percent": best value, "mean": its mean metric,
+               "top_percents": candidates, "means": mean metric of each candidate}
+    """
+    if not curves:
+        raise ValueError("best_cutoff needs at least one curve")
+    top_percents = np.round(np.arange(0.01, 0.51, 0.01), 2) if top_percents is None else np.asarray(top_percents)
+    values = np.array([curve.curve(curve.cutoffs(top_percents))[metric] for curve in curves])
+    means = values.mean(axis=0)
+    best = int(np.argmax(means))
+    return {"top_percent": float(top_percents[best]), "mean": round(float(means[best]), 2),
+            "top_percents": top_percents, "means": means}
+
+
+# Best top_percent of each driver configuration over the test clusters:
+if __name__ == "__main__":
+    import os
+    from Sum_module.pipeline import Pipeline, merge_config, PRESETS
+
+    test_dir = os.path.join('Data', 'DUC_TEXT', 'test')
+    file_names = sorted(f for f in os.listdir(test_dir) if os.path.isfile(os.path.join(test_dir, f)))
+    for preset in ('commonwords', 'cosine', 'cosine_w'):
+        pipeline = Pipeline(merge_config(PRESETS[preset], {"pagerank": {"verbose": False}}))
+        curves = []
+        for file_name in file_names:
+            curves.append(RankingCurve.from_pipeline(pipeline, file_name))
+            pipeline.release(file_name)
+        best = best_cutoff(curves)
+        current = best["means"][np.argmin(np.abs(best["top_percents"] - pipeline.config["summarizer"]["top_percent"]))]
+        print(f"{preset}: best top_percent {best['top_percent']:.2f} (mean f1 {best['mean']:.2f}), "
+              f"current {pipeline.config['summarizer']['top_percent']:.2f} (mean f1 {current:.2f})")
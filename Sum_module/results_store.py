@@ -0,0 +1,224 @@
+# Sum_module/results_store.py
+# This module defines the append-only evaluation results store: ResultsWriter appends one
+# JSON line per (run, file) in batches, safely from several processes, and ResultsReader
+# queries the records by run, file and metric (replacing the rewritten evaluation_*.json).
+import csv
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends of one batch are not locked
+    fcntl = None
+
+DEFAULT_RESULTS_PATH = os.path.join('output', 'results.jsonl')
+METRICS = ('labeled', 'extracted', 'matched', 'recall', 'precision', 'f1')
+
+
+class ResultsWriter:
+    def __init__(self, path=DEFAULT_RESULTS_PATH, batch_size=32):
+        """
+        Initialize the ResultsWriter.
+
+        Args:
+            path (str): JSONL file the records are appended to.
+            batch_size (int): Number of records buffered before they are written.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def append(self, run, file_name, metrics, config=None):
+        """
+        Add the evaluation of one file in one run (e.g. the dict returned by Evaluator.evaluate).
+
+        Args:
+            run (str): Run name, e.g. 'cosine_w_new'.
+            file_name (str): Cluster file name, e.g. 'd112h'.
+            metrics (dict): Metric name -> value.
+            config (dict, optional): Settings of the run, stored with the record.
+        """
+        self.pending.append({
+            "run": run,
+            "file": file_name,
+            "metrics": metrics,
+            "config": config or {},
+            "time": round(time.time(), 3),
+        })
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Append the buffered records with a single write under an exclusive lock, so records
+        of concurrent writers never interleave. After a partial line left by an interrupted
+        write, the batch starts on a new line so that only the damaged record is lost.
+        """
+        if not self.pending:
+            return
+        data = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in self.pending).encode('utf-8')
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            size = os.fstat(fd).st_size
+            if size:
+                # Writes still go to the end (O_APPEND); the seek is only for this read
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b'\n':
+                    data = b'\n' + data
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+
+class ResultsReader:
+    def __init__(self, path=DEFAULT_RESULTS_PATH):
+        """
+        Initialize the ResultsReader. The file is parsed on first query and again only
+        when it has changed.
+
+        Args:
+            path (str): JSONL file written by ResultsWriter.
+        """
+        self.path = path
+        self._signature = None
+        self._records = []
+        # Lines that are not a complete record (left by an interrupted write)
+        self.skipped = 0
+
+    def load(self):
+        """Return all records in write order, skipping damaged lines."""
+        if not os.path.exists(self.path):
+            return []
+        stat = os.stat(self.path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature != self._signature:
+            self._records, self.skipped = [], 0
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as infile:
+                for line in infile:
+                    if not line.strip():
+                        continue
+                    try:
+                        self._records.append(json.loads(line))
+                    except ValueError:
+                        self.skipped += 1
+            self._signature = signature
+        return self._records
+
+    def runs(self):
+        """Return the run names, in order of first appearance."""
+        return list(dict.fromkeys(record["run"] for record in self.load()))
+
+    def records(self, run=None, file_name=None):
+        """Return the records of a run and/or file; the latest record wins for a repeated (run, file)."""
+        latest = {}
+        for record in self.load():
+            if (run is None or record["run"] == run) and (file_name is None or record["file"] == file_name):
+                latest[(record["run"], record["file"])] = record
+        return list(latest.values())
+
+    def table(self, run):
+        """
+        Return {file: metrics} of a run, the layout of the legacy evaluation_*.json files.
+        """
+        return {record["file"]: record["metrics"] for record in self.records(run)}
+
+    def rows(self, run):
+        """Return flat {"file", metric...} rows of a run (one per file, sorted by file)."""
+        return [{"file": file_name, **metrics} for file_name, metrics in sorted(self.table(run).items())]
+
+    def metric(self, metric, run=None):
+        """
+        Return {run: {file: value}} for one metric, optionally for a single run.
+        """
+        values = {}
+        for record in self.records(run):
+            if metric in record["metrics"]:
+                values.setdefault(record["run"], {})[record["file"]] = record["metrics"][metric]
+        return values
+
+    def to_csv(self, run, csv_path, metrics=METRICS):
+        """
+        Export a run in the output/<run>.csv layout (file, labeled, extracted, matched, recall, precision, f1).
+        """
+        with open(csv_path, 'w', encoding='utf-8', newline='') as outfile:
+            writer = csv.writer(outfile, lineterminator='\n')
+            writer.writerow(['file', *metrics])
+            for row in self.rows(run):
+                writer.writerow([row["file"], *(row.get(metric, '') for metric in metrics)])
+        return csv_path
+
+
+def import_legacy_json(json_path, writer, run=None):
+    """
+    Append the records of a legacy output/evaluation_<run>.json file to the store. Trailing
+    garbage left by the old r+ rewrite (no truncate) after the JSON object is ignored.
+
+    Args:
+        json_path (str): Legacy evaluation JSON file.
+        writer (ResultsWriter): Store to append to.
+        run (str, optional): Run name; defaults to the file name without 'evaluation_' and '.json'.
+
+    Returns:
+        int: Number of imported records.
+    """
+    if run is None:
+        run = os.path.splitext(os.path.basename(json_path))[0]
+        if run.startswith('evaluation_'):
+            run = run[len('evaluation_'):]
+    with open(json_path, 'r', encoding='utf-8') as infile:
+        data, _ = json.JSONDecoder().raw_decode(infile.read().lstrip())
+    for file_name, metrics in data.items():
+        writer.append(run, file_name, metrics, config={"imported_from": json_path})
+    writer.flush()
+    return len(data)
+
+
+# Import legacy evaluation JSON files, export a run as CSV, or print one metric:
+#   python -m Sum_module.results_store import output/evaluation_*.json
+#   python -m Sum_module.results_store csv cosine_w_new output/cosine_w_new.csv
+#   python -m Sum_module.results_store show cosine_w_new f1
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Evaluation results store')
+    parser.add_argument('--path', default=DEFAULT_RESULTS_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import')
+    import_parser.add_argument('json_paths', nargs='+')
+    csv_parser = commands.add_parser('csv')
+    csv_parser.add_argument('run')
+    csv_parser.add_argument('csv_path')
+    show_parser = commands.add_parser('show')
+    show_parser.add_argument('run', nargs='?')
+    show_parser.add_argument('metric', nargs='?', default='f1')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        with ResultsWriter(args.path) as writer:
+            for json_path in args.json_paths:
+                print(f"{json_path}: {import_legacy_json(json_path, writer)} records")
+    elif args.command == 'csv':
+        print(f"Written {ResultsReader(args.path).to_csv(args.run, args.csv_path)}")
+    else:
+        for run, values in ResultsReader(args.path).metric(args.metric, args.run).items():
+            mean = sum(values.values()) / len(values)
+            print(f"{run}: {args.metric} mean {mean:.2f} over {len(values)} files")
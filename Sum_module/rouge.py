@@ -0,0 +1,244 @@
+# Sum_module/rouge.py
+# This module defines the RougeScorer class: in-process ROUGE-N and ROUGE-L. Tokens are mapped
+# to integer ids and n-grams packed into int64 codes once per reference, so every system
+# summary of a cluster is scored against the same prepared reference; the LCS of ROUGE-L is
+# computed bit-parallel, with one bitmask per distinct reference token instead of a DP table.
+import re
+
+import numpy as np
+
+from Sum_module.vocabulary import Vocabulary
+
+ROUGE_TYPES = ('rouge1', 'rouge2', 'rougeL')
+TOKEN_REGEX = re.compile(r'[a-z0-9]+')
+# Bits per token id in a packed n-gram code: n-grams up to 3 tokens fit in an int64
+NGRAM_BITS = 21
+MAX_NGRAM = 63 // NGRAM_BITS
+FIELDS = ('precision', 'recall', 'f1')
+
+
+def tokenize(text, stemmer=None):
+    """
+    Tokenize like the reference ROUGE scorer: lowercase, keep runs of letters and digits.
+
+    Args:
+        text (str): Text to tokenize.
+        stemmer (optional): Object with a stem(word) method (e.g. nltk's PorterStemmer),
+                            applied to tokens longer than 3 characters.
+
+    Returns:
+        List[str]: Tokens.
+    """
+    tokens = TOKEN_REGEX.findall(text.lower())
+    if stemmer is not None:
+        tokens = [stemmer.stem(token) if len(token) > 3 else token for token in tokens]
+    return tokens
+
+
+def ngram_counts(token_ids, n):
+    """
+    Count the n-grams of a token-id sequence.
+
+    Returns:
+        tuple: (codes, counts) with the distinct packed n-gram codes (sorted) and their counts.
+    """
+    token_ids = np.asarray(token_ids, dtype=np.int64)
+    if len(token_ids) < n:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    codes = token_ids[:len(token_ids) - n + 1].copy()
+    for offset in range(1, n):
+        codes = (codes << NGRAM_BITS) | token_ids[offset:len(token_ids) - n + 1 + offset]
+    return np.unique(codes, return_counts=True)
+
+
+def ngram_overlap(reference, candidate):
+    """Clipped n-gram overlap: sum over shared n-grams of the smaller count."""
+    _, reference_positions, candidate_positions = np.intersect1d(
+        reference[0], candidate[0], assume_unique=True, return_indices=True)
+    return int(np.minimum(reference[1][reference_positions], candidate[1][candidate_positions]).sum())
+
+
+def lcs_masks(token_ids):
+    """Bitmask of the positions of each distinct token: the reference side of lcs_length."""
+    masks = {}
+    for position, token_id in enumerate(token_ids):
+        masks[token_id] = masks.get(token_id, 0) | (1 << position)
+    return masks
+
+
+def lcs_length(masks, reference_length, token_ids):
+    """
+    Length of the longest common subsequence of a reference (given by lcs_masks) and a
+    token-id sequence, with the bit-parallel algorithm of Hyyrö (2004): one row of the LCS
+    table is kept as a bit vector, so memory is O(reference length) bits per distinct token.
+    """
+    full = (1 << reference_length) - 1
+    row = full
+    for token_id in token_ids:
+        match = masks.get(token_id)
+        if match is None:
+            continue
+        matched = row & match
+        row = ((row + matched) | (row - matched)) & full
+    return reference_length - row.bit_count()
+
+
+def prf(overlap, candidate_total, reference_total):
+    """Precision, recall and F1 (fractions) from an overlap and the two totals."""
+    precision = overlap / candidate_total if candidate_total > 0 else 0.0
+    recall = overlap / reference_total if reference_total > 0 else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def summary_text(sentences_dict, sentence_ids=None):
+    """Join the sentence_text of selected sentences (all of them by default) into one text."""
+    if sentence_ids is None:
+        sentence_ids = list(sentences_dict.keys())
+    return ' '.join(sentences_dict[sentence_id]['sentence_text'] for sentence_id in sentence_ids)
+
+
+class RougeScorer:
+    def __init__(self, rouge_types=ROUGE_TYPES, use_stemmer=False):
+        """
+        Initialize the RougeScorer.
+
+        Args:
+            rouge_types (tuple): 'rouge1' .. 'rouge3' (ROUGE-N) and/or 'rougeL' (LCS over the
+                                 whole summary).
+            use_stemmer (bool): Porter-stem tokens longer than 3 characters (nltk).
+        """
+        self.ngram_sizes = {}
+        for rouge_type in rouge_types:
+            if rouge_type == 'rougeL':
+                continue
+            n = int(rouge_type[5:]) if re.fullmatch(r'rouge\d', rouge_type) else 0
+            if not 1 <= n <= MAX_NGRAM:
+                raise ValueError(f"Unsupported rouge type '{rouge_type}', expected rouge1..rouge{MAX_NGRAM} or rougeL")
+            self.ngram_sizes[rouge_type] = n
+        self.rouge_types = tuple(rouge_types)
+        self.stemmer = None
+        if use_stemmer:
+            from nltk.stem.porter import PorterStemmer
+            self.stemmer = PorterStemmer()
+        self.vocabulary = Vocabulary()
+        self.references = {}
+        self.configs = []
+        self.scores = {}
+
+    def encode(self, text):
+        """Tokenize a text into token ids (shared vocabulary of the scorer)."""
+        token_ids = self.vocabulary.encode(tokenize(text, self.stemmer))
+        if len(self.vocabulary) >= 1 << NGRAM_BITS:
+            raise ValueError(f"Vocabulary exceeds {1 << NGRAM_BITS} words, n-gram codes would collide")
+        return token_ids.astype(np.int64)
+
+    def prepare(self, text):
+        """
+        Tokenize and index one reference text once: n-gram counts and LCS bitmasks.
+
+        Returns:
+            dict: The prepared reference, as used by score_prepared.
+        """
+        token_ids = self.encode(text)
+        prepared = {"length": len(token_ids)}
+        for rouge_type, n in self.ngram_sizes.items():
+            prepared[rouge_type] = ngram_counts(token_ids, n)
+        if 'rougeL' in self.rouge_types:
+            prepared["rougeL"] = lcs_masks(token_ids.tolist())
+        return prepared
+
+    def score_prepared(self, reference, text):
+        """
+        Score a candidate text against a prepared reference.
+
+        Returns:
+            dict: rouge type -> {"precision", "recall", "f1"} (fractions).
+        """
+        token_ids = self.encode(text)
+        scores = {}
+        for rouge_type in self.rouge_types:
+            if rouge_type == 'rougeL':
+                overlap = lcs_length(reference["rougeL"], reference["length"], token_ids.tolist())
+                scores[rouge_type] = prf(overlap, len(token_ids), reference["length"])
+                continue
+            n = self.ngram_sizes[rouge_type]
+            candidate = ngram_counts(token_ids, n)
+            overlap = ngram_overlap(reference[rouge_type], candidate)
+            scores[rouge_type] = prf(overlap, max(len(token_ids) - n + 1, 0), max(reference["length"] - n + 1, 0))
+        return scores
+
+    def score(self, reference_text, text):
+        """Score a candidate text against a reference text."""
+        return self.score_prepared(self.prepare(reference_text), text)
+
+    # Corpus scoring: one prepared reference per cluster, shared by every configuration
+    def add_reference(self, file_name, reference_text):
+        """Register the reference summary text of a cluster."""
+        self.references[file_name] = self.prepare(reference_text)
+
+    def add_summary(self, config, file_name, text):
+        """
+        Score the summary of a cluster produced by a configuration.
+
+        Returns:
+            dict: rouge type -> {"precision", "recall", "f1"}.
+        """
+        if file_name not in self.references:
+            raise ValueError(f"No reference registered for '{file_name}'")
+        if config not in self.scores:
+            self.configs.append(config)
+            self.scores[config] = {}
+        scores = self.score_prepared(self.references[file_name], text)
+        self.scores[config][file_name] = scores
+        return scores
+
+    def table(self):
+        """
+        Return one row per (configuration, cluster), e.g. {"config", "file", "rouge1_f1", ...},
+        with values rounded to 4 digits.
+        """
+        rows = []
+        for config in self.configs:
+            for file_name, scores in self.scores[config].items():
+                row = {"config": config, "file": file_name}
+                for rouge_type in self.rouge_types:
+                    for field in FIELDS:
+                        row[f"{rouge_type}_{field}"] = round(scores[rouge_type][field], 4)
+                rows.append(row)
+        return rows
+
+    def mean(self, rouge_type='rougeL', field='f1'):
+        """Macro average over the clusters of each configuration: {config: value}."""
+        return {config: float(np.mean([scores[rouge_type][field] for scores in self.scores[config].values()]))
+                for config in self.configs}
+
+
+# Score the driver configurations over the test clusters (tests/test_rouge.py checks the
+# scorer against the reference implementation):
+#   python -m Sum_module.rouge
+if __name__ == "__main__":
+    import os
+    import time
+
+    from Sum_module.pipeline import Pipeline, merge_config, PRESETS
+
+    test_dir = os.path.join('Data', 'DUC_TEXT', 'test')
+    file_names = sorted(f for f in os.listdir(test_dir) if os.path.isfile(os.path.join(test_dir, f)))
+    scorer = RougeScorer()
+    elapsed = 0.0
+    for preset in ('commonwords', 'cosine', 'cosine_w'):
+        pipeline = Pipeline(merge_config(PRESETS[preset], {"pagerank": {"verbose": False}}))
+        for file_name in file_names:
+            sentences = pipeline.get('sentences', file_name)
+            summary_ids = pipeline.get('summarizer', file_name).get_top_sentence_ids()
+            start = time.perf_counter()
+            if file_name not in scorer.references:
+                scorer.add_reference(file_name, summary_text(pipeline.get('reference', file_name)))
+            scorer.add_summary(preset, file_name, summary_text(sentences, summary_ids))
+            elapsed += time.perf_counter() - start
+            pipeline.release(file_name)
+    print(f"Scored {len(scorer.configs) * len(file_names)} summaries in {elapsed:.2f}s")
+    for rouge_type in scorer.rouge_types:
+        for config, value in scorer.mean(rouge_type).items():
+            print(f"{config}: {rouge_type} f1 {value:.4f}")
@@ -0,0 +1,183 @@
+# Sum_module/sentence_table.py
+# This module defines the SentenceTable class: a columnar store for parsed sentences that
+# stands in for the int -> dict sentences_dict (interned doc ids, integer num/wdcount arrays,
+# and all sentence texts in one UTF-8 buffer addressed by offsets).
+import sys
+
+import numpy as np
+
+FIELDS = ('doc_id', 'num', 'wdcount', 'sentence_text')
+
+
+class SentenceRecord:
+    """Read-only view of one stored row of a SentenceTable, used like a sentence metadata dict."""
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, field):
+        table, row = self._table, self._row
+        if field == 'doc_id':
+            return table.doc_names[table._doc_codes[row]]
+        if field == 'num':
+            # Kept as a string, like the 'num' attribute in the parsed dictionaries
+            return str(table._nums[row])
+        if field == 'wdcount':
+            return int(table._wdcounts[row])
+        if field == 'sentence_text':
+            return table._row_text(row)
+        raise KeyError(field)
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return FIELDS
+
+    def items(self):
+        return [(field, self[field]) for field in FIELDS]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (SentenceRecord, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f'SentenceRecord({self.to_dict()!r})'
+
+
+class SentenceTable:
+    def __init__(self, doc_names, doc_codes, nums, wdcounts, text_buffer, text_offsets, rows=None):
+        """
+        Initialize the SentenceTable from its columns. Use from_records or from_dict to build one.
+
+        Args:
+            doc_names (list[str]): Distinct doc ids; doc_codes index into it.
+            doc_codes (np.ndarray): int32 doc id code per stored sentence.
+            nums (np.ndarray): int32 'num' attribute per stored sentence.
+            wdcounts (np.ndarray): int32 'wdcount' attribute per stored sentence.
+            text_buffer (bytes): UTF-8 sentence texts, concatenated.
+            text_offsets (np.ndarray): int64 offsets (n + 1) of each text in text_buffer.
+            rows (np.ndarray, optional): Stored rows visible through this table, in order.
+                                         Sentence id i of the table is stored row rows[i].
+        """
+        self.doc_names = doc_names
+        self._doc_codes = doc_codes
+        self._nums = nums
+        self._wdcounts = wdcounts
+        self.text_buffer = text_buffer
+        self._text_offsets = text_offsets
+        self.rows = np.arange(len(doc_codes)) if rows is None else np.asarray(rows, dtype=np.int64)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a table from sentence metadata dicts, e.g. ParseDoc.iter_sentences(doc_file).
+        """
+        doc_index = {}
+        doc_codes, nums, wdcounts, texts = [], [], [], []
+        for record in records:
+            doc_id = record['doc_id']
+            code = doc_index.get(doc_id)
+            if code is None:
+                code = doc_index[doc_id] = len(doc_index)
+            num = int(record['num'])
+            if str(num) != record['num']:
+                raise ValueError(f"Sentence num {record['num']!r} is not a canonical integer")
+            doc_codes.append(code)
+            nums.append(num)
+            wdcounts.append(int(record['wdcount']))
+            texts.append(record['sentence_text'].encode('utf-8'))
+        text_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=text_offsets[1:])
+        return cls(
+            [sys.intern(doc_id) for doc_id in doc_index],
+            np.array(doc_codes, dtype=np.int32),
+            np.array(nums, dtype=np.int32),
+            np.array(wdcounts, dtype=np.int32),
+            b''.join(texts),
+            text_offsets,
+        )
+
+    @classmethod
+    def from_dict(cls, sentences_dict):
+        """Build a table from an existing sentences_dict (values in sentence id order)."""
+        return cls.from_records(sentences_dict[sid] for sid in sorted(sentences_dict))
+
+    # Columns of the visible rows
+    @property
+    def doc_codes(self):
+        return self._doc_codes[self.rows]
+
+    @property
+    def nums(self):
+        return self._nums[self.rows]
+
+    @property
+    def wdcounts(self):
+        return self._wdcounts[self.rows]
+
+    def text(self, sentence_id):
+        return self._row_text(self.rows[sentence_id])
+
+    def _row_text(self, row):
+        return self.text_buffer[self._text_offsets[row]:self._text_offsets[row + 1]].decode('utf-8')
+
+    def view(self, selection):
+        """
+        Return a filtered table that shares this table's columns.
+
+        Args:
+            selection (np.ndarray): Boolean mask over this table's sentences, or their sentence ids.
+
+        Returns:
+            SentenceTable: The selected sentences, renumbered from 0 in order.
+        """
+        selection = np.asarray(selection)
+        if selection.dtype == bool:
+            selection = np.flatnonzero(selection)
+        return SentenceTable(self.doc_names, self._doc_codes, self._nums, self._wdcounts,
+                             self.text_buffer, self._text_offsets, rows=self.rows[selection])
+
+    def filter(self, predicate):
+        """Return a view of the sentences whose record satisfies predicate (see parse_doc filters)."""
+        return self.view(np.array([bool(predicate(record)) for record in self.values()], dtype=bool))
+
+    def to_dict(self):
+        """Convert back to the sentence_id -> metadata dict produced by ParseDoc.parse_doc."""
+        return {sid: record.to_dict() for sid, record in self.items()}
+
+    # Dictionary interface (sentence_id -> record), so the table can replace sentences_dict
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, sentence_id):
+        if not 0 <= sentence_id < len(self.rows):
+            raise KeyError(sentence_id)
+        return SentenceRecord(self, self.rows[sentence_id])
+
+    def __contains__(self, sentence_id):
+        return isinstance(sentence_id, (int, np.integer)) and 0 <= sentence_id < len(self.rows)
+
+    def __iter__(self):
+        return iter(range(len(self.rows)))
+
+    def get(self, sentence_id, default=None):
+        return self[sentence_id] if sentence_id in self else default
+
+    def keys(self):
+        return range(len(self.rows))
+
+    def values(self):
+        return [SentenceRecord(self, row) for row in self.rows]
+
+    def items(self):
+        return list(enumerate(self.values()))
@@ -0,0 +1,142 @@
+# Sum_module/summary_archive.py
+# This module defines the summary archive: all summaries of a run in one file with an offset
+# index in a footer. SummaryArchiveWriter writes it through a buffered file and commits it
+# with an atomic rename; SummaryArchiveReader fetches one summary without reading the others.
+import json
+import os
+import struct
+
+MAGIC = b'SUMARC01'
+TRAILER = struct.Struct('<QQ8s')  # index offset, index size, magic
+BUFFER_SIZE = 1 << 20
+
+
+class SummaryArchiveWriter:
+    def __init__(self, path):
+        """
+        Start a new archive. Entries go to '<path>.tmp', which replaces path on commit, so
+        readers never see a partially written archive.
+
+        Args:
+            path (str): Archive path, e.g. 'output/cosine_w_new.sumarc'.
+        """
+        self.path = path
+        self.temp_path = f'{path}.tmp'
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(self.temp_path, 'wb', buffering=BUFFER_SIZE)
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+        self.index = {}
+
+    def add(self, name, text):
+        """
+        Append one summary. A name added twice keeps its last content.
+
+        Args:
+            name (str): Entry name, e.g. 'd112h_cosine_w_new' (the per-file output name).
+            text (str): Summary content.
+        """
+        data = text.encode('utf-8')
+        self._file.write(data)
+        self.index[name] = (self._offset, len(data))
+        self._offset += len(data)
+
+    def commit(self):
+        """Write the index footer and atomically move the archive into place."""
+        index = json.dumps(self.index, ensure_ascii=False).encode('utf-8')
+        self._file.write(index)
+        self._file.write(TRAILER.pack(self._offset, len(index), MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, self.path)
+        print(f"\n{len(self.index)} summaries written to {self.path}")
+
+    def abort(self):
+        """Discard the archive being written."""
+        self._file.close()
+        os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class SummaryArchiveReader:
+    def __init__(self, path):
+        """
+        Open an archive; only the footer index is read.
+
+        Args:
+            path (str): Archive written by SummaryArchiveWriter.
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self.index = self._read_index()
+        except ValueError:
+            self._file.close()
+            raise
+
+    def _read_index(self):
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(MAGIC) + TRAILER.size:
+            raise ValueError(f"{self.path} is not a complete summary archive")
+        self._file.seek(-TRAILER.size, os.SEEK_END)
+        index_offset, index_size, magic = TRAILER.unpack(self._file.read(TRAILER.size))
+        if magic != MAGIC or index_offset + index_size + TRAILER.size != size:
+            raise ValueError(f"{self.path} is not a complete summary archive")
+        self._file.seek(index_offset)
+        return {name: tuple(entry) for name, entry in json.loads(self._file.read(index_size)).items()}
+
+    def names(self):
+        return list(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def read(self, name):
+        """Return the summary stored under name."""
+        offset, size = self.index[name]
+        self._file.seek(offset)
+        return self._file.read(size).decode('utf-8')
+
+    def export(self, output_dir='output', names=None):
+        """
+        Write entries as individual files (output_dir/<name>), the layout of OutputWriter's per-file mode.
+
+        Returns:
+            List[str]: The written file paths.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for name in names or self.names():
+            output_file_path = os.path.join(output_dir, name)
+            with open(output_file_path, 'w', encoding='utf-8') as outfile:
+                outfile.write(self.read(name))
+            paths.append(output_file_path)
+        return paths
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Export an archive as per-file summaries:
+#   python -m Sum_module.summary_archive output/cosine_w_new.sumarc output
+if __name__ == "__main__":
+    import sys
+
+    with SummaryArchiveReader(sys.argv[1]) as reader:
+        paths = reader.export(sys.argv[2] if len(sys.argv) > 2 else 'output')
+    print(f"Exported {len(paths)} summaries")
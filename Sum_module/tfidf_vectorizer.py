@@ -1,26 +1,49 @@
 import numpy as np
 
+from Sum_module import tracing
+
 class TFIDFVectorizer:
     """
     A simple TF-IDF Vectorizer for sentence-level features
     """
 
-    def __init__(self):
+    def __init__(self, sparse=False):
+        """
+        Args:
+            sparse (bool): If True, transform returns a scipy.sparse.csr_matrix built in one
+                           pass over token ids instead of a dense np.ndarray.
+        """
+        self.sparse = sparse
         self.word_index = {}
         self.idf = {}
         self.all_words = []
 
-    def transform(self, processed_sentence_text_dict):
+    def transform(self, processed_sentence_text_dict, vocabulary=None):
         """
         Fit the TF-IDF model and return the TF-IDF matrix and supporting dicts.
         Args:
-            processed_sentence_text_dict: dict of {sentence_id: preprocessed_text}
+            processed_sentence_text_dict: dict of {sentence_id: preprocessed_text}, or
+                {sentence_id: token-id array} from Preprocessor.preprocess_dict_ids
+            vocabulary (Vocabulary): Vocabulary of the token ids, required for token-id arrays
            
         Returns:
-            tf_idf_matrix: np.ndarray, shape (num_sentences, num_words)
+            tf_idf_matrix: np.ndarray (or scipy.sparse.csr_matrix in sparse mode), shape (num_sentences, num_words)
             word_index: dict mapping word to col index in tfidf matrix
             idf (dict): inverse document frequency for each word
         """
+        first_value = next(iter(processed_sentence_text_dict.values()), "")
+        if not isinstance(first_value, str):
+            if vocabulary is None:
+                raise ValueError("A vocabulary is required to transform token-id arrays")
+            with tracing.span('tfidf.transform') as span:
+                span.inputs(token_ids=processed_sentence_text_dict)
+                tf_idf_matrix, word_index, idf = self._transform_ids(processed_sentence_text_dict, vocabulary)
+                if not self.sparse:
+                    tf_idf_matrix = tf_idf_matrix.toarray()
+                span.outputs(tfidf=tf_idf_matrix)
+            return tf_idf_matrix, word_index, idf
+        if self.sparse:
+            return self._transform_sparse(processed_sentence_text_dict)
         
         # Step 1: Compute tf for each sentence
         tf_dict = {}
@@ -81,4 +104,86 @@ class TFIDFVectorizer:
 
         return tf_idf_matrix, word_index, idf
 
-    
\ No newline at end of file
+    def _transform_sparse(self, processed_sentence_text_dict):
+        """
+        Build the TF-IDF matrix directly as CSR arrays, without intermediate dicts per sentence.
+        Sentence ids must be 0..num_sentences-1 (rows of the matrix), as in the dense mode.
+        """
+        num_sentences = len(processed_sentence_text_dict)
+
+        # Single pass: assign token ids in order of appearance and count them per sentence
+        vocabulary = {}
+        indptr = [0]
+        indices = []
+        counts = []
+        lengths = []
+        for sentence_id in range(num_sentences):
+            words = processed_sentence_text_dict[sentence_id].split()
+            tf = {}
+            for word in words:
+                word_id = vocabulary.setdefault(word, len(vocabulary))
+                tf[word_id] = tf.get(word_id, 0) + 1
+            indices.extend(tf.keys())
+            counts.extend(tf.values())
+            indptr.append(len(indices))
+            lengths.append(len(words))
+
+        return self._build_csr(
+            np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64),
+            np.array(counts, dtype=float), np.array(lengths, dtype=float), list(vocabulary)
+        )
+
+    def _transform_ids(self, token_ids_dict, vocabulary):
+        """
+        Build the TF-IDF matrix from token-id arrays without going back to strings.
+        Sentence ids must be 0..num_sentences-1 (rows of the matrix).
+        """
+        num_sentences = len(token_ids_dict)
+        rows = [np.asarray(token_ids_dict[sentence_id], dtype=np.int64) for sentence_id in range(num_sentences)]
+        lengths = np.array([len(token_ids) for token_ids in rows], dtype=float)
+        token_ids = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        row_ids = np.repeat(np.arange(num_sentences, dtype=np.int64), lengths.astype(np.int64))
+
+        # Keep only the words used in this input, then count (row, word) pairs in one go
+        used_ids, local_ids = np.unique(token_ids, return_inverse=True)
+        num_words = len(used_ids)
+        pair_codes, counts = np.unique(row_ids * num_words + local_ids, return_counts=True)
+        pair_rows, indices = np.divmod(pair_codes, max(num_words, 1))
+        indptr = np.searchsorted(pair_rows, np.arange(num_sentences + 1)).astype(np.int64)
+        return self._build_csr(indptr, indices, counts.astype(float), lengths, vocabulary.decode(used_ids))
+
+    def _build_csr(self, indptr, indices, counts, lengths, words):
+        """
+        Turn per-sentence word counts into the TF-IDF CSR matrix.
+
+        Args:
+            indptr, indices, counts: CSR layout of the word counts, with provisional column ids.
+            lengths: Number of words of each sentence.
+            words: Word of each provisional column id.
+        """
+        num_sentences = len(indptr) - 1
+        num_words = len(words)
+
+        # tf: count / sentence length, df: number of sentences containing the word
+        row_lengths = np.repeat(lengths, np.diff(indptr))
+        tf_values = counts / row_lengths
+        df = np.bincount(indices, minlength=num_words)
+        idf_values = np.log(num_sentences / df) if num_words > 0 else np.zeros(0)
+
+        # Renumber columns so that they follow the sorted vocabulary, like the dense mode
+        order = sorted(range(num_words), key=words.__getitem__)
+        all_words = [words[column] for column in order]
+        sorted_column = np.empty(num_words, dtype=np.int64)
+        sorted_column[order] = np.arange(num_words)
+
+        import scipy.sparse as sp
+        tf_idf_matrix = sp.csr_matrix(
+            (tf_values * idf_values[indices], sorted_column[indices], indptr),
+            shape=(num_sentences, num_words)
+        )
+        tf_idf_matrix.sort_indices()
+
+        self.all_words = all_words
+        self.word_index = {word: idx for idx, word in enumerate(all_words)}
+        self.idf = {word: idf_values[column] for word, column in zip(all_words, order)}
+        return tf_idf_matrix, self.word_index, self.idf
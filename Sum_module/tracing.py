@@ -0,0 +1,278 @@
+# Sum_module/tracing.py
+# This module defines the stage tracer: spans record the wall time, CPU time, peak traced
+# memory and input/output sizes of each stage of each cluster, as JSONL lines and optionally
+# a Chrome trace-event file (chrome://tracing, Perfetto). Tracing is off unless the SUM_TRACE
+# environment variable is set or enable() is called; when off, span() returns a shared no-op.
+# Inside the pipeline stage spans, nested spans time the stage internals: parse.table,
+# preprocess.ids, tfidf.transform, graph.cosine_blocks, graph.common_words,
+# graph.lsh_candidates, pagerank, and the artifact cache (cache.lookup with its hit, cache.store).
+#
+#   SUM_TRACE=1 python main_cosine.py                 -> output/trace.jsonl
+#   SUM_TRACE=run.jsonl SUM_TRACE_CHROME=run.json ...  -> both files
+#   SUM_TRACE_MEMORY=0                                 -> skip tracemalloc (lower overhead)
+import atexit
+import json
+import os
+import time
+import tracemalloc
+
+TRACE_ENV = 'SUM_TRACE'
+CHROME_ENV = 'SUM_TRACE_CHROME'
+MEMORY_ENV = 'SUM_TRACE_MEMORY'
+DEFAULT_TRACE_PATH = os.path.join('output', 'trace.jsonl')
+MB = 1 << 20
+
+
+def describe(value):
+    """Size of a stage input or output: sentences, tokens, matrix shape and edges, length."""
+    if hasattr(value, 'nnz'):
+        return {"rows": value.shape[0], "cols": value.shape[1], "edges": int(value.nnz)}
+    if hasattr(value, 'doc_codes'):
+        return {"sentences": len(value)}
+    if isinstance(value, str):
+        return {"chars": len(value)}
+    if isinstance(value, dict):
+        first = next(iter(value.values()), None)
+        if hasattr(first, 'dtype'):
+            # token-id dict
+            return {"sentences": len(value), "tokens": int(sum(len(token_ids) for token_ids in value.values()))}
+        if isinstance(first, dict) and 'sentence_text' in first:
+            return {"sentences": len(value)}
+        return {"keys": len(value)}
+    if hasattr(value, 'shape'):
+        if len(value.shape) == 2:
+            # dense connection matrix
+            return {"rows": value.shape[0], "cols": value.shape[1], "edges": int((value != 0).sum())}
+        return {"length": int(value.shape[0]) if value.shape else 1}
+    if hasattr(value, '__len__'):
+        return {"length": len(value)}
+    return {"type": type(value).__name__}
+
+
+class _NullSpan:
+    """Span returned when tracing is off: every method is a no-op."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def inputs(self, **values):
+        pass
+
+    def outputs(self, **values):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, cluster):
+        self.tracer = tracer
+        self.record = {"name": name, "cluster": cluster, "inputs": {}, "outputs": {}}
+        self.child_peak = 0
+
+    def inputs(self, **values):
+        """Record input sizes: objects are described (see describe), numbers kept as is."""
+        self.record["inputs"].update({key: value if isinstance(value, (int, float)) else describe(value)
+                                      for key, value in values.items()})
+
+    def outputs(self, **values):
+        """Record output sizes, like inputs."""
+        self.record["outputs"].update({key: value if isinstance(value, (int, float)) else describe(value)
+                                       for key, value in values.items()})
+
+    def __enter__(self):
+        self.tracer._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer._exit(self, exc_type)
+        return False
+
+
+class Tracer:
+    def __init__(self, path=DEFAULT_TRACE_PATH, chrome_path=None, memory=True):
+        """
+        Initialize the Tracer.
+
+        Args:
+            path (str): JSONL file the span records are appended to.
+            chrome_path (str, optional): Chrome trace-event file written by close().
+            memory (bool): Track the peak traced memory of each span with tracemalloc.
+        """
+        self.path = path
+        self.chrome_path = chrome_path
+        self.memory = memory
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.stack = []
+        self.events = []
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8', buffering=1)
+        # Only stop tracemalloc on close if this tracer started it
+        self.started_tracemalloc = memory and not tracemalloc.is_tracing()
+        if self.started_tracemalloc:
+            tracemalloc.start()
+
+    def span(self, name, cluster=None):
+        return Span(self, name, cluster)
+
+    def _enter(self, span):
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self.stack:
+                # The parent's peak so far is kept before the peak is reset for the child
+                self.stack[-1].child_peak = max(self.stack[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+            span.memory_start = current
+        if span.record["cluster"] is None and self.stack:
+            # e.g. the PageRank solve inside the 'top_scores' stage of a cluster
+            span.record["cluster"] = self.stack[-1].record["cluster"]
+        self.stack.append(span)
+        span.cpu_start = time.process_time()
+        span.wall_start = time.perf_counter()
+
+    def _exit(self, span, exc_type):
+        wall = time.perf_counter() - span.wall_start
+        cpu = time.process_time() - span.cpu_start
+        self.stack.pop()
+        record = span.record
+        record.update({"pid": self.pid, "depth": len(self.stack), "start": round(span.wall_start - self.origin, 6),
+                       "wall": round(wall, 6), "cpu": round(cpu, 6)})
+        if self.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], span.child_peak)
+            record["peak_mb"] = round((peak - span.memory_start) / MB, 3)
+            if self.stack:
+                self.stack[-1].child_peak = max(self.stack[-1].child_peak, peak)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        if self.chrome_path:
+            self.events.append(chrome_event(record))
+
+    def close(self):
+        """Close the JSONL file and write the Chrome trace, if requested."""
+        if self._file.closed:
+            return
+        self._file.close()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        if self.chrome_path:
+            write_chrome_trace(self.events, self.chrome_path)
+
+
+def chrome_event(record):
+    """
+    Convert a span record into a complete ('X') Chrome trace event (times in microseconds);
+    nested spans share the thread row and are drawn inside their parent.
+    """
+    args = {key: record[key] for key in ("cluster", "cpu", "peak_mb", "inputs", "outputs", "error") if key in record}
+    return {"name": record["name"], "cat": "stage", "ph": "X", "pid": record["pid"], "tid": 0,
+            "ts": round(record["start"] * 1e6, 1), "dur": round(record["wall"] * 1e6, 1), "args": args}
+
+
+def write_chrome_trace(events, chrome_path):
+    os.makedirs(os.path.dirname(chrome_path) or '.', exist_ok=True)
+    with open(chrome_path, 'w', encoding='utf-8') as outfile:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, outfile, ensure_ascii=False)
+    return chrome_path
+
+
+_tracer = None
+
+
+def enable(path=DEFAULT_TRACE_PATH, chrome_path=None, memory=True):
+    """Start tracing (replacing any active tracer) and return the Tracer."""
+    global _tracer
+    disable()
+    _tracer = Tracer(path, chrome_path=chrome_path, memory=memory)
+    return _tracer
+
+
+def disable():
+    """Stop tracing and flush the trace files."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+        _tracer = None
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, cluster=None):
+    """
+    Context manager timing a stage. Returns the shared no-op span when tracing is off, so
+    callers only pay for a function call and should describe inputs/outputs through the span.
+
+    Args:
+        name (str): Stage name, e.g. 'tfidf'.
+        cluster (str, optional): Cluster file name, e.g. 'd112h'.
+    """
+    if _tracer is None:
+        return NULL_SPAN
+    return _tracer.span(name, cluster)
+
+
+def summarize(path, by='name'):
+    """
+    Aggregate a JSONL trace per stage (or per cluster with by='cluster').
+
+    Returns:
+        dict: key -> {"count", "wall", "cpu", "peak_mb"} (sums of times, max of peaks), by decreasing wall time.
+    """
+    totals = {}
+    with open(path, 'r', encoding='utf-8') as infile:
+        for line in infile:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            total = totals.setdefault(record.get(by), {"count": 0, "wall": 0.0, "cpu": 0.0, "peak_mb": 0.0})
+            total["count"] += 1
+            total["wall"] += record["wall"]
+            total["cpu"] += record["cpu"]
+            total["peak_mb"] = max(total["peak_mb"], record.get("peak_mb", 0.0))
+    return dict(sorted(totals.items(), key=lambda item: -item[1]["wall"]))
+
+
+def _enable_from_environment():
+    value = os.environ.get(TRACE_ENV, '')
+    if value in ('', '0'):
+        return
+    enable(DEFAULT_TRACE_PATH if value == '1' else value,
+           chrome_path=os.environ.get(CHROME_ENV) or None,
+           memory=os.environ.get(MEMORY_ENV, '1') != '0')
+
+
+_enable_from_environment()
+atexit.register(disable)
+
+
+# Where did a run spend its time, or convert a trace for chrome://tracing:
+#   python -m Sum_module.tracing summary output/trace.jsonl [--by cluster]
+#   python -m Sum_module.tracing chrome output/trace.jsonl output/trace.json
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stage trace tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    summary_parser = commands.add_parser('summary')
+    summary_parser.add_argument('path')
+    summary_parser.add_argument('--by', default='name', choices=['name', 'cluster'])
+    chrome_parser = commands.add_parser('chrome')
+    chrome_parser.add_argument('path')
+    chrome_parser.add_argument('chrome_path')
+    args = parser.parse_args()
+
+    if args.command == 'summary':
+        for key, total in summarize(args.path, args.by).items():
+            print(f"{str(key):24s} {total['count']:6d} spans {total['wall']:10.3f} s wall "
+                  f"{total['cpu']:10.3f} s cpu {total['peak_mb']:10.2f} MB peak")
+    else:
+        with open(args.path, 'r', encoding='utf-8') as infile:
+            events = [chrome_event(json.loads(line)) for line in infile if line.strip()]
+        print(f"Written {write_chrome_trace(events, args.chrome_path)}")
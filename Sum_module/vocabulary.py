@@ -0,0 +1,54 @@
+# Sum_module/vocabulary.py
+# This module defines the Vocabulary class that maps words to compact integer token ids,
+# so a sentence is tokenized once and later stages work on token-id arrays.
+import numpy as np
+
+TOKEN_DTYPE = np.uint32
+
+class Vocabulary:
+    def __init__(self, words=None):
+        """
+        Initialize the Vocabulary.
+
+        Args:
+            words (iterable of str, optional): Words to register first, in order (ids 0, 1, ...).
+        """
+        self.word_to_id = {}
+        self.words = []
+        for word in words or []:
+            self.add(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.word_to_id
+
+    def add(self, word):
+        """
+        Return the id of a word, registering it if it is new.
+        """
+        word_id = self.word_to_id.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self.word_to_id[word] = word_id
+            self.words.append(word)
+        return word_id
+
+    def encode(self, words):
+        """
+        Convert a list of words into a token-id array, registering new words.
+
+        Returns:
+            np.ndarray: Token ids (uint32), one per word.
+        """
+        return np.fromiter((self.add(word) for word in words), dtype=TOKEN_DTYPE, count=len(words))
+
+    def decode(self, token_ids):
+        """
+        Convert token ids back into words.
+
+        Returns:
+            List[str]: Words, one per token id.
+        """
+        return [self.words[token_id] for token_id in token_ids]
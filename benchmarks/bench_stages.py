@@ -0,0 +1,285 @@
+# benchmarks/bench_stages.py
+# Stage benchmark: wall time and peak memory of ParseDoc, Preprocessor, TFIDFVectorizer,
+# CosineSimilarityConnector, ConnectionMatrix, PageRankCalculator and Summarizer on every DUC
+# cluster file and on synthetic clusters of growing size, saved as JSON and optionally gated
+# against a baseline.
+#
+# Usage (from the repository root):
+#   python benchmarks/bench_stages.py --output benchmarks/baseline_stages.json
+#   python benchmarks/bench_stages.py --baseline benchmarks/baseline_stages.json --tolerance 0.25
+#
+# --preprocess tokenize replaces the Preprocessor by preprocess.tokenize (no stopword removal
+# or lemmatization) where the nltk data is not installed; the committed baseline was measured
+# that way, so compare with it using --preprocess tokenize. A run whose preprocess mode differs
+# from the baseline's fails, and --output does not write results with failed clusters.
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from Sum_module.connections import ConnectionMatrix  # noqa: E402
+from Sum_module.cosine_connector import CosineSimilarityConnector  # noqa: E402
+from Sum_module.pagerank import PageRankCalculator  # noqa: E402
+from Sum_module.parse_doc import ParseDoc  # noqa: E402
+from Sum_module.preprocess import Preprocessor, tokenize  # noqa: E402
+from Sum_module.summarizer import Summarizer  # noqa: E402
+from Sum_module.tfidf_vectorizer import TFIDFVectorizer  # noqa: E402
+from Sum_module.vocabulary import Vocabulary  # noqa: E402
+
+SPLITS = ['test', 'train']
+SYNTHETIC_SIZES = [1000, 5000, 20000, 100000]
+PREPROCESS_MODES = ['nltk', 'tokenize']
+MB = 1 << 20
+
+# Synthetic text: each topic has its own words, mixed with stopwords and background words drawn
+# from a vocabulary that grows with the cluster, so the number of neighbours of a sentence stays
+# bounded (as in a DUC cluster) and the graph grows linearly with the size. Stopwords follow a
+# 1/rank law over STOPWORDS and make STOPWORD_SHARE of the words: with --preprocess tokenize they
+# are kept, and a larger share lets any two sentences reach min_common_words through stopwords
+# alone, so the common-words degree would grow with the cluster instead of staying near DUC's.
+STOPWORDS = ['the', 'of', 'and', 'to', 'a', 'in', 'is', 'that', 'for', 'it', 'as', 'was', 'with', 'on', 'by',
+             'he', 'at', 'from', 'his', 'an', 'were', 'are', 'which', 'this', 'be', 'have', 'had', 'not', 'but',
+             'they', 'has', 'or', 'their', 'its', 'been', 'one', 'who', 'would', 'after', 'said']
+STOPWORD_SHARE = 0.15
+TOPIC_WORD_SHARE = 0.40
+SENTENCES_PER_TOPIC = 100
+TOPIC_WORDS = 30
+BACKGROUND_WORDS_PER_SENTENCE = 10
+SENTENCES_PER_DOC = 40
+
+
+def synthetic_document(num_sentences, seed=0):
+    """Generate a cluster file of num_sentences sentences in the DUC_TEXT format."""
+    rng = np.random.default_rng(seed)
+    num_topics = max(1, num_sentences // SENTENCES_PER_TOPIC)
+    lengths = rng.integers(3, 31, size=num_sentences)
+    topics = rng.integers(0, num_topics, size=num_sentences)
+    background = rng.integers(0, BACKGROUND_WORDS_PER_SENTENCE * num_sentences, size=int(lengths.sum()))
+    kinds = rng.random(int(lengths.sum()))
+    topic_words = rng.integers(0, TOPIC_WORDS, size=int(lengths.sum()))
+    stopword_weights = 1.0 / np.arange(1, len(STOPWORDS) + 1)
+    stopwords = rng.choice(len(STOPWORDS), size=int(lengths.sum()), p=stopword_weights / stopword_weights.sum())
+    lines = []
+    position = 0
+    for sentence_id, (length, topic) in enumerate(zip(lengths.tolist(), topics.tolist())):
+        words = []
+        for index in range(position, position + length):
+            if kinds[index] < STOPWORD_SHARE:
+                words.append(STOPWORDS[stopwords[index]])
+            elif kinds[index] < STOPWORD_SHARE + TOPIC_WORD_SHARE:
+                words.append(f"topic{topic}word{topic_words[index]}")
+            else:
+                words.append(f"word{background[index]}")
+        position += length
+        doc_id = f"SYN{sentence_id // SENTENCES_PER_DOC:06d}"
+        lines.append(f'<s docid="{doc_id}" num="{sentence_id % SENTENCES_PER_DOC + 1}" wdcount="{length}"> '
+                     f'{" ".join(words).capitalize()}.</s>')
+    return '\n'.join(lines) + '\n'
+
+
+def split_files(split):
+    """Return the (cluster name 'split/file', path) of every cluster file of a DUC_TEXT split."""
+    split_dir = os.path.join(REPO_ROOT, 'Data', 'DUC_TEXT', split)
+    return [(f'{split}/{file_name}', os.path.join(split_dir, file_name)) for file_name in sorted(os.listdir(split_dir))]
+
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8') as infile:
+        return infile.read()
+
+
+class TokenizePreprocessor:
+    """Stand-in for Preprocessor without nltk data: words from preprocess.tokenize, nothing removed."""
+
+    def preprocess_dict_ids(self, sentences_dict, vocabulary):
+        return {sid: vocabulary.encode(tokenize(data['sentence_text'])) for sid, data in sentences_dict.items()}
+
+
+# Stages in execution order: (name, function of the outputs so far)
+STAGES = [
+    ('parse', lambda state: ParseDoc.parse_table(state['text'])),
+    ('preprocess', lambda state: state['preprocessor'].preprocess_dict_ids(state['parse'], state['vocabulary'])),
+    ('tfidf', lambda state: TFIDFVectorizer(sparse=True).transform(state['preprocess'], state['vocabulary'])[0]),
+    ('cosine', lambda state: CosineSimilarityConnector(threshold=0.2).create_sparse_connection_matrix(state['tfidf'])),
+    ('connections', lambda state: ConnectionMatrix(list(state['preprocess'].values()), min_common_words=4)
+        .create_matrix(sparse_output=True)),
+    ('pagerank', lambda state: PageRankCalculator(state['cosine'], verbose=False).calculator()),
+    ('summarizer', lambda state: Summarizer(state['parse'], state['pagerank'], top_percent=0.1).get_top_sentence_ids()),
+]
+
+
+def run_stages(text, preprocessor, measure_memory):
+    """
+    Run every stage on one cluster text.
+
+    Returns:
+        dict: stage -> {"seconds"} (plus "peak_mb", the peak of memory allocated during the
+              stage above what was allocated before it, when measure_memory is set).
+    """
+    state = {'text': text, 'preprocessor': preprocessor, 'vocabulary': Vocabulary()}
+    measures = {}
+    for name, stage in STAGES:
+        if measure_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        state[name] = stage(state)
+        measures[name] = {"seconds": time.perf_counter() - start}
+        if measure_memory:
+            measures[name]["peak_mb"] = (tracemalloc.get_traced_memory()[1] - before) / MB
+    return measures
+
+
+def benchmark_cluster(text, preprocessor, repeat, measure_memory):
+    """
+    Benchmark one cluster file: the median time of repeat runs of each stage, and its peak
+    memory in one more run under tracemalloc.
+    """
+    runs = [run_stages(text, preprocessor, False) for _ in range(repeat)]
+    stages = {name: {"seconds": round(statistics.median(measures[name]["seconds"] for measures in runs), 5)}
+              for name, _ in STAGES}
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            memory = run_stages(text, preprocessor, True)
+        finally:
+            tracemalloc.stop()
+        for name, _ in STAGES:
+            stages[name]["peak_mb"] = round(memory[name]["peak_mb"], 2)
+    return stages
+
+
+def print_table(results, clusters):
+    """Print the time of each stage (ms) per cluster, and the total of each split."""
+    names = [name for name, _ in STAGES]
+    print(f"{'cluster':24s} {'sentences':>9s} " + " ".join(f"{name:>11s}" for name in names))
+    totals = {}
+    for cluster in clusters:
+        measured = results["clusters"][cluster]
+        if "error" in measured:
+            print(f"{cluster:24s} {measured['sentences']:9d} failed: {measured['error']}")
+            continue
+        seconds = [measured["stages"][name]["seconds"] for name in names]
+        print(f"{cluster:24s} {measured['sentences']:9d} " + " ".join(f"{value * 1000:11.2f}" for value in seconds))
+        if '/' in cluster:
+            total = totals.setdefault(cluster.split('/')[0], [0, [0.0] * len(names)])
+            total[0] += measured["sentences"]
+            total[1] = [a + b for a, b in zip(total[1], seconds)]
+    for split, (sentences, seconds) in totals.items():
+        print(f"{split + ' total':24s} {sentences:9d} " + " ".join(f"{value * 1000:11.2f}" for value in seconds))
+
+
+def compare(results, baseline, tolerance, memory_tolerance, min_seconds, min_mb):
+    """
+    List the stages slower (or hungrier) than the baseline beyond the tolerances. Differences
+    below min_seconds / min_mb are treated as noise.
+    """
+    mode, base_mode = results["environment"].get("preprocess"), baseline.get("environment", {}).get("preprocess")
+    if mode != base_mode:
+        return [f"baseline measured with preprocess mode {base_mode}, this run with {mode}"]
+    failures = []
+    for cluster, measured in results["clusters"].items():
+        reference = baseline.get("clusters", {}).get(cluster)
+        if reference is None or "error" in measured or "error" in reference:
+            continue
+        for stage, values in measured["stages"].items():
+            base = reference["stages"].get(stage)
+            if base is None:
+                continue
+            seconds, base_seconds = values["seconds"], base["seconds"]
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > min_seconds:
+                failures.append(f"{cluster} {stage}: {seconds:.4f} s > {base_seconds:.4f} s "
+                                f"(+{(seconds / base_seconds - 1) * 100 if base_seconds else float('inf'):.0f}%)")
+            if "peak_mb" in values and "peak_mb" in base:
+                peak, base_peak = values["peak_mb"], base["peak_mb"]
+                if peak > base_peak * (1 + memory_tolerance) and peak - base_peak > min_mb:
+                    failures.append(f"{cluster} {stage}: peak {peak:.2f} MB > {base_peak:.2f} MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-stage benchmark for Sum_module')
+    parser.add_argument('--splits', nargs='*', default=SPLITS, help='DUC_TEXT splits to run')
+    parser.add_argument('--sizes', nargs='*', type=int, default=SYNTHETIC_SIZES,
+                        help='Synthetic cluster sizes in sentences')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--backend', default='wordnet', choices=['wordnet', 'table'])
+    parser.add_argument('--preprocess', default='nltk', choices=PREPROCESS_MODES,
+                        help="'tokenize' skips stopwords and lemmas, for environments without nltk data")
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc run')
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this path')
+    parser.add_argument('--baseline', default=None, help='Compare with the results JSON at this path')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown')
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help='Allowed relative peak memory growth')
+    parser.add_argument('--min-seconds', type=float, default=0.01, help='Slowdowns below this are noise')
+    parser.add_argument('--min-mb', type=float, default=1.0, help='Memory growth below this is noise')
+    args = parser.parse_args()
+
+    results = {
+        "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                        "machine": platform.machine(), "repeat": args.repeat, "seed": args.seed,
+                        "preprocess": args.preprocess if args.preprocess == 'tokenize' else f"nltk/{args.backend}"},
+        "clusters": {},
+    }
+    failures = []
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as infile:
+            baseline = json.load(infile)
+        base_mode = baseline.get("environment", {}).get("preprocess")
+        if base_mode != results["environment"]["preprocess"]:
+            # Fail before the run: stage times of different preprocess modes are not comparable
+            print(f"FAILED: {args.baseline} was measured with preprocess mode {base_mode}, "
+                  f"this run uses {results['environment']['preprocess']}")
+            sys.exit(1)
+    if args.preprocess == 'tokenize':
+        preprocessor = TokenizePreprocessor()
+    else:
+        try:
+            preprocessor = Preprocessor(lemmatizer_backend=args.backend)
+        except LookupError as error:
+            print(f"FAILED: Preprocessor could not load its nltk data (try --preprocess tokenize): {error}")
+            sys.exit(1)
+
+    # Every DUC file is its own cluster ('test/d112h'), so a slowdown on one file is not hidden by a split total
+    clusters = [(cluster, lambda path=path: read_text(path)) for split in args.splits for cluster, path in split_files(split)]
+    clusters += [(f"synthetic_{size}", lambda size=size: synthetic_document(size, args.seed)) for size in args.sizes]
+    for cluster, load in clusters:
+        text = load()
+        num_sentences = text.count('</s>')
+        try:
+            stages = benchmark_cluster(text, preprocessor, args.repeat, not args.no_memory)
+        except (MemoryError, RuntimeError, ValueError) as error:
+            results["clusters"][cluster] = {"sentences": num_sentences, "error": str(error)}
+            failures.append(f"{cluster} failed: {error}")
+            continue
+        results["clusters"][cluster] = {"sentences": num_sentences, "stages": stages}
+    print_table(results, [cluster for cluster, _ in clusters])
+
+    if args.output and failures:
+        # A failed cluster in a baseline would be skipped by every later comparison
+        print(f"Not writing {args.output}: {len(failures)} clusters failed")
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as outfile:
+            json.dump(results, outfile, ensure_ascii=False, indent=4)
+
+    if baseline is not None:
+        failures += compare(results, baseline, args.tolerance, args.memory_tolerance, args.min_seconds, args.min_mb)
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_startup.py
+# Cold-start benchmark: time `python -c "import Sum_module..."` for every module and the
+# latency of a first summary in a fresh interpreter, optionally against a budget.
+#
+# Usage (from the repository root):
+#   python benchmarks/bench_startup.py --repeat 5 --import-budget-ms 500 --summary-budget-ms 3000
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'Sum_module.file_reader',
+    'Sum_module.parse_doc',
+    'Sum_module.preprocess',
+    'Sum_module.vocabulary',
+    'Sum_module.tfidf_vectorizer',
+    'Sum_module.cosine_connector',
+    'Sum_module.connections',
+    'Sum_module.pagerank',
+    'Sum_module.summarizer',
+    'Sum_module.output_writer',
+    'Sum_module.evaluation',
+    'Sum_module.coref_resolver',
+]
+
+# Runs in a fresh interpreter and prints the seconds from start to the first summary
+FIRST_SUMMARY_SCRIPT = '''
+import time
+start = time.perf_counter()
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.preprocess import Preprocessor
+from Sum_module.vocabulary import Vocabulary
+from Sum_module.connections import ConnectionMatrix
+from Sum_module.pagerank import PageRankCalculator
+from Sum_module.summarizer import Summarizer
+sentences_dict = ParseDoc.parse_doc(FileReader({input_file_path!r}).read_file())
+vocabulary = Vocabulary()
+processed = Preprocessor(lemmatizer_backend={backend!r}).preprocess_dict_ids(sentences_dict, vocabulary)
+matrix = ConnectionMatrix(list(processed.values()), min_common_words=4).create_matrix(sparse_output=True)
+scores = PageRankCalculator(matrix, verbose=False).calculator()
+Summarizer(sentences_dict, scores, top_percent=0.1).get_top_sentence_ids()
+print(time.perf_counter() - start)
+'''
+
+
+def run_python(code):
+    """Run code in a fresh interpreter from the repository root and return (wall seconds, stdout)."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines() or ['failed']
+        errors = [line for line in lines if 'Error' in line]
+        raise RuntimeError((errors or lines)[-1].strip())
+    return elapsed, result.stdout
+
+
+def median_ms(values):
+    return round(statistics.median(values) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start benchmark for Sum_module')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--input', default=os.path.join('Data', 'DUC_TEXT', 'test', 'd112h'))
+    parser.add_argument('--backend', default='wordnet', choices=['wordnet', 'table'])
+    parser.add_argument('--import-budget-ms', type=float, default=None)
+    parser.add_argument('--summary-budget-ms', type=float, default=None)
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this path')
+    args = parser.parse_args()
+
+    baseline = median_ms([run_python('pass')[0] for _ in range(args.repeat)])
+    results = {"python_startup_ms": baseline, "imports_ms": {}, "first_summary": None}
+    failures = []
+
+    for module in MODULES:
+        imported = median_ms([run_python(f'import {module}')[0] for _ in range(args.repeat)])
+        results["imports_ms"][module] = imported
+        print(f"import {module:32s} {imported:8.1f} ms ({imported - baseline:+.1f} ms over bare python)")
+        if args.import_budget_ms is not None and imported > args.import_budget_ms:
+            failures.append(f"import {module}: {imported} ms > {args.import_budget_ms} ms")
+
+    script = FIRST_SUMMARY_SCRIPT.format(input_file_path=args.input, backend=args.backend)
+    try:
+        runs = [run_python(script) for _ in range(args.repeat)]
+        results["first_summary"] = {
+            "process_ms": median_ms([elapsed for elapsed, _ in runs]),
+            "in_process_ms": median_ms([float(output) for _, output in runs]),
+        }
+        print(f"first summary: {results['first_summary']['process_ms']} ms per process, "
+              f"{results['first_summary']['in_process_ms']} ms after interpreter start")
+        if args.summary_budget_ms is not None and results["first_summary"]["process_ms"] > args.summary_budget_ms:
+            failures.append(f"first summary: {results['first_summary']['process_ms']} ms > {args.summary_budget_ms} ms")
+    except RuntimeError as error:
+        print(f"first summary failed: {error}")
+        failures.append(f"first summary failed: {error}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as outfile:
+            json.dump(results, outfile, ensure_ascii=False, indent=4)
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
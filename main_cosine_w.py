@@ -1,106 +1,54 @@
-from Sum_module.file_reader import FileReader
-from Sum_module.parse_doc import ParseDoc
-from Sum_module.preprocess import Preprocessor
-from Sum_module.tfidf_vectorizer import TFIDFVectorizer
-from Sum_module.cosine_connector import CosineSimilarityConnector
-from Sum_module.pagerank import PageRankCalculator
-from Sum_module.summarizer import Summarizer
-from Sum_module.summarizer_1 import Summarizer as Summarizer1
-from Sum_module.output_writer import OutputWriter
-from Sum_module.evaluation import Evaluator
+from Sum_module.pipeline import Pipeline
+from Sum_module.summary_archive import SummaryArchiveWriter
+from Sum_module.results_store import ResultsWriter
+from Sum_module.artifact_cache import ArtifactCache
 
-import numpy as np
-import json
 import os
 
-def process_file(file_name, base_text_dir='Data/DUC_TEXT/test', base_preference_dir='Data/DUC_SUM'):
-    # Build full file paths
-    input_file_path = os.path.join(base_text_dir, file_name)
-    preference_file_path = os.path.join(base_preference_dir, file_name)
+# Settings of this run: Sum_module.pipeline.PRESETS['cosine_w'] (weighted TF-IDF cosine graph, sentences with more than 4 words, summary sized on all sentences)
+CONFIG = 'cosine_w'
 
-    # Read the input document file
-    doc_file = FileReader(input_file_path).read_file()
+def process_file(file_name, base_text_dir='Data/DUC_TEXT/test', base_preference_dir='Data/DUC_SUM',
+                 pipeline=None, results=None, archive=None):
+    # The pipeline computes each stage (parse, preprocess, TF-IDF, weighted cosine graph, PageRank,
+    # summary, evaluation) once per file and reuses it for every later request
+    if pipeline is None:
+        pipeline = Pipeline(CONFIG, cache=ArtifactCache())
+    # The input and reference directories override the data section of the pipeline config
+    data = {"text_dir": base_text_dir, "reference_dir": base_preference_dir}
 
-    # Parse the document to extract sentences and their metadata
-    sentences_dict = ParseDoc.parse_doc_min_word_count(doc_file)
-    full_sentences_dict = ParseDoc.parse_doc(doc_file)
+    # Summary of the top sentences by PageRank score
+    pipeline.get('summarizer', file_name, data=data).print_summary()
 
-    # Preprocess the sentences for further analysis
-    preprocessor = Preprocessor(use_lemmatizer=True, language='english')
-    processed_sentence_text_dict = preprocessor.preprocess_dict(sentences_dict)
+    # Write the summary sentences to an output file (or into the run archive)
+    pipeline.write_summary(file_name, archive=archive, data=data)
 
-    # Create TF-IDF vectors for the processed sentences
-    tfidf_vectorizer = TFIDFVectorizer()
-    tfidf_matrix, idf, all_words = tfidf_vectorizer.transform(processed_sentence_text_dict)
-
-    # Calculate cosine similarity matrix from TF-IDF vectors
-    cosine_connector = CosineSimilarityConnector(threshold=0.2)
-    # connection_matrix = cosine_connector.create_connection_matrix(tfidf_matrix)
-    connection_matrix = cosine_connector.cosine_similarity_matrix(tfidf_matrix)
-    np.fill_diagonal(connection_matrix, 0)  # Remove self-connections
-    # Calculate PageRank scores based on the connection matrix
-    pagerank_calculator = PageRankCalculator(connection_matrix)
-    pagerank_scores = pagerank_calculator.calculator()
-
-    # Create a summarizer instance to extract top sentences based on PageRank scores
-    summarizer = Summarizer1(
-        sentences_dict=sentences_dict,
-        full_sentences_dict=full_sentences_dict,
-        pagerank_scores=pagerank_scores,
-        top_percent=0.1
-    )
-    
-    summary_sentences = summarizer.get_summary_dict()
-    summarizer.print_summary()
-
-    # Write the summary sentences to an output file
-    output_writer = OutputWriter(
-        sentences_dict=sentences_dict,
-        output_dir='output'
-    )
-    
-    output_file_path = output_writer.write_summary(
-        summary_sentence_ids=summarizer.get_top_sentence_ids(),
-        input_file_path=input_file_path,
-        suffix='_cosine_w_new'  # Changed suffix to indicate cosine similarity method
-    )
-    
-    # Parse the preference summary file
-    preference_doc_file = FileReader(preference_file_path).read_file()
-    preference_sum_dict = ParseDoc.parse_doc(preference_doc_file)
-    # Create an Evaluator instance to evaluate the summary
-    evaluator = Evaluator(
-        sentences_dict=sentences_dict,
-        summary_sentence_ids=summarizer.get_top_sentence_ids(),
-        preference_sum_dict=preference_sum_dict
-    )
-    evaluation_results = evaluator.evaluate()
-    # write evaluation results to a JSON file inlcuding filename and scores of each file in the same JSON file
-    evaluation_output_path = 'output/evaluation_cosine_w_new.json'
-    # write or append evaluation results to the JSON file
-    if os.path.exists(evaluation_output_path):
-        with open(evaluation_output_path, 'r+', encoding='utf-8') as eval_file:
-            data = json.load(eval_file)
-            data[file_name] = evaluation_results
-            eval_file.seek(0)
-            json.dump(data, eval_file, ensure_ascii=False, indent=4)
+    # Evaluate against the reference summary and append the results to output/results.jsonl
+    if results is None:
+        with ResultsWriter(batch_size=1) as results:
+            pipeline.record_results(file_name, results, data=data)
     else:
-        # If file does not exist, create it with the first entry
-        with open(evaluation_output_path, 'w', encoding='utf-8') as eval_file:
-            json.dump({file_name: evaluation_results}, eval_file, ensure_ascii=False, indent=4) 
+        pipeline.record_results(file_name, results, data=data)
+    pipeline.release(file_name)
 
 def main():
 
-    # filenames = ['d112h','d113h']
     test_dir = 'Data/DUC_TEXT/test'
     file_names = [f for f in os.listdir(test_dir) if os.path.isfile(os.path.join(test_dir, f))]
     file_names = sorted(file_names)
     print(file_names)
 
-    for file_name in file_names:
-        print(f"Processing file: {file_name}")
-        process_file(file_name)
-        print(f"Finished processing file: {file_name}")
+    cache = ArtifactCache()
+    pipeline = Pipeline(CONFIG, cache=cache)
+    # Buffered results are flushed on exit, also when a file fails halfway through the run
+    with ResultsWriter() as results:
+        # All summaries of the run go into one archive, committed when the loop completes
+        with SummaryArchiveWriter('output/cosine_w_new.sumarc') as archive:
+            for file_name in file_names:
+                print(f"Processing file: {file_name}")
+                process_file(file_name, base_text_dir=test_dir, pipeline=pipeline, results=results, archive=archive)
+                print(f"Finished processing file: {file_name}")
+    cache.report()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
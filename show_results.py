@@ -1,18 +1,20 @@
 # !pip install pandas seaborn matplotlib
-import json
+import sys
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-# Load JSON data from file
-with open('output/evaluation_cosine_1.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
-# Convert JSON dict to list of dicts
-records = []
-for file_name, metrics in data.items():
-    rec = {"file": file_name}
-    rec.update(metrics)
-    records.append(rec)
+from Sum_module.results_store import ResultsReader
+
+RUN = 'cosine_1'
+
+# Load the run from the results store (output/results.jsonl)
+reader = ResultsReader()
+if RUN not in reader.runs():
+    # Older runs were written as output/evaluation_<run>.json; this script only reads the store
+    sys.exit(f"No results for run '{RUN}' in {reader.path}. Import a legacy run with:\n"
+             f"  python -m Sum_module.results_store import output/evaluation_{RUN}.json")
+records = reader.rows(RUN)
 
 df = pd.DataFrame(records)
 
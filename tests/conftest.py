@@ -0,0 +1,22 @@
+# tests/conftest.py
+# Shared test setup: the repository root on sys.path and the DUC data directories.
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+DUC_TEXT_TEST = os.path.join(REPO_ROOT, 'Data', 'DUC_TEXT', 'test')
+DUC_SUM = os.path.join(REPO_ROOT, 'Data', 'DUC_SUM')
+
+
+@pytest.fixture
+def preprocessor():
+    """A default Preprocessor, skipping the test when its nltk data is not installed."""
+    from Sum_module.preprocess import Preprocessor
+    try:
+        return Preprocessor()
+    except LookupError:
+        pytest.skip("nltk stopwords/wordnet data is not installed")
@@ -0,0 +1,94 @@
+# tests/test_artifact_cache.py
+# ArtifactCache entries: round trips, damaged entries, concurrent writers and LRU eviction.
+import os
+import threading
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from Sum_module.artifact_cache import (ArtifactCache, sparse_from_arrays, sparse_to_arrays, token_ids_from_arrays,
+                                       token_ids_to_arrays)
+from Sum_module.vocabulary import Vocabulary
+
+
+def entry_arrays(seed, size=2000):
+    rng = np.random.default_rng(seed)
+    return {"values": rng.random(size), "ids": np.arange(size, dtype=np.int64)}
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_write_then_read(tmp_path, compress):
+    cache = ArtifactCache(str(tmp_path), compress=compress)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return entry_arrays(0)
+    key, arrays = cache.get_or_compute('tfidf', {"sparse": True}, ["document"], compute)
+    reopened = ArtifactCache(str(tmp_path), compress=compress)
+    same_key, loaded = reopened.get_or_compute('tfidf', {"sparse": True}, ["document"], compute)
+    assert same_key == key and len(calls) == 1
+    assert loaded.keys() == arrays.keys() and all(np.array_equal(loaded[name], arrays[name]) for name in arrays)
+    assert reopened.stats == {"tfidf": {"hits": 1, "misses": 0}}
+    # Other settings or inputs are other entries
+    assert cache.key('tfidf', {"sparse": False}, "document") != key
+    assert cache.key('tfidf', {"sparse": True}, "document 2") != key
+
+
+def test_stage_array_round_trips(tmp_path):
+    matrix = sp.random(30, 40, density=0.1, format='csr', random_state=0)
+    assert (sparse_from_arrays(sparse_to_arrays(matrix)) != matrix).nnz == 0
+    vocabulary = Vocabulary()
+    token_ids = {0: vocabulary.encode(["storm", "coast"]), 1: vocabulary.encode([]), 2: vocabulary.encode(["coast"])}
+    # Read back into another run's vocabulary
+    other = Vocabulary(["rain"])
+    restored = token_ids_from_arrays(token_ids_to_arrays(token_ids, vocabulary), other)
+    assert [other.decode(ids) for ids in restored.values()] == [vocabulary.decode(ids) for ids in token_ids.values()]
+
+
+@pytest.mark.parametrize("damage", ["truncate", "garbage", "empty"])
+def test_damaged_entries_are_misses(tmp_path, damage):
+    cache = ArtifactCache(str(tmp_path), compress=True)
+    key, arrays = cache.get_or_compute('graph', {}, ["document"], lambda: entry_arrays(1))
+    path = os.path.join(str(tmp_path), f'{key}.npz')
+    with open(path, 'rb') as infile:
+        content = infile.read()
+    with open(path, 'wb') as outfile:
+        outfile.write({"truncate": content[:len(content) // 2], "garbage": b'PK\x03\x04' + b'\x00' * 64,
+                       "empty": b''}[damage])
+    assert cache.load(key) is None
+    # The next run recomputes and replaces the entry
+    cache.get_or_compute('graph', {}, ["document"], lambda: entry_arrays(1))
+    assert np.array_equal(cache.load(key)["values"], arrays["values"])
+    assert cache.stats["graph"] == {"hits": 0, "misses": 2}
+
+
+def test_concurrent_writers_of_one_key(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    key = cache.key('graph', {}, "document")
+    arrays = entry_arrays(2, size=200000)
+    writers = [threading.Thread(target=cache.store, args=(key, arrays)) for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert np.array_equal(cache.load(key)["values"], arrays["values"])
+    assert [name for name in os.listdir(str(tmp_path)) if name.endswith('.tmp')] == []
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    keys = [cache.get_or_compute('tfidf', {}, [f"document {i}"], lambda i=i: entry_arrays(i))[0] for i in range(3)]
+    entry_size = cache.size() // 3
+    for age, key in enumerate(keys):
+        timestamp = 1_000_000 + age
+        os.utime(os.path.join(str(tmp_path), f'{key}.npz'), (timestamp, timestamp))
+    # A hit makes the oldest entry the most recently used
+    assert cache.load(keys[0]) is not None
+
+    cache.max_bytes = int(entry_size * 2.5)
+    newest, _ = cache.get_or_compute('tfidf', {}, ["document 3"], lambda: entry_arrays(3))
+    remaining = {name[:-len('.npz')] for name in os.listdir(str(tmp_path)) if name.endswith('.npz')}
+    assert remaining == {keys[0], newest}
+    assert cache.evictions == 2 and cache.size() <= cache.max_bytes
@@ -0,0 +1,92 @@
+# tests/test_batch_evaluation.py
+# BatchEvaluator against the per-file Evaluator, and its paired bootstrap.
+import os
+
+import numpy as np
+import pytest
+
+from conftest import DUC_SUM, DUC_TEXT_TEST
+from Sum_module.batch_evaluation import METRICS, BatchEvaluator
+from Sum_module.evaluation import Evaluator
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+
+CLUSTERS = sorted(os.listdir(DUC_TEXT_TEST))
+
+
+def load(file_name):
+    document = FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file()
+    reference = ParseDoc.parse_doc(FileReader(os.path.join(DUC_SUM, file_name)).read_file())
+    return ParseDoc.parse_doc(document), ParseDoc.parse_table(document), reference
+
+
+def selections(sentences, reference, rng):
+    """Summaries of several made-up configurations, including edge cases."""
+    reference_keys = {(record['doc_id'], record['num']) for record in reference.values()}
+    oracle = [sid for sid, record in sentences.items() if (record['doc_id'], record['num']) in reference_keys]
+    return {
+        "lead": list(range(min(10, len(sentences)))),
+        "random": rng.choice(len(sentences), size=len(sentences) // 10, replace=False).tolist(),
+        "oracle": oracle,
+        "oracle_half": oracle[::2] + list(range(3)),
+        "empty": [],
+    }
+
+
+def test_table_matches_the_evaluator():
+    rng = np.random.default_rng(0)
+    evaluator, expected = BatchEvaluator(), []
+    for position, file_name in enumerate(CLUSTERS):
+        sentences, table, reference = load(file_name)
+        evaluator.add_reference(file_name, reference)
+        for config, summary_ids in selections(sentences, reference, rng).items():
+            # dicts and SentenceTables encode to the same keys
+            evaluator.add_summary(config, file_name, table if position % 2 else sentences, summary_ids)
+            expected.append({"config": config, "file": file_name,
+                             **Evaluator(sentences, summary_ids, reference).evaluate()})
+    rows = evaluator.table()
+    key = lambda row: (row["config"], row["file"])  # noqa: E731
+    assert sorted(rows, key=key) == sorted(expected, key=key)
+    means = evaluator.mean('f1')
+    assert means["oracle"] > means["lead"] and means["empty"] == 0.0
+
+
+def test_missing_summaries_are_not_rows():
+    evaluator = BatchEvaluator()
+    for file_name in CLUSTERS[:2]:
+        sentences, _, reference = load(file_name)
+        evaluator.add_reference(file_name, reference)
+        evaluator.add_summary("lead", file_name, sentences, [0, 1, 2])
+    evaluator.add_summary("partial", CLUSTERS[0], load(CLUSTERS[0])[0], [0])
+    results = evaluator.evaluate()
+    assert np.isnan(results["f1"][1, 1]) and not np.isnan(results["f1"][1, 0])
+    assert [(row["config"], row["file"]) for row in evaluator.table()] == \
+        [("lead", CLUSTERS[0]), ("lead", CLUSTERS[1]), ("partial", CLUSTERS[0])]
+    assert set(evaluator.table()[0]) == {"config", "file", *METRICS}
+
+
+def test_compare_with_itself_and_with_a_better_configuration():
+    rng = np.random.default_rng(1)
+    evaluator = BatchEvaluator()
+    for file_name in CLUSTERS:
+        sentences, _, reference = load(file_name)
+        evaluator.add_reference(file_name, reference)
+        summaries = selections(sentences, reference, rng)
+        evaluator.add_summary("oracle", file_name, sentences, summaries["oracle"])
+        evaluator.add_summary("oracle_copy", file_name, sentences, summaries["oracle"])
+        evaluator.add_summary("random", file_name, sentences, summaries["random"])
+    same = evaluator.compare("oracle", "oracle_copy", resamples=500)
+    assert same["difference"] == 0.0 and not same["a_better"] and same["p_value"] == 1.0
+    for metric in ('f1', 'micro_f1'):
+        better = evaluator.compare("oracle", "random", metric=metric, resamples=500)
+        assert better["a_better"] and better["p_value"] == 0.0 and better["clusters"] == len(CLUSTERS)
+
+
+def test_compare_requires_shared_clusters():
+    evaluator = BatchEvaluator()
+    for file_name, config in zip(CLUSTERS[:2], ("a", "b")):
+        sentences, _, reference = load(file_name)
+        evaluator.add_reference(file_name, reference)
+        evaluator.add_summary(config, file_name, sentences, [0])
+    with pytest.raises(ValueError):
+        evaluator.compare("a", "b")
@@ -0,0 +1,52 @@
+# tests/test_connections.py
+# The sparse, row-blocked ConnectionMatrix engine against the original pairwise loop.
+import os
+
+import numpy as np
+import pytest
+
+from conftest import DUC_TEXT_TEST
+from Sum_module.connections import ConnectionMatrix
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+
+# Empty and one-word sentences, duplicates and a sentence whose words are all in another one
+HAND_BUILT = ["", "storm", "storm", "the storm hit the coast", "the storm hit the coast", "coast storm hit",
+              "rain fell on the coast after the storm hit", "nothing in common here", "the the the", "the"]
+
+
+def duc_sentences():
+    file_name = min(os.listdir(DUC_TEXT_TEST), key=lambda name: os.path.getsize(os.path.join(DUC_TEXT_TEST, name)))
+    sentences = ParseDoc.parse_doc(FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file())
+    return [data['sentence_text'] for data in sentences.values()]
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("min_common_words", [0, 1, 4])
+def test_sparse_engine_matches_loop_on_hand_built_sentences(weighted, min_common_words):
+    expected = ConnectionMatrix(HAND_BUILT, min_common_words, weighted, engine='loop').create_matrix()
+    for block_size in (1, 3, len(HAND_BUILT), 100):
+        connection = ConnectionMatrix(HAND_BUILT, min_common_words, weighted, block_size=block_size)
+        assert np.array_equal(connection.create_matrix(), expected), block_size
+        assert np.array_equal(connection.create_matrix(sparse_output=True).toarray(), expected), block_size
+
+
+@pytest.mark.parametrize("weighted,min_common_words", [(False, 4), (False, 0), (True, 4)])
+def test_sparse_engine_matches_loop_on_a_duc_cluster(weighted, min_common_words):
+    sentences = duc_sentences()
+    expected = ConnectionMatrix(sentences, min_common_words, weighted, engine='loop').create_matrix()
+    for block_size in (1, 37, 1024):
+        matrix = ConnectionMatrix(sentences, min_common_words, weighted, block_size=block_size).create_matrix()
+        assert matrix.dtype == expected.dtype
+        assert np.array_equal(matrix, expected), block_size
+
+
+def test_common_word_counts_cover_every_pair_in_all_pairs_mode():
+    connection = ConnectionMatrix(HAND_BUILT, block_size=3)
+    rows, cols, counts, sizes = connection.common_word_counts(all_pairs=True)
+    n = len(HAND_BUILT)
+    assert list(zip(rows, cols)) == list(zip(*np.triu_indices(n, k=1)))
+    sparse_rows, sparse_cols, sparse_counts, _ = connection.common_word_counts()
+    assert (counts > 0).sum() == len(sparse_counts)
+    lookup = dict(zip(zip(sparse_rows.tolist(), sparse_cols.tolist()), sparse_counts.tolist()))
+    assert [lookup.get(pair, 0) for pair in zip(rows.tolist(), cols.tolist())] == counts.tolist()
@@ -0,0 +1,54 @@
+# tests/test_cosine_connector.py
+# The row-blocked sparse cosine graph against the dense CosineSimilarityConnector.
+import os
+
+import numpy as np
+import pytest
+
+from conftest import DUC_TEXT_TEST
+from Sum_module.cosine_connector import CosineSimilarityConnector
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.preprocess import tokenize
+from Sum_module.tfidf_vectorizer import TFIDFVectorizer
+
+
+@pytest.fixture(scope="module")
+def tfidf():
+    file_name = sorted(os.listdir(DUC_TEXT_TEST))[0]
+    sentences = ParseDoc.parse_doc(FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file())
+    texts = {sid: " ".join(tokenize(data['sentence_text'])) for sid, data in sentences.items()}
+    # An empty sentence (zero norm) and a duplicate
+    texts[len(texts)] = ""
+    texts[len(texts)] = texts[0]
+    return TFIDFVectorizer(sparse=True).transform(texts)[0]
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.2])
+@pytest.mark.parametrize("sparse_input", [True, False])
+def test_blocked_matches_dense(tfidf, threshold, sparse_input):
+    dense = CosineSimilarityConnector(threshold)
+    expected = dense.create_connection_matrix(tfidf.toarray())
+    similarity = dense.similarity_matrix.copy()
+    np.fill_diagonal(similarity, 0)
+    expected_weighted = np.where(expected > 0, similarity, 0.0)
+
+    n = tfidf.shape[0]
+    matrix_input = tfidf if sparse_input else tfidf.toarray()
+    assert n % 37, "37 should not divide the number of sentences"
+    for block_size in (1, 37, n, n + 100):
+        connector = CosineSimilarityConnector(threshold, block_size=block_size)
+        binary = connector.create_sparse_connection_matrix(matrix_input)
+        assert np.array_equal(binary.toarray(), expected), block_size
+        weighted = connector.create_sparse_connection_matrix(matrix_input, weighted=True)
+        assert np.array_equal(weighted.toarray() != 0, expected != 0), block_size
+        assert np.allclose(weighted.toarray(), expected_weighted, rtol=0, atol=1e-12), block_size
+
+
+def test_block_sizes_give_identical_graphs(tfidf):
+    reference = CosineSimilarityConnector(0.1, block_size=tfidf.shape[0]).create_sparse_connection_matrix(
+        tfidf, weighted=True)
+    for block_size in (1, 37):
+        blocked = CosineSimilarityConnector(0.1, block_size=block_size).create_sparse_connection_matrix(
+            tfidf, weighted=True)
+        assert (blocked != reference).nnz == 0, block_size
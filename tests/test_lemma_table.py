@@ -0,0 +1,90 @@
+# tests/test_lemma_table.py
+# LemmaTable file format, and its equivalence with WordNetLemmatizer when WordNet is installed.
+import os
+
+import pytest
+
+from conftest import DUC_TEXT_TEST, REPO_ROOT
+from Sum_module.file_reader import FileReader
+from Sum_module.lemma_table import (DEFAULT_TABLE_PATH, LemmaTable, compile_lemma_table, corpus_words,
+                                    verify_lemma_table, write_lemma_table)
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.preprocess import Preprocessor
+
+
+@pytest.fixture
+def wordnet():
+    """Load the nltk WordNet corpus, skipping the test when its data is not installed."""
+    from nltk.corpus import wordnet
+    try:
+        wordnet.ensure_loaded()
+    except LookupError:
+        pytest.skip("nltk wordnet data is not installed")
+    return wordnet
+
+
+def test_default_path_does_not_depend_on_working_directory():
+    assert os.path.isabs(DEFAULT_TABLE_PATH)
+    assert DEFAULT_TABLE_PATH == os.path.join(REPO_ROOT, 'Data', 'cache', 'wordnet_noun_lemmas.bin')
+
+
+def test_write_and_lookup(tmp_path):
+    path = str(tmp_path / 'lemmas.bin')
+    write_lemma_table({"mice": "mouse", "geese": "goose", "cafés": "café"}, path)
+    table = LemmaTable(path)
+    assert table.count == 3
+    assert table.lookup("mice") == "mouse"
+    assert table.lookup("cafés") == "café"
+    assert table.lookup("mouse") is None
+    assert table.lemmatize("geese") == "goose"
+    assert table.lemmatize("dog") == "dog"
+    with pytest.raises(ValueError):
+        table.lemmatize("ran", pos='v')
+
+
+def test_empty_table(tmp_path):
+    path = str(tmp_path / 'empty.bin')
+    write_lemma_table({}, path)
+    assert LemmaTable(path).lemmatize("cats") == "cats"
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        LemmaTable(str(path))
+
+
+def test_matches_wordnet_on_duc_vocabulary(wordnet, tmp_path):
+    path = str(tmp_path / 'wordnet_noun_lemmas.bin')
+    compile_lemma_table(path)
+    words = corpus_words(os.path.join(REPO_ROOT, 'Data', 'DUC_TEXT', 'train'))
+    assert verify_lemma_table(LemmaTable(path), words) == []
+
+
+class RecordingLemmatizer:
+    def __init__(self):
+        self.words = set()
+
+    def lemmatize(self, word):
+        self.words.add(word)
+        return word
+
+
+def test_corpus_words_are_the_words_the_preprocessor_lemmatizes():
+    # A Preprocessor without stopwords (no nltk data needed) hands every word to the lemmatizer
+    preprocessor = Preprocessor.__new__(Preprocessor)
+    preprocessor.stop_words = frozenset()
+    preprocessor.lemmatizer = RecordingLemmatizer()
+    for file_name in sorted(os.listdir(DUC_TEXT_TEST)):
+        sentences = ParseDoc.parse_doc(FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file())
+        for data in sentences.values():
+            preprocessor.preprocess_words(data['sentence_text'])
+    assert corpus_words(DUC_TEXT_TEST) == sorted(preprocessor.lemmatizer.words)
+
+
+def test_corpus_words_split_like_tokenize(tmp_path):
+    (tmp_path / 'cluster').write_text(
+        '<s docid="D1" num="1" wdcount="6"> It’s a well—known fact, 1990s style.</s>\n',
+        encoding='utf-8')
+    assert corpus_words(str(tmp_path)) == ['1990s', 'a', 'fact', 'it', 'known', 's', 'style', 'well']
@@ -0,0 +1,84 @@
+# tests/test_lsh_connector.py
+# Band layouts of MinHashLSHConnector and the recall of its common-words graph.
+import os
+
+import numpy as np
+import pytest
+
+from conftest import DUC_TEXT_TEST
+from Sum_module.connections import ConnectionMatrix
+from Sum_module.file_reader import FileReader
+from Sum_module.lsh_connector import MinHashLSHConnector, common_words_bands, lsh_bands
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.preprocess import tokenize
+
+
+def candidate_probability(similarity, num_perm, bands):
+    return 1 - (1 - similarity ** (num_perm // bands)) ** bands
+
+
+@pytest.mark.parametrize("similarity", [0.03, 0.2, 0.5, 0.9])
+def test_lsh_bands_reach_the_target_with_fewest_bands(similarity):
+    bands = lsh_bands(similarity, num_perm=128, target_recall=0.95)
+    assert candidate_probability(similarity, 128, bands) >= 0.95 or bands == 128
+    if bands < 128:
+        # One more row per band would fall short
+        rows_per_band = 128 // bands
+        assert candidate_probability(similarity, 128, 128 // (rows_per_band + 1)) < 0.95 or rows_per_band == 128
+
+
+def test_common_words_bands():
+    # 4 common words between two 70-word sentences: Jaccard 4 / 136, one row per band
+    assert common_words_bands(4, 70) == 128
+    assert common_words_bands(0, 70) == 128
+    assert common_words_bands(10, 12) < 128
+
+
+def cluster_texts():
+    file_name = sorted(os.listdir(DUC_TEXT_TEST))[0]
+    sentences = ParseDoc.parse_doc(FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file())
+    return [" ".join(tokenize(data['sentence_text'])) for data in sentences.values()]
+
+
+@pytest.mark.parametrize("min_common_words", [2, 4])
+def test_common_words_recall(min_common_words):
+    texts = cluster_texts()
+    exact = ConnectionMatrix(texts, min_common_words=min_common_words).create_matrix(sparse_output=True)
+    connector = MinHashLSHConnector()
+    connector.create_common_words_matrix(texts, min_common_words=min_common_words)
+    report = connector.compare(exact)
+    assert report["bands"] == 128
+    assert report["recall"] >= 99.0
+    assert report["scored_pairs_percent"] < 100.0
+
+
+def test_fixed_bands_are_kept():
+    connector = MinHashLSHConnector(bands=32)
+    texts = ["alpha beta gamma delta", "alpha beta gamma epsilon", "zeta eta theta iota"]
+    connector.create_common_words_matrix(texts, min_common_words=2)
+    assert connector.used_bands == 32 and connector.rows_per_band == 4
+    with pytest.raises(ValueError):
+        MinHashLSHConnector(num_perm=16, bands=32)
+
+
+def test_weighted_common_words_graph_is_approximate():
+    # Any pair with one common word is a weighted edge: LSH finds most of them, scored exactly
+    texts = cluster_texts()
+    exact = ConnectionMatrix(texts, weighted=True).create_matrix(sparse_output=True)
+    connector = MinHashLSHConnector()
+    approx = connector.create_common_words_matrix(texts, weighted=True)
+    report = connector.compare(exact)
+    assert report["bands"] == 128
+    assert 99.0 <= report["recall"] < 100.0
+    found = approx.nonzero()
+    assert np.array_equal(np.asarray(approx[found]).ravel(), np.asarray(exact[found]).ravel())
+
+
+def test_weighted_bands_are_derived_for_one_common_word():
+    texts = ["alpha beta gamma delta", "alpha beta gamma epsilon", "zeta eta theta alpha", "iota kappa lambda mu"]
+    binary, weighted = MinHashLSHConnector(), MinHashLSHConnector()
+    binary.create_common_words_matrix(texts, min_common_words=3)
+    weighted.create_common_words_matrix(texts, min_common_words=3, weighted=True)
+    assert binary.used_bands == common_words_bands(3, 4)
+    assert weighted.used_bands == common_words_bands(1, 4) > binary.used_bands
+    assert weighted.connection_matrix[0, 2] > 0
@@ -0,0 +1,36 @@
+# tests/test_pagerank.py
+# Batched PageRank against single runs, and the separation of the two telemetry records.
+import numpy as np
+
+from Sum_module.pagerank import PageRankCalculator
+
+
+def ring_with_chords(n=40):
+    matrix = np.zeros((n, n), dtype=int)
+    for i in range(n):
+        for step in (1, 3, 7):
+            matrix[i, (i + step) % n] = matrix[(i + step) % n, i] = 1
+    matrix[0, :] = matrix[:, 0] = 1
+    matrix[0, 0] = 0
+    return matrix
+
+
+def test_batch_columns_match_single_runs():
+    matrix = ring_with_chords()
+    dampings = [0.5, 0.85, 0.95]
+    batch = PageRankCalculator(matrix, verbose=False).batch_calculator(dampings=dampings)
+    for column, damping in enumerate(dampings):
+        single = PageRankCalculator(matrix, damping=damping, verbose=False).calculator()
+        np.testing.assert_allclose(batch[:, column], single, rtol=1e-12)
+
+
+def test_batch_telemetry_does_not_replace_calculator_telemetry():
+    calculator = PageRankCalculator(ring_with_chords(), verbose=False)
+    calculator.calculator()
+    telemetry = calculator.telemetry
+    calculator.batch_calculator(dampings=[0.5, 0.85])
+    assert calculator.telemetry is telemetry
+    assert isinstance(telemetry["iterations"], int) and telemetry["stop_reason"] == 'tolerance'
+    assert calculator.batch_telemetry["solver"] == 'batch_power'
+    assert len(calculator.batch_telemetry["iterations"]) == 2
+    assert calculator.batch_telemetry["converged"] == [True, True]
@@ -0,0 +1,32 @@
+# tests/test_parse_doc.py
+# ParseDoc views built in one scan.
+import io
+import os
+
+from conftest import DUC_TEXT_TEST
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc, min_word_count_filter
+
+DOCUMENT = FileReader(os.path.join(DUC_TEXT_TEST, sorted(os.listdir(DUC_TEXT_TEST))[0])).read_file()
+
+
+def test_views_match_the_single_view_parsers():
+    views = ParseDoc.parse_views(DOCUMENT, {"full": None, "min_word_count": min_word_count_filter})
+    assert views["full"] == ParseDoc.parse_doc(DOCUMENT)
+    assert views["min_word_count"] == ParseDoc.parse_doc_min_word_count(DOCUMENT)
+    assert 0 < len(views["min_word_count"]) < len(views["full"])
+
+
+def test_views_do_not_share_records():
+    views = ParseDoc.parse_views(DOCUMENT, {"full": None, "all": None})
+    views["full"][0]["sentence_text"] = "edited"
+    views["full"][1]["score"] = 1.0
+    assert views["all"][0]["sentence_text"] != "edited"
+    assert "score" not in views["all"][1]
+
+
+def test_file_objects_are_read_in_chunks():
+    records = list(ParseDoc.iter_sentences(io.StringIO(DOCUMENT), chunk_size=256))
+    assert records == list(ParseDoc.parse_doc(DOCUMENT).values())
+    records = list(ParseDoc.iter_sentences(io.BytesIO(DOCUMENT.encode('utf-8')), chunk_size=256))
+    assert records == list(ParseDoc.parse_doc(DOCUMENT).values())
@@ -0,0 +1,135 @@
+# tests/test_pipeline.py
+# The top_k early exit the pipeline passes to PageRank must not change the summaries.
+import os
+
+import numpy as np
+import pytest
+
+from conftest import DUC_SUM, DUC_TEXT_TEST
+from Sum_module.connections import WORD_PATTERN, ConnectionMatrix
+from Sum_module.cosine_connector import CosineSimilarityConnector
+from Sum_module.file_reader import FileReader
+from Sum_module.pagerank import PageRankCalculator
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.pipeline import (DEFAULT_CONFIG, PRESETS, Pipeline, make_summarizer, merge_config, pagerank_options,
+                                 summary_length)
+from Sum_module.tfidf_vectorizer import TFIDFVectorizer
+from Sum_module.vocabulary import Vocabulary
+
+CLUSTERS = sorted(os.listdir(DUC_TEXT_TEST))
+
+
+def build_graph(config, sentences, vocabulary):
+    """Graph of a preset, with a plain lowercase word split standing in for the Preprocessor."""
+    token_ids = {sid: vocabulary.encode(WORD_PATTERN.findall(sentences[sid]['sentence_text'].lower()))
+                 for sid in range(len(sentences))}
+    graph = config["graph"]
+    if graph["method"] == "cosine":
+        tfidf = TFIDFVectorizer(sparse=True).transform(token_ids, vocabulary)[0]
+        return CosineSimilarityConnector(threshold=graph["threshold"]).create_sparse_connection_matrix(
+            tfidf, weighted=graph["weighted"])
+    return ConnectionMatrix(list(token_ids.values()), min_common_words=graph["min_common_words"],
+                            weighted=graph["weighted"]).create_matrix(sparse_output=True)
+
+
+def test_summary_length():
+    assert summary_length({"top_percent": 0.1, "length_from": "sentences"}, 95, 200) == 9
+    assert summary_length({"top_percent": 0.1, "length_from": "full"}, 95, 200) == 20
+    assert summary_length({"top_percent": 0.1, "length_from": "sentences"}, 5, 5) == 1
+
+
+def test_pagerank_options_keep_explicit_settings():
+    config = merge_config(DEFAULT_CONFIG, {"pagerank": {"top_k": None, "stable_iterations": 10}})
+    assert pagerank_options(config, 100, 100) == {"top_k": None, "stable_iterations": 10}
+    assert pagerank_options(DEFAULT_CONFIG, 100, 100) == {"top_k": 10, "stable_iterations": None}
+
+
+@pytest.mark.parametrize("preset", sorted(PRESETS))
+def test_top_k_selection_matches_full_convergence(preset):
+    config = merge_config(DEFAULT_CONFIG, PRESETS[preset])
+    vocabulary = Vocabulary()
+    for file_name in CLUSTERS:
+        full_sentences = ParseDoc.parse_table(FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file())
+        sentences = full_sentences.view(full_sentences.wdcounts > 4) if config["parse"]["min_word_count"] else full_sentences
+        graph = build_graph(config, sentences, vocabulary)
+
+        options = pagerank_options(config, graph.shape[0], len(full_sentences))
+        assert options["top_k"] == summary_length(config["summarizer"], len(sentences), len(full_sentences))
+        early = PageRankCalculator(graph, verbose=False, **options).calculator()
+        full = PageRankCalculator(graph, verbose=False, **config["pagerank"]).calculator()
+
+        selected = make_summarizer(config["summarizer"], sentences, full_sentences, early).get_top_sentence_ids()
+        expected = make_summarizer(config["summarizer"], sentences, full_sentences, full).get_top_sentence_ids()
+        assert selected == expected, file_name
+
+
+def hub_graph(seed, n=300, edges=3000):
+    """Symmetric random graph whose edge targets follow a 1/rank law, so the top nodes are well separated."""
+    import scipy.sparse as sp
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n + 1)
+    rows = rng.integers(0, n, edges)
+    cols = rng.choice(n, edges, p=weights / weights.sum())
+    keep = rows != cols
+    matrix = sp.csr_matrix((np.ones(keep.sum(), dtype=int), (rows[keep], cols[keep])), shape=(n, n))
+    return ((matrix + matrix.T) > 0).astype(int)
+
+
+@pytest.mark.parametrize("seed", [0, 2, 3, 4])
+def test_top_k_gap_exit_matches_converged_ranking(seed):
+    graph = hub_graph(seed)
+    config = merge_config(DEFAULT_CONFIG, {"summarizer": {"top_percent": 5 / graph.shape[0]}})
+    options = pagerank_options(config, graph.shape[0], graph.shape[0])
+    scores, telemetry = PageRankCalculator(graph, verbose=False, **options).calculator(return_telemetry=True)
+    converged = PageRankCalculator(graph, verbose=False, max_iterations=1000, tolerance=1e-13).calculator()
+    assert telemetry["stop_reason"] == "top_k_gap"
+    top = options["top_k"]
+    assert list(np.argsort(-scores, kind='stable')[:top]) == list(np.argsort(-converged, kind='stable')[:top])
+
+
+def test_pipeline_summaries_match_full_convergence(preprocessor):
+    pipeline = Pipeline({"data": {"text_dir": DUC_TEXT_TEST, "reference_dir": DUC_SUM}, "pagerank": {"verbose": False}})
+    for file_name in CLUSTERS[:3]:
+        early = pipeline.get("summarizer", file_name)
+        full = pipeline.get("summarizer", file_name, pagerank={"verbose": False, "top_k": None})
+        assert early.get_top_sentence_ids() == full.get_top_sentence_ids()
+
+
+def seeded_pipeline(preset, file_name):
+    """Pipeline of a preset whose graph stage is memoized from build_graph (no Preprocessor needed)."""
+    pipeline = Pipeline(merge_config(PRESETS[preset], {"data": {"text_dir": DUC_TEXT_TEST, "reference_dir": DUC_SUM},
+                                                      "pagerank": {"verbose": False}}))
+    graph = build_graph(pipeline.config, pipeline.get("sentences", file_name), pipeline.vocabulary)
+    pipeline.memo[pipeline._key("graph", file_name, pipeline.config)] = graph
+    return pipeline
+
+
+def count_solves(monkeypatch):
+    solves = []
+    calculator = PageRankCalculator.calculator
+
+    def counted(self, *args, **kwargs):
+        solves.append(self.top_k)
+        return calculator(self, *args, **kwargs)
+    monkeypatch.setattr(PageRankCalculator, "calculator", counted)
+    return solves
+
+
+@pytest.mark.parametrize("preset", sorted(PRESETS))
+def test_summary_variants_share_one_pagerank_run(preset, monkeypatch):
+    file_name = CLUSTERS[0]
+    pipeline = seeded_pipeline(preset, file_name)
+    solves = count_solves(monkeypatch)
+    longest = pipeline.get("summarizer", file_name, summarizer={"top_percent": 0.3})
+    shorter = pipeline.get("summarizer", file_name, summarizer={"top_percent": 0.2})
+    assert len(solves) == 1 and solves[0] is not None
+
+    # The full scores (e.g. of a RankingCurve) are then shared by every variant
+    full = pipeline.get("scores", file_name)
+    again = pipeline.get("summarizer", file_name, summarizer={"top_percent": 0.1})
+    assert solves[1:] == [None]
+    sentences, full_sentences = pipeline.get("sentences", file_name), pipeline.get("full_sentences", file_name)
+    for summarizer, top_percent in ((longest, 0.3), (shorter, 0.2), (again, 0.1)):
+        summarizer_config = dict(pipeline.config["summarizer"], top_percent=top_percent)
+        expected = make_summarizer(summarizer_config, sentences, full_sentences, full).get_top_sentence_ids()
+        assert summarizer.get_top_sentence_ids() == expected
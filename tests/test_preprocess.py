@@ -0,0 +1,57 @@
+# tests/test_preprocess.py
+# Preprocessor tokenization, and the agreement of the string and token-id common-words graphs.
+import os
+
+import pytest
+
+from conftest import DUC_TEXT_TEST
+from Sum_module.connections import ConnectionMatrix
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.preprocess import WORD_PATTERN, tokenize
+from Sum_module.vocabulary import Vocabulary
+
+CLUSTERS = sorted(os.listdir(DUC_TEXT_TEST))
+
+
+@pytest.mark.parametrize("text, words", [
+    ("The U.S. economy grew.", ["the", "us", "economy", "grew"]),
+    ("A well-known café", ["a", "wellknown", "café"]),
+    ("He said “no” — twice", ["he", "said", "no", "twice"]),
+    ("Don’t stop", ["don", "t", "stop"]),
+    ("  1,000 snake_case ", ["1000", "snakecase"]),
+    ("", []),
+])
+def test_tokenize(text, words):
+    assert tokenize(text) == words
+
+
+@pytest.mark.parametrize("text", ["The U.S. economy grew.", "He said “no” — twice", "Don’t stop"])
+def test_tokens_survive_the_string_path(text):
+    # ConnectionMatrix re-splits preprocessed strings with WORD_PATTERN
+    words = tokenize(text)
+    assert WORD_PATTERN.findall(" ".join(words).lower()) == words
+
+
+def assert_same_graph(word_lists):
+    vocabulary = Vocabulary()
+    from_strings = ConnectionMatrix([" ".join(words) for words in word_lists]).create_matrix(sparse_output=True)
+    from_ids = ConnectionMatrix([vocabulary.encode(words) for words in word_lists]).create_matrix(sparse_output=True)
+    assert (from_strings != from_ids).nnz == 0
+
+
+@pytest.mark.parametrize("file_name", CLUSTERS)
+def test_string_and_token_id_graphs_match(file_name):
+    sentences = ParseDoc.parse_doc(FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file())
+    assert_same_graph([tokenize(data['sentence_text']) for data in sentences.values()])
+
+
+def test_preprocessor_string_and_token_id_graphs_match(preprocessor):
+    for file_name in CLUSTERS:
+        sentences = ParseDoc.parse_doc(FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file())
+        processed = preprocessor.preprocess_dict(sentences)
+        vocabulary = Vocabulary()
+        from_strings = ConnectionMatrix(list(processed.values())).create_matrix(sparse_output=True)
+        from_ids = ConnectionMatrix(list(preprocessor.preprocess_dict_ids(sentences, vocabulary).values())
+                                    ).create_matrix(sparse_output=True)
+        assert (from_strings != from_ids).nnz == 0, file_name
@@ -0,0 +1,46 @@
+# tests/test_ranking_curve.py
+# RankingCurve against Evaluator on the Summarizer's selection, including degenerate clusters.
+import warnings
+
+import numpy as np
+import pytest
+
+from Sum_module.evaluation import Evaluator
+from Sum_module.ranking_curve import RankingCurve, best_cutoff
+from Sum_module.summarizer import Summarizer
+
+
+def record(doc_id, num):
+    return {"doc_id": doc_id, "num": str(num), "wdcount": 5, "sentence_text": f"{doc_id} sentence {num}"}
+
+
+SENTENCES = {sid: record("D1" if sid < 10 else "D2", sid % 10 + 1) for sid in range(20)}
+REFERENCE = {0: record("D1", 3), 1: record("D2", 5), 2: record("D2", 1), 3: record("D9", 1)}
+SCORES = np.random.default_rng(0).random(20)
+
+
+@pytest.mark.parametrize("top_percent", [0.01, 0.1, 0.25, 0.5, 1.0])
+def test_evaluate_matches_evaluator(top_percent):
+    summary = Summarizer(SENTENCES, SCORES, top_percent=top_percent).get_top_sentence_ids()
+    expected = Evaluator(SENTENCES, summary, REFERENCE).evaluate()
+    assert RankingCurve(SCORES, SENTENCES, REFERENCE).evaluate(top_percent) == expected
+
+
+@pytest.mark.parametrize("sentences, scores, reference", [
+    ({}, np.zeros(0), REFERENCE),
+    (SENTENCES, SCORES, {}),
+    ({}, np.zeros(0), {}),
+])
+def test_degenerate_clusters_give_zeros_without_warnings(sentences, scores, reference):
+    summary = Summarizer(sentences, scores, top_percent=0.1).get_top_sentence_ids()
+    expected = Evaluator(sentences, summary, reference).evaluate()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        curve = RankingCurve(scores, sentences, reference)
+        assert curve.evaluate(0.1) == expected
+        best_cutoff([curve])
+
+
+def test_best_cutoff_needs_curves():
+    with pytest.raises(ValueError):
+        best_cutoff([])
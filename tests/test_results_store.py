@@ -0,0 +1,77 @@
+# tests/test_results_store.py
+# ResultsWriter/ResultsReader round trips, interrupted writes and legacy imports.
+import json
+import multiprocessing
+
+from Sum_module.results_store import ResultsReader, ResultsWriter, import_legacy_json
+
+METRICS = {"labeled": 10, "extracted": 8, "matched": 4, "recall": 40.0, "precision": 50.0, "f1": 44.44}
+
+
+def test_write_then_read(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    with ResultsWriter(path, batch_size=2) as writer:
+        writer.append('cosine', 'd112h', METRICS, config={"graph": {"threshold": 0.2}})
+        writer.append('cosine', 'd113h', dict(METRICS, f1=30.0))
+        writer.append('commonwords', 'd112h', dict(METRICS, f1=20.0))
+        # Two records flushed by the batch size, the third still pending
+        assert len(ResultsReader(path).load()) == 2
+    reader = ResultsReader(path)
+    assert reader.runs() == ['cosine', 'commonwords']
+    assert reader.table('cosine') == {'d112h': METRICS, 'd113h': dict(METRICS, f1=30.0)}
+    assert reader.records('cosine', 'd112h')[0]["config"] == {"graph": {"threshold": 0.2}}
+    assert reader.metric('f1') == {'cosine': {'d112h': 44.44, 'd113h': 30.0}, 'commonwords': {'d112h': 20.0}}
+
+    # A re-evaluated file: the latest record wins, and the reader picks up the change
+    with ResultsWriter(path) as writer:
+        writer.append('cosine', 'd112h', dict(METRICS, f1=50.0))
+    assert reader.metric('f1', 'cosine') == {'cosine': {'d112h': 50.0, 'd113h': 30.0}}
+    assert [row["file"] for row in reader.rows('cosine')] == ['d112h', 'd113h']
+
+
+def test_reopen_after_an_interrupted_write(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    with ResultsWriter(path) as writer:
+        writer.append('cosine', 'd112h', METRICS)
+    with open(path, 'a', encoding='utf-8') as outfile:
+        outfile.write('{"run": "cosine", "file": "d113h", "metr')
+    reader = ResultsReader(path)
+    assert reader.table('cosine') == {'d112h': METRICS} and reader.skipped == 1
+
+    # The next batch starts on its own line: only the damaged record is lost
+    with ResultsWriter(path) as writer:
+        writer.append('cosine', 'd114h', METRICS)
+    assert reader.table('cosine') == {'d112h': METRICS, 'd114h': METRICS} and reader.skipped == 1
+
+
+def append_records(path, worker):
+    with ResultsWriter(path, batch_size=7) as writer:
+        for index in range(50):
+            writer.append(f'run{worker}', f'file{index}', METRICS)
+
+
+def test_concurrent_writers_do_not_interleave(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    workers = [multiprocessing.Process(target=append_records, args=(path, worker)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    reader = ResultsReader(path)
+    assert len(reader.load()) == 200 and reader.skipped == 0
+    assert sorted(reader.runs()) == ['run0', 'run1', 'run2', 'run3']
+
+
+def test_csv_export_and_legacy_import(tmp_path):
+    legacy = tmp_path / 'evaluation_cosine_16.json'
+    # The old r+ rewrite left the tail of a longer previous version after the object
+    legacy.write_text(json.dumps({"d112h": METRICS}) + '3.0}}', encoding='utf-8')
+    path = str(tmp_path / 'results.jsonl')
+    with ResultsWriter(path) as writer:
+        assert import_legacy_json(str(legacy), writer) == 1
+    reader = ResultsReader(path)
+    assert reader.table('cosine_16') == {'d112h': METRICS}
+    csv_path = reader.to_csv('cosine_16', str(tmp_path / 'cosine_16.csv'))
+    with open(csv_path, encoding='utf-8') as infile:
+        assert infile.read().splitlines() == ['file,labeled,extracted,matched,recall,precision,f1',
+                                              'd112h,10,8,4,40.0,50.0,44.44']
@@ -0,0 +1,73 @@
+# tests/test_rouge.py
+# RougeScorer against the reference ROUGE implementation and its edge cases.
+import numpy as np
+import pytest
+
+from Sum_module import rouge
+from Sum_module.rouge import FIELDS, RougeScorer, lcs_length, lcs_masks
+
+
+def rounded(scores):
+    return tuple(round(scores[field], 4) for field in FIELDS)
+
+
+def lcs_table(first, second):
+    """LCS length with the textbook dynamic-programming table."""
+    table = np.zeros((len(first) + 1, len(second) + 1), dtype=int)
+    for i, a in enumerate(first, 1):
+        for j, b in enumerate(second, 1):
+            table[i, j] = table[i - 1, j - 1] + 1 if a == b else max(table[i - 1, j], table[i, j - 1])
+    return int(table[-1, -1])
+
+
+def test_matches_the_reference_scorer():
+    # Values of the reference ROUGE implementation (rouge-score, no stemming)
+    scores = RougeScorer(('rouge1', 'rougeL')).score(
+        'The quick brown fox jumps over the lazy dog', 'The quick brown dog jumps on the log.')
+    assert rounded(scores["rouge1"]) == (0.75, 0.6667, 0.7059)
+    assert rounded(scores["rougeL"]) == (0.625, 0.5556, 0.5882)
+
+
+@pytest.mark.parametrize("reference,candidate", [("", ""), ("", "some words"), ("some words", ""), ("...", "!")])
+def test_empty_texts_score_zero(reference, candidate):
+    scores = RougeScorer(('rouge1', 'rouge2', 'rougeL')).score(reference, candidate)
+    for rouge_type, values in scores.items():
+        assert values == {"precision": 0.0, "recall": 0.0, "f1": 0.0}, rouge_type
+
+
+def test_candidate_shorter_than_n():
+    scores = RougeScorer(('rouge2', 'rouge3')).score('storm hits the coast', 'storm')
+    assert scores["rouge2"] == {"precision": 0.0, "recall": 0.0, "f1": 0.0}
+    assert scores["rouge3"] == {"precision": 0.0, "recall": 0.0, "f1": 0.0}
+
+
+def test_repeated_ngrams_are_clipped():
+    scores = RougeScorer(('rouge1', 'rouge2')).score('the cat the cat sat', 'the cat the cat the cat the cat')
+    # rouge1: the x2, cat x2 shared (clipped to the reference counts) of 8 candidate / 5 reference tokens
+    assert scores["rouge1"]["precision"] == 4 / 8 and scores["rouge1"]["recall"] == 4 / 5
+    # rouge2: 'the cat' x2 and 'cat the' x1 of 7 candidate / 4 reference bigrams
+    assert scores["rouge2"]["precision"] == 3 / 7 and scores["rouge2"]["recall"] == 3 / 4
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lcs_longer_than_64_tokens(seed):
+    rng = np.random.default_rng(seed)
+    reference = rng.integers(0, 4, size=150).tolist()
+    candidate = rng.integers(0, 4, size=130).tolist()
+    expected = lcs_table(reference, candidate)
+    assert expected > 64
+    assert lcs_length(lcs_masks(reference), len(reference), candidate) == expected
+
+
+def test_vocabulary_overflow_raises(monkeypatch):
+    # 4 bits per token id: the 16th distinct word would collide in packed n-gram codes
+    monkeypatch.setattr(rouge, "NGRAM_BITS", 4)
+    scorer = RougeScorer(('rouge1',))
+    scorer.score(' '.join(f'word{i}' for i in range(8)), 'word1 word2')
+    with pytest.raises(ValueError):
+        scorer.score(' '.join(f'word{i}' for i in range(16)), 'word1')
+
+
+def test_unknown_rouge_type_raises():
+    with pytest.raises(ValueError):
+        RougeScorer(('rouge9',))
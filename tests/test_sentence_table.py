@@ -0,0 +1,98 @@
+# tests/test_sentence_table.py
+# SentenceTable as a drop-in for the parsed sentences_dict.
+import os
+
+import numpy as np
+import pytest
+
+from conftest import DUC_TEXT_TEST
+from Sum_module.corpus_store import CompiledCorpus, compile_corpus
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc, min_word_count_filter
+from Sum_module.preprocess import tokenize
+from Sum_module.sentence_table import SentenceTable
+
+DOCUMENT = FileReader(os.path.join(DUC_TEXT_TEST, sorted(os.listdir(DUC_TEXT_TEST))[0])).read_file()
+
+
+def test_round_trip_matches_parse_doc():
+    sentences = ParseDoc.parse_doc(DOCUMENT)
+    table = ParseDoc.parse_table(DOCUMENT)
+    assert table.to_dict() == sentences
+    assert SentenceTable.from_dict(sentences).to_dict() == sentences
+    assert len(table) == len(sentences) and list(table) == list(sentences)
+    for sid in (0, len(table) - 1):
+        assert table[sid] == sentences[sid]
+        assert table.text(sid) == sentences[sid]['sentence_text']
+
+
+def test_non_ascii_texts_round_trip():
+    records = [{"doc_id": "A1", "num": "1", "wdcount": "3", "sentence_text": "Café naïve résumé"},
+               {"doc_id": "A1", "num": "2", "wdcount": "1", "sentence_text": ""},
+               {"doc_id": "B2", "num": "1", "wdcount": "2", "sentence_text": "東京 タワー"}]
+    table = SentenceTable.from_records(records)
+    assert [table.text(sid) for sid in table] == [record["sentence_text"] for record in records]
+    assert table[2]['doc_id'] == "B2" and table[0]['num'] == "1" and table[0]['wdcount'] == 3
+    assert table.doc_names == ["A1", "B2"]
+
+
+def test_views_share_columns_and_renumber():
+    table = ParseDoc.parse_table(DOCUMENT)
+    view = table.filter(min_word_count_filter)
+    assert view.to_dict() == ParseDoc.parse_doc_min_word_count(DOCUMENT)
+    assert view.text_buffer is table.text_buffer
+    assert np.array_equal(view.wdcounts, table.wdcounts[table.wdcounts > 4])
+    # A view of a view keeps addressing the stored rows
+    nested = view.view(np.arange(0, len(view), 2))
+    assert [record.to_dict() for record in nested.values()] == [view[sid].to_dict() for sid in range(0, len(view), 2)]
+
+
+def test_missing_sentences_and_non_canonical_nums():
+    table = ParseDoc.parse_table(DOCUMENT)
+    with pytest.raises(KeyError):
+        table[len(table)]
+    assert table.get(-1) is None and len(table) - 1 in table
+    with pytest.raises(KeyError):
+        table[0]['score']
+    with pytest.raises(ValueError):
+        SentenceTable.from_records([{"doc_id": "A", "num": "01", "wdcount": "1", "sentence_text": "x"}])
+
+
+class TokenizePreprocessor:
+    """Preprocessor settings and ids without stopwords or lemmas (no nltk data needed)."""
+    config = {"use_lemmatizer": False, "language": "none", "lemmatizer_backend": "wordnet"}
+
+    def preprocess_ids(self, text, vocabulary):
+        return vocabulary.encode(tokenize(text))
+
+
+def test_compiled_corpus_round_trip(tmp_path):
+    corpus_dir = str(tmp_path / 'corpus')
+    # Left over by an interrupted compile: replaced, never read
+    os.makedirs(f'{corpus_dir}.tmp')
+    with open(os.path.join(f'{corpus_dir}.tmp', 'manifest.json'), 'w') as outfile:
+        outfile.write('{"format_version": 2, "clus')
+    compile_corpus(corpus_dir, [DUC_TEXT_TEST], preprocessor=TokenizePreprocessor())
+    assert not os.path.exists(f'{corpus_dir}.tmp')
+
+    corpus = CompiledCorpus(corpus_dir)
+    for name in corpus.clusters:
+        expected = ParseDoc.parse_doc(FileReader(os.path.join(DUC_TEXT_TEST, name.split('/')[1])).read_file())
+        table = corpus.cluster(name)
+        assert table.to_dict() == expected, name
+    token_ids = corpus.token_ids(table)
+    assert [corpus.vocabulary.decode(ids) for ids in token_ids.values()] == \
+        [tokenize(record['sentence_text']) for record in expected.values()]
+    assert corpus.stale_sources([DUC_TEXT_TEST]) == []
+
+
+def test_truncated_corpus_manifest_is_rejected(tmp_path):
+    corpus_dir = str(tmp_path / 'corpus')
+    compile_corpus(corpus_dir, [DUC_TEXT_TEST], preprocessor=TokenizePreprocessor())
+    manifest_path = os.path.join(corpus_dir, 'manifest.json')
+    with open(manifest_path, 'rb') as infile:
+        content = infile.read()
+    with open(manifest_path, 'wb') as outfile:
+        outfile.write(content[:len(content) // 2])
+    with pytest.raises(ValueError):
+        CompiledCorpus(corpus_dir)
@@ -0,0 +1,74 @@
+# tests/test_summary_archive.py
+# SummaryArchiveWriter/SummaryArchiveReader round trips and interrupted writes.
+import os
+
+import pytest
+
+from Sum_module.summary_archive import SummaryArchiveReader, SummaryArchiveWriter
+
+SUMMARIES = {"d112h_cosine": "First sentence.\nSecond sentence.\n", "d113h_cosine": "Résumé — naïve café.\n",
+             "d114h_cosine": ""}
+
+
+def write_archive(path, summaries):
+    with SummaryArchiveWriter(path) as writer:
+        for name, text in summaries.items():
+            writer.add(name, text)
+
+
+def test_write_then_read(tmp_path):
+    path = str(tmp_path / 'run.sumarc')
+    with SummaryArchiveWriter(path) as writer:
+        for name, text in SUMMARIES.items():
+            writer.add(name, text)
+        writer.add("d112h_cosine", "Rewritten.\n")
+    with SummaryArchiveReader(path) as reader:
+        assert reader.names() == list(SUMMARIES)
+        assert reader.read("d112h_cosine") == "Rewritten.\n"
+        assert [reader.read(name) for name in list(SUMMARIES)[1:]] == list(SUMMARIES.values())[1:]
+        assert "d115h_cosine" not in reader
+        paths = reader.export(str(tmp_path / 'export'), names=["d113h_cosine"])
+    with open(paths[0], encoding='utf-8') as infile:
+        assert infile.read() == SUMMARIES["d113h_cosine"]
+    assert not os.path.exists(f'{path}.tmp')
+
+
+def test_interrupted_write_keeps_the_previous_archive(tmp_path):
+    path = str(tmp_path / 'run.sumarc')
+    write_archive(path, SUMMARIES)
+    # A run that dies before commit leaves only its temporary file
+    writer = SummaryArchiveWriter(path)
+    writer.add("d112h_cosine", "Partial run.\n")
+    writer._file.flush()
+    with SummaryArchiveReader(path) as reader:
+        assert reader.read("d112h_cosine") == SUMMARIES["d112h_cosine"]
+    writer._file.close()
+
+    # The next run starts over the leftover temporary file
+    write_archive(path, {"d112h_cosine": "Next run.\n"})
+    with SummaryArchiveReader(path) as reader:
+        assert reader.names() == ["d112h_cosine"] and reader.read("d112h_cosine") == "Next run.\n"
+
+
+def test_failed_run_is_aborted(tmp_path):
+    path = str(tmp_path / 'run.sumarc')
+    write_archive(path, SUMMARIES)
+    with pytest.raises(RuntimeError):
+        with SummaryArchiveWriter(path) as writer:
+            writer.add("d112h_cosine", "Never committed.\n")
+            raise RuntimeError("summarizer failed")
+    assert not os.path.exists(f'{path}.tmp')
+    with SummaryArchiveReader(path) as reader:
+        assert reader.names() == list(SUMMARIES)
+
+
+@pytest.mark.parametrize("keep", [0, 5, -1, -30])
+def test_truncated_archives_are_rejected(tmp_path, keep):
+    path = str(tmp_path / 'run.sumarc')
+    write_archive(path, SUMMARIES)
+    with open(path, 'rb') as infile:
+        content = infile.read()
+    with open(path, 'wb') as outfile:
+        outfile.write(content[:keep])
+    with pytest.raises(ValueError):
+        SummaryArchiveReader(path)
@@ -0,0 +1,49 @@
+# tests/test_tfidf_vectorizer.py
+# The sparse TF-IDF builders (strings and token ids) against the dense transform.
+import os
+
+import numpy as np
+import pytest
+
+from conftest import DUC_TEXT_TEST
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.preprocess import tokenize
+from Sum_module.tfidf_vectorizer import TFIDFVectorizer
+from Sum_module.vocabulary import Vocabulary
+
+# Duplicate and empty sentences, a word repeated inside a sentence and a word used everywhere (idf 0)
+HAND_BUILT = ["storm coast", "storm coast", "", "storm storm storm rain", "storm", "", "rain fell storm coast"]
+
+
+def duc_texts():
+    file_name = sorted(os.listdir(DUC_TEXT_TEST))[0]
+    sentences = ParseDoc.parse_doc(FileReader(os.path.join(DUC_TEXT_TEST, file_name)).read_file())
+    return [" ".join(tokenize(data['sentence_text'])) for data in sentences.values()]
+
+
+@pytest.mark.parametrize("texts", [HAND_BUILT, duc_texts()], ids=["hand_built", "duc"])
+def test_sparse_transform_matches_dense_exactly(texts):
+    processed = dict(enumerate(texts))
+    dense = TFIDFVectorizer()
+    expected, word_index, idf = dense.transform(processed)
+
+    sparse = TFIDFVectorizer(sparse=True)
+    matrix, sparse_word_index, sparse_idf = sparse.transform(processed)
+    assert np.array_equal(matrix.toarray(), expected)
+    assert sparse_word_index == word_index and sparse.all_words == dense.all_words
+    assert sparse_idf == idf
+
+    # Token ids (Preprocessor.preprocess_dict_ids) give the same matrix in both modes
+    vocabulary = Vocabulary()
+    token_ids = {sid: vocabulary.encode(text.split()) for sid, text in processed.items()}
+    ids_matrix, ids_word_index, ids_idf = TFIDFVectorizer(sparse=True).transform(token_ids, vocabulary)
+    assert np.array_equal(ids_matrix.toarray(), expected)
+    assert ids_word_index == word_index and ids_idf == idf
+    assert np.array_equal(TFIDFVectorizer().transform(token_ids, vocabulary)[0], expected)
+
+
+def test_token_ids_require_a_vocabulary():
+    vocabulary = Vocabulary()
+    with pytest.raises(ValueError):
+        TFIDFVectorizer().transform({0: vocabulary.encode(["storm"])})
@@ -0,0 +1,57 @@
+# tests/test_tracing.py
+# Stage spans and the nested spans of parsing, TF-IDF, graph building and the artifact cache.
+import json
+import os
+
+import numpy as np
+
+from conftest import DUC_TEXT_TEST
+from Sum_module import tracing
+from Sum_module.artifact_cache import ArtifactCache
+from Sum_module.cosine_connector import CosineSimilarityConnector
+from Sum_module.file_reader import FileReader
+from Sum_module.parse_doc import ParseDoc
+from Sum_module.tfidf_vectorizer import TFIDFVectorizer
+from Sum_module.vocabulary import Vocabulary
+
+FILE_NAME = sorted(os.listdir(DUC_TEXT_TEST))[0]
+DOCUMENT = FileReader(os.path.join(DUC_TEXT_TEST, FILE_NAME)).read_file()
+
+
+def read_trace(path):
+    with open(path, encoding='utf-8') as infile:
+        return [json.loads(line) for line in infile if line.strip()]
+
+
+def test_nested_spans_inherit_the_cluster(tmp_path):
+    path = str(tmp_path / 'trace.jsonl')
+    tracing.enable(path, memory=False)
+    try:
+        with tracing.span('graph', cluster=FILE_NAME):
+            sentences = ParseDoc.parse_table(DOCUMENT)
+            vocabulary = Vocabulary()
+            token_ids = {sid: vocabulary.encode(data['sentence_text'].lower().split()) for sid, data in sentences.items()}
+            tfidf = TFIDFVectorizer(sparse=True).transform(token_ids, vocabulary)[0]
+            CosineSimilarityConnector().create_sparse_connection_matrix(tfidf)
+    finally:
+        tracing.disable()
+    records = {record["name"]: record for record in read_trace(path)}
+    assert set(records) == {'graph', 'parse.table', 'tfidf.transform', 'graph.cosine_blocks'}
+    for name in ('parse.table', 'tfidf.transform', 'graph.cosine_blocks'):
+        assert records[name]["cluster"] == FILE_NAME
+        assert records[name]["depth"] == 1
+    assert records['parse.table']["outputs"]["sentences"] == {"sentences": len(sentences)}
+
+
+def test_cache_lookups_record_hits(tmp_path):
+    path = str(tmp_path / 'trace.jsonl')
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    tracing.enable(path, memory=False)
+    try:
+        for _ in range(2):
+            cache.get_or_compute('tfidf', {}, [DOCUMENT], lambda: {"values": np.arange(3)})
+    finally:
+        tracing.disable()
+    lookups = [record for record in read_trace(path) if record["name"] == 'cache.lookup']
+    assert [record["outputs"]["hit"] for record in lookups] == [0, 1]
+    assert [record["name"] for record in read_trace(path)].count('cache.store') == 1